@@ -1,29 +1,149 @@
 import os
+import sys
 import json
-from pdf_extract_kit.core.extractor import extract_outline as process_pdf
+import time
+import argparse
+from contextlib import redirect_stdout
+from pdf_extract_kit.core.batch import list_pdfs, run_batch, summarize, stream_file, batch_records
+from pdf_extract_kit.core.cache import CACHE_DIR, invalidate
+from pdf_extract_kit.core.metrics import write_prometheus
+from pdf_extract_kit.core.budget import DEADLINE_S, MAX_PAGES
 
 
 INPUT_DIR = "/app/input"
 OUTPUT_DIR = "/app/output"
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-for filename in os.listdir(INPUT_DIR):
-    if not filename.lower().endswith(".pdf"):
-        continue
-    input_path = os.path.join(INPUT_DIR, filename)
-    output_path = os.path.join(OUTPUT_DIR, filename.rsplit(".", 1)[0] + ".json")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract H1–H4 outlines from a folder of PDFs.")
+    parser.add_argument("--input", default=INPUT_DIR, help="folder with the input PDFs")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="folder for the JSON outlines")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WORKERS", 0)) or None,
+                        help="worker processes (default: CPU count, 1 = run in-process)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="outline cache folder")
+    parser.add_argument("--no-cache", action="store_true", help="always re-extract, bypassing the cache")
+    parser.add_argument("--clear-cache", action="store_true", help="drop every cached outline before running")
+    parser.add_argument("--deadline", type=float, default=DEADLINE_S, metavar="SECONDS",
+                        help="per-document latency budget; OCR degrades to meet it (default: none)")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES,
+                        help="read at most this many pages of each PDF (default: all)")
+    parser.add_argument("--ndjson", metavar="PATH",
+                        help="stream NDJSON records to PATH ('-' for stdout) instead of writing one JSON per PDF")
+    parser.add_argument("--store", metavar="PATH",
+                        help="write every outline into one columnar store file at PATH instead of one JSON per PDF")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write per-stage timings and counters to PATH")
+    parser.add_argument("--metrics-format", choices=["jsonl", "prom"],
+                        help="JSON lines per file, or a Prometheus textfile for the batch "
+                             "(default: prom if PATH ends in .prom, else jsonl)")
+    args = parser.parse_args()
+    if args.ndjson and args.store:
+        parser.error("--ndjson and --store are mutually exclusive")
+    args.limits = {"deadline_s": args.deadline, "max_pages": args.max_pages}
+    return args
 
-    print(f"📄 Processing: {filename}")
-    try:
-        result = process_pdf(input_path)
-        if not result["outline"]:
-            print("⚠️ No outline found with PDF-Extract-Kit. Falling back to OCR...")
-        else:
-            print("✔ Done →", output_path)
-    except Exception as e:
-        print("❌ Error:", e)
-        result = {"title": "Untitled", "outline": []}
 
+def write_result(output_dir, record):
+    output_path = os.path.join(output_dir, record["file"].rsplit(".", 1)[0] + ".json")
     with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+        json.dump(record["result"], f, ensure_ascii=False, indent=2)
+    return output_path
+
+
+def write_ndjson(out, records):
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+
+def write_metrics(args, records, elapsed):
+    fmt = args.metrics_format or ("prom" if args.metrics.endswith(".prom") else "jsonl")
+    if fmt == "prom":
+        write_prometheus(args.metrics, records, elapsed)
+        return
+    with open(args.metrics, "w", encoding="utf-8") as f:
+        for r in records:
+            line = {key: r[key] for key in ("file", "status", "pages", "cached")}
+            line["elapsed"] = round(r["elapsed"], 3)
+            line.update(r["metrics"] or {})
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def run_json(args, paths, cache_dir):
+    if not args.store:
+        os.makedirs(args.output, exist_ok=True)
+    records = []
+    for record in run_batch(paths, args.workers, cache_dir, args.limits):
+        records.append(record)
+        output_path = args.store or write_result(args.output, record)
+        if record["status"] != "ok":
+            print(f"❌ {record['file']} ({record['status']}): {record['error']}")
+        elif not record["result"]["outline"]:
+            print(f"⚠️ {record['file']}: no outline found")
+        else:
+            source = "cache" if record["cached"] else f"{record['elapsed']:.2f}s"
+            print(f"✔ {record['file']} → {output_path} ({source})")
+        budget = record["result"].get("budget")
+        if budget and (budget["degraded"] or budget["skipped"]):
+            print(f"⏳ {record['file']}: {len(budget['degraded'])} pages degraded, "
+                  f"{len(budget['skipped'])} skipped to stay within budget")
+    if args.store:
+        # NumPy is only needed for the store, so plain JSON runs start without it
+        from pdf_extract_kit.core.store import write_store
+        write_store(args.store, [(r["file"], r["result"]) for r in records])
+        print(f"🗄️ {len(records)} outlines stored in {args.store}")
+    return records
+
+
+def run_ndjson(args, paths, cache_dir, out):
+    """In-process runs stream page by page; pooled runs stream file by file."""
+    records = []
+    if args.workers == 1:
+        for path in paths:
+            for record in stream_file(path, cache_dir, args.limits):
+                write_ndjson(out, [record])
+            records.append({key: record[key] for key in ("file", "pages", "status", "cached", "elapsed", "metrics")})
+    else:
+        for record in run_batch(paths, args.workers, cache_dir, args.limits):
+            write_ndjson(out, batch_records(record))
+            records.append(record)
+    return records
+
+
+def main():
+    args = parse_args()
+    cache_dir = None if args.no_cache else args.cache_dir
+    paths = list_pdfs(args.input)
+
+    # With NDJSON on stdout, status lines move to stderr to keep the stream clean
+    to_stdout = args.ndjson == "-"
+    stdout = sys.stdout
+    with redirect_stdout(sys.stderr if to_stdout else sys.stdout):
+        if args.clear_cache:
+            print(f"🗑 Cleared {invalidate(args.cache_dir)} cached outlines")
+        print(f"📄 Processing {len(paths)} PDFs with {args.workers or os.cpu_count()} workers")
+
+        start = time.perf_counter()
+        if args.ndjson:
+            out = stdout if to_stdout else open(args.ndjson, "w", encoding="utf-8")
+            try:
+                records = run_ndjson(args, paths, cache_dir, out)
+            finally:
+                if not to_stdout:
+                    out.close()
+        else:
+            records = run_json(args, paths, cache_dir)
+
+        elapsed = time.perf_counter() - start
+        stats = summarize(records, elapsed)
+        print(
+            f"📊 {stats['files']} files, {stats['pages']} pages in {stats['elapsed']}s "
+            f"({stats['files_per_sec']} files/s, {stats['pages_per_sec']} pages/s, {stats['cached']} cached, {stats['failed']} failed)"
+        )
+        if args.metrics:
+            write_metrics(args, records, elapsed)
+            print(f"📈 Metrics written to {args.metrics}")
+
+
+if __name__ == "__main__":
+    main()
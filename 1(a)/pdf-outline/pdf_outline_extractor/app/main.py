@@ -3,32 +3,33 @@ import sys
 import fitz  # PyMuPDF
 import json
 
-from pytesseract import image_to_string
-from PIL import Image
 import re
 
 # Ensure local import works
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from pdf_extract_kit.core.extractor import extract_outline as process_pdf
+from pdf_extract_kit.core.extractor import process_pdf
+from pdf_extract_kit.core import ocr
+from pdf_extract_kit.core.pages import build_page_model
+from pdf_extract_kit.core.lang import detect_ocr_lang
 
 
-from utils import is_scanned_pdf
+from utils import is_scanned_pdf, scanned_page_numbers
 
 
 INPUT_DIR = "/app/input"
 OUTPUT_DIR = "/app/output"
 
 
-def extract_outline_with_pdfkit(pdf_path):
+def extract_outline_with_pdfkit(pdf_path, doc=None, pages=None):
     try:
-        result = process_pdf(pdf_path)
+        result = process_pdf(pdf_path, doc, pages)
         outline = []
-        for h in result.get("headings", []):
+        for h in result.get("outline", []):
             outline.append({
                 "level": h.get("level", "").upper(),
                 "text": h.get("text", "").strip(),
-                "page": h.get("page_num", -1)
+                "page": h.get("page", -1)
             })
         title = result.get("title", "Untitled Document")
         return {"title": title, "outline": outline}
@@ -36,19 +37,19 @@ def extract_outline_with_pdfkit(pdf_path):
         return {"error": f"PDF-Extract-Kit failed: {str(e)}", "outline": []}
 
 
-def extract_outline_with_ocr(doc):
+def extract_outline_with_ocr(doc, page_numbers=None):
+    """OCRs the given 0-based pages (all pages by default)."""
     print("🔍 Extracting using OCR + heuristic heading patterns...")
     outline = []
 
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        pix = page.get_pixmap(dpi=300)
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    if page_numbers is None:
+        page_numbers = range(len(doc))
 
-        try:
-            text = image_to_string(img, lang="fra+eng")  # Add other langs if needed
-        except Exception as e:
-            print(f"⚠️ OCR failed on page {page_num + 1}: {e}")
+    # Smallest language set for this document instead of a fixed pack
+    lang = detect_ocr_lang(doc, page_numbers)
+    for page_num, text in ocr.ocr_pages(doc, page_numbers, lang=lang):
+        if isinstance(text, Exception):
+            print(f"⚠️ OCR failed on page {page_num + 1}: {text}")
             continue
 
         lines = text.split("\n")
@@ -73,18 +74,27 @@ def extract_outline_with_ocr(doc):
 
 def extract_outline(pdf_path):
     doc = fitz.open(pdf_path)
+    # Parse every page once; the scanned check, PDF-Extract-Kit and the
+    # OCR page selection below all read from this model
+    pages = build_page_model(doc)
 
     # Use OCR directly if scanned
-    if is_scanned_pdf(doc):
-        return extract_outline_with_ocr(doc)
+    if is_scanned_pdf(pages):
+        return extract_outline_with_ocr(doc, scanned_page_numbers(pages))
 
-    # Try PDF-Extract-Kit first
-    result = extract_outline_with_pdfkit(pdf_path)
+    # PDF-Extract-Kit reads the text pages and OCRs image-only pages itself
+    result = extract_outline_with_pdfkit(pdf_path, doc, pages)
+    if result.get("error"):
+        print(f"⚠️ {result['error']}. Falling back to OCR...")
+        return extract_outline_with_ocr(doc)
 
-    # If outline is empty, fallback to OCR
+    # If outline is empty, OCR only the scanned pages; text pages were
+    # already read from the text layer and would yield nothing new
     if not result.get("outline"):
-        print("⚠️ No outline found with PDF-Extract-Kit. Falling back to OCR...")
-        return extract_outline_with_ocr(doc)
+        scanned = scanned_page_numbers(pages)
+        if scanned:
+            print(f"⚠️ No outline found with PDF-Extract-Kit. OCR'ing {len(scanned)} scanned pages...")
+            return extract_outline_with_ocr(doc, scanned)
 
     return result
 
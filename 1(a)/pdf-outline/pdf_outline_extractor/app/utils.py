@@ -1,22 +1,22 @@
 import os
 import json
-import pytesseract
 import re
-import numpy as np
-from PIL import Image
 import fitz  # PyMuPDF
-from sklearn.cluster import KMeans
+from pdf_extract_kit.core import ocr
+from pdf_extract_kit.core.lang import detect_ocr_lang
 
 def save_json(data, filename, output_dir="/app/output"):
     os.makedirs(output_dir, exist_ok=True)
     with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
         json.dump(data, f, indent=4, ensure_ascii=False)
 
-def is_scanned_pdf(doc):
-    for page in doc:
-        if page.get_text("text").strip():
-            return False
-    return True
+def is_scanned_pdf(pages):
+    """True if no page in the page model has a text layer."""
+    return all(page["empty"] for page in pages)
+
+def scanned_page_numbers(pages):
+    """0-based numbers of the image-only pages that need OCR."""
+    return [page["number"] - 1 for page in pages if page["scanned"]]
 
 def is_heading_candidate(text):
     # Regex-based heuristic
@@ -31,13 +31,18 @@ def is_heading_candidate(text):
 def extract_text_blocks_with_ocr(doc):
     """Returns block-wise text + bounding boxes"""
     blocks = []
-    for page_num, page in enumerate(doc):
-        pix = page.get_pixmap(dpi=300)
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        # data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
-        MULTI_LANG = "eng+hin+deu+fra"  # You can extend this
+    # Detected per document (e.g. "eng" or "hin+eng") rather than
+    # loading all of eng+hin+deu+fra for every page
+    lang = detect_ocr_lang(doc)
 
-        data = pytesseract.image_to_data(img, lang=MULTI_LANG, output_type=pytesseract.Output.DICT)
+    # Persistent OCR workers; page N+1 is rendered while page N is recognised
+    for page_num, tsv in ocr.ocr_pages(doc, range(len(doc)), lang=lang, mode="tsv"):
+        if isinstance(tsv, Exception):
+            print(f"⚠️ OCR failed on page {page_num + 1}: {tsv}")
+            continue
+        data = ocr.parse_tsv(tsv)
+        if not data:
+            continue
 
 
         n = len(data["text"])
@@ -56,18 +61,20 @@ def extract_text_blocks_with_ocr(doc):
     return blocks
 
 def cluster_headings(blocks):
-    """Cluster based on visual size (height + top)"""
+    """Cluster based on visual size (height), tallest cluster = H1"""
     candidates = [b for b in blocks if is_heading_candidate(b["text"])]
     if not candidates:
         return []
 
-    X = np.array([[b["height"]] for b in candidates])
-    k = min(3, len(set([b["height"] for b in candidates])))  # Avoid too many clusters
-    kmeans = KMeans(n_clusters=k, n_init="auto").fit(X)
+    # Imported on first use so NumPy stays out of the import-time path
+    from pdf_extract_kit.core.clustering import size_levels
+
+    heights = [b["height"] for b in candidates]
+    levels = size_levels(heights, 3)  # Avoid too many clusters
 
     clustered = []
     for i, block in enumerate(candidates):
-        level = f"H{1 + (kmeans.labels_[i])}"
+        level = f"H{1 + levels[i]}"
         clustered.append({
             "level": level,
             "text": block["text"],
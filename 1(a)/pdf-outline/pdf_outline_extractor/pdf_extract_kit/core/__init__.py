@@ -1,3 +1,12 @@
+import os
+
+# Only the extractor lives here: ocr, pages, raster, lang, metrics and
+# clustering are the 1(a) kit's own modules, found through this package's
+# path so the two cannot drift apart. PDF_EXTRACT_KIT_CORE points at the
+# kit's core directory when it is not four levels up (e.g. in Docker).
+__path__.append(os.environ.get("PDF_EXTRACT_KIT_CORE") or os.path.abspath(
+    os.path.join(os.path.dirname(__file__), *[os.pardir] * 4, "pdf_extract_kit", "core")))
+
 # Optional: could expose extractors here
 # from pdf_extract_kit.core.extractor import process_pdf
 
@@ -1,37 +1,31 @@
 import fitz  # PyMuPDF
 import re
-import numpy as np
-import pytesseract
-from PIL import Image
-from pdf2image import convert_from_path
-from sklearn.cluster import KMeans
+
+from pdf_extract_kit.core import ocr, metrics
+from pdf_extract_kit.core.pages import build_page_model
+from pdf_extract_kit.core.lang import detect_ocr_lang
 
 
 MIN_WORDS = 1
 MAX_WORDS = 14
 
 
-def extract_text_blocks(doc):
+def extract_text_blocks(pages):
     blocks = []
-    for page_num, page in enumerate(doc, start=1):
-        if not page.get_text("text").strip():
-            continue  # skip empty pages (for OCR fallback)
-        blocks_raw = page.get_text("dict")["blocks"]
-        for block in blocks_raw:
-            for line in block.get("lines", []):
-                spans = line.get("spans", [])
-                if not spans:
-                    continue
-                main_span = spans[0]
-                text = main_span["text"].strip()
-                if not text or len(text.split()) > MAX_WORDS:
-                    continue
-                blocks.append({
-                    "text": text,
-                    "font_size": main_span["size"],
-                    "bold": bool(main_span["flags"] & 2),
-                    "page": page_num
-                })
+    for page in pages:
+        if page["empty"]:
+            continue  # scanned pages are OCR'd separately
+        for line in page["lines"]:
+            main_span = line["spans"][0]
+            text = main_span["text"].strip()
+            if not text or len(text.split()) > MAX_WORDS:
+                continue
+            blocks.append({
+                "text": text,
+                "font_size": main_span["size"],
+                "bold": bool(main_span["flags"] & 2),
+                "page": page["number"]
+            })
     return blocks
 
 
@@ -58,23 +52,17 @@ def filter_heading_candidates(blocks):
 def cluster_headings(blocks):
     if len(blocks) < 2:
         return []
-    font_sizes = np.array([[b["font_size"]] for b in blocks])
-    k = min(4, len(set(fs[0] for fs in font_sizes)))
-    if k < 1:
-        return []
-    kmeans = KMeans(n_clusters=k, random_state=0, n_init=10)
-    labels = kmeans.fit_predict(font_sizes)
-    cluster_order = sorted(
-        [(label, kmeans.cluster_centers_[label][0]) for label in set(labels)],
-        key=lambda x: -x[1]
-    )
-    level_map = {label: f"H{i+1}" for i, (label, _) in enumerate(cluster_order)}
+    # Imported on first use so NumPy stays out of the import-time path
+    from pdf_extract_kit.core.clustering import size_levels
+
+    font_sizes = [b["font_size"] for b in blocks]
+    # Exact 1-D clustering: same sizes always map to the same H1–H4 levels
+    levels = size_levels(font_sizes, 4)
 
     result = []
     for idx, b in enumerate(blocks):
-        level = level_map[labels[idx]]
         result.append({
-            "level": level,
+            "level": f"H{levels[idx] + 1}",
             "text": b["text"],
             "page": b["page"]
         })
@@ -92,10 +80,10 @@ def deduplicate(headings):
     return output
 
 
-def extract_title_from_doc(doc):
+def extract_title(pages):
     lines = []
-    for line in doc[0].get_text("text").split("\n"):
-        cleaned = line.strip()
+    for line in pages[0]["lines"]:
+        cleaned = line["text"].strip()
         if 6 < len(cleaned) < 100:
             lines.append(cleaned)
         if len(lines) >= 3:
@@ -103,46 +91,68 @@ def extract_title_from_doc(doc):
     return " ".join(lines).strip() or "Untitled PDF"
 
 
-def process_pdf(path):
-    doc = fitz.open(path)
-    text_blocks = extract_text_blocks(doc)
+def ocr_page_blocks(text, page_num):
+    blocks = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line or len(line.split()) > MAX_WORDS or len(line) < 4:
+            continue
+        if re.search(r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}", line):
+            continue
+        if re.match(r"^[A-Z \d:\.\-\(\)]+$", line) or re.match(r"^\d+(\.\d+)*\s", line):
+            blocks.append({
+                "text": line,
+                "page": page_num,
+                "font_size": 12.0,
+                "bold": False
+            })
+    return blocks
 
-    if text_blocks:
-        candidates = filter_heading_candidates(text_blocks)
-        clustered = cluster_headings(candidates)
-        cleaned = deduplicate(clustered)
-        if cleaned:
-            return {
-                "title": extract_title_from_doc(doc),
-                "outline": cleaned
-            }
-
-    # OCR fallback
-    print("⚠️ No outline found with PDF-Extract-Kit. Falling back to OCR...")
-
-    images = convert_from_path(path, dpi=300)
+
+def ocr_scanned_pages(doc, pages):
+    """OCRs only the pages the model flags as scanned; text pages are never rendered.
+
+    Pages go through the persistent OCR workers, rendering the next page
+    while the previous one is being recognised.
+    """
+    scanned = [page["number"] - 1 for page in pages if page["scanned"]]
+    if not scanned:
+        return []
+    lang = detect_ocr_lang(doc, scanned, pages)
     ocr_blocks = []
-    for page_num, img in enumerate(images, start=1):
-        text = pytesseract.image_to_string(img)
-        for line in text.split("\n"):
-            line = line.strip()
-            if not line or len(line.split()) > MAX_WORDS or len(line) < 4:
-                continue
-            if re.search(r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}", line):
-                continue
-            if re.match(r"^[A-Z \d:\.\-\(\)]+$", line) or re.match(r"^\d+(\.\d+)*\s", line):
-                ocr_blocks.append({
-                    "text": line,
-                    "page": page_num,
-                    "font_size": 12.0,
-                    "bold": False
-                })
-
-    candidates = filter_heading_candidates(ocr_blocks)
-    clustered = cluster_headings(candidates)
-    cleaned = deduplicate(clustered)
+    for page_num, text in ocr.ocr_pages(doc, scanned, lang=lang):
+        if isinstance(text, Exception):
+            print(f"⚠️ OCR failed on page {page_num + 1}: {text}")
+            continue
+        ocr_blocks.extend(ocr_page_blocks(text, page_num + 1))
+    return ocr_blocks
+
+
+def process_pdf(path, doc=None, pages=None):
+    """Extracts the outline, reusing an already opened doc and page model if given."""
+    if doc is None:
+        with metrics.timer("open"):
+            doc = fitz.open(path)
+    if pages is None:
+        pages = build_page_model(doc)
+    with metrics.timer("text_blocks"):
+        text_blocks = extract_text_blocks(pages)
+
+    outline = []
+    if text_blocks:
+        with metrics.timer("headings"):
+            candidates = filter_heading_candidates(text_blocks)
+        outline = deduplicate(cluster_headings(candidates))
+
+    # Page-level OCR fallback: scanned pages in a mixed PDF are OCR'd on
+    # their own and merged with the headings from the text pages.
+    ocr_blocks = ocr_scanned_pages(doc, pages)
+    if ocr_blocks:
+        candidates = filter_heading_candidates(ocr_blocks)
+        outline = deduplicate(outline + cluster_headings(candidates))
+        outline.sort(key=lambda h: h["page"])
+
     return {
-        "title": "OCR-Detected Headings",
-        "outline": cleaned
+        "title": extract_title(pages) if text_blocks else "OCR-Detected Headings",
+        "outline": outline
     }
-
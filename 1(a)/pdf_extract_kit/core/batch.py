@@ -0,0 +1,177 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz  # PyMuPDF
+
+from pdf_extract_kit.core import metrics, ocr
+from pdf_extract_kit.core.extractor import extract_outline, iter_outline, outline_records
+from pdf_extract_kit.core.cache import cached_extract_outline, cached_iter_outline
+
+
+EMPTY_RESULT = {"title": "Untitled", "outline": []}
+
+
+def list_pdfs(input_dir):
+    return sorted(
+        os.path.join(input_dir, name)
+        for name in os.listdir(input_dir)
+        if name.lower().endswith(".pdf")
+    )
+
+
+def page_count(path):
+    """Page count for reporting only; 0 when PyMuPDF cannot open the file."""
+    try:
+        with fitz.open(path) as doc:
+            return doc.page_count
+    except Exception:
+        return 0
+
+
+def process_one(path, cache_dir=None, limits=None):
+    """Runs extract_outline on one PDF and never raises.
+
+    Returns a record with the file name, status, result, page count,
+    elapsed seconds and per-stage metrics so the parent can stream it out
+    as soon as it lands. With a cache_dir, unchanged PDFs are served from
+    the outline cache. ``limits`` ({"deadline_s", "max_pages"}) put each
+    document on a latency budget (see extract_outline).
+    """
+    start = time.perf_counter()
+    record = {"file": os.path.basename(path), "status": "ok", "error": None, "pages": 0, "cached": False}
+    with metrics.collect() as stats:
+        try:
+            # Files PyMuPDF cannot open still go through extract_outline's OCR fallback
+            if cache_dir:
+                record["result"], record["cached"] = cached_extract_outline(path, cache_dir, limits=limits)
+            else:
+                record["result"] = extract_outline(path, **(limits or {}))
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+            record["result"] = dict(EMPTY_RESULT)
+    record["pages"] = page_count(path)
+    record["elapsed"] = time.perf_counter() - start
+    record["metrics"] = metrics.rounded(stats)
+    return record
+
+
+def _crashed(path, error):
+    return {
+        "file": os.path.basename(path),
+        "status": "crashed",
+        "error": error,
+        "pages": 0,
+        "cached": False,
+        "result": dict(EMPTY_RESULT),
+        "elapsed": 0.0,
+        "metrics": None,
+    }
+
+
+def _run_pool(paths, workers, cache_dir, limits=None):
+    """Yields records as workers finish, plus the paths lost to a dead pool."""
+    lost = []
+    # Each worker runs its own OCR pool; together they share the CPUs
+    with ProcessPoolExecutor(max_workers=workers, initializer=ocr.share_cpus, initargs=(workers,)) as pool:
+        futures = {pool.submit(process_one, p, cache_dir, limits): p for p in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result(), None
+            except BrokenProcessPool:
+                lost.append(futures[future])
+    for path in lost:
+        yield None, path
+
+
+def run_batch(paths, workers=None, cache_dir=None, limits=None):
+    """Processes PDFs on a process pool, yielding one record per file as it finishes.
+
+    A worker that dies hard (segfault, OOM kill) takes the whole pool down
+    with it, so every file still in flight is retried alone in a fresh
+    single-worker pool; only the file that crashes again is reported as
+    ``crashed``.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for path in paths:
+            yield process_one(path, cache_dir, limits)
+        return
+
+    suspects = []
+    for record, lost in _run_pool(paths, workers, cache_dir, limits):
+        if record is not None:
+            yield record
+        else:
+            suspects.append(lost)
+
+    for path in suspects:
+        try:
+            for record, lost in _run_pool([path], 1, cache_dir, limits):
+                yield record if record is not None else _crashed(path, "worker process died")
+        except Exception as e:
+            yield _crashed(path, str(e))
+
+
+def summarize(records, elapsed):
+    files = len(records)
+    pages = sum(r["pages"] for r in records)
+    failed = sum(1 for r in records if r["status"] != "ok")
+    cached = sum(1 for r in records if r["cached"])
+    return {
+        "files": files,
+        "failed": failed,
+        "cached": cached,
+        "pages": pages,
+        "elapsed": round(elapsed, 3),
+        "files_per_sec": round(files / elapsed, 2) if elapsed else 0.0,
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def stream_file(path, cache_dir=None, limits=None):
+    """Streams one PDF as NDJSON-ready records, page by page, and never raises.
+
+    Every record carries the file name; the last one is a ``done`` record
+    with the status, heading count, whether it came from the cache, elapsed
+    seconds and metrics.
+    """
+    name = os.path.basename(path)
+    start = time.perf_counter()
+    done = {"type": "done", "file": name, "status": "ok", "error": None, "pages": 0, "headings": 0, "cached": False}
+    with metrics.collect() as stats:
+        try:
+            if cache_dir:
+                records = cached_iter_outline(path, cache_dir, limits=limits, hit=done)
+            else:
+                records = iter_outline(path, **(limits or {}))
+            for record in records:
+                if record["type"] == "heading":
+                    done["headings"] += 1
+                yield dict(record, file=name)
+        except Exception as e:
+            done["status"] = "error"
+            done["error"] = str(e)
+    done["pages"] = page_count(path)
+    done["elapsed"] = round(time.perf_counter() - start, 3)
+    done["metrics"] = metrics.rounded(stats)
+    yield done
+
+
+def batch_records(record):
+    """NDJSON records for a finished run_batch record."""
+    for r in outline_records(record["result"]):
+        yield dict(r, file=record["file"])
+    yield {
+        "type": "done",
+        "file": record["file"],
+        "status": record["status"],
+        "error": record["error"],
+        "pages": record["pages"],
+        "headings": len(record["result"]["outline"]),
+        "cached": record["cached"],
+        "elapsed": round(record["elapsed"], 3),
+        "metrics": record["metrics"]
+    }
@@ -0,0 +1,99 @@
+import os
+import math
+import time
+
+
+# Defaults for --deadline / --max-pages; unset means no budget
+DEADLINE_S = float(os.environ.get("OUTLINE_DEADLINE_S", 0)) or None
+MAX_PAGES = int(os.environ.get("OUTLINE_MAX_PAGES", 0)) or None
+# Render DPI once full-resolution OCR no longer fits the deadline
+LOW_DPI = int(os.environ.get("BUDGET_LOW_DPI", 100))
+# Share of a full-DPI OCR page a LOW_DPI page is assumed to cost. Fewer
+# pixels, but Tesseract's per-page overhead does not shrink with them.
+LOW_DPI_COST = 0.5
+
+# OCR modes, from best to cheapest
+FULL = "full"
+LOW_DPI_MODE = "low_dpi"
+SAMPLED = "sampled"
+TEXT_ONLY = "text_only"
+
+
+def start(deadline_s=None, max_pages=None, page_count=0):
+    """Starts the budget of one document, or returns None when there is none.
+
+    ``deadline_s`` is wall time from now for the whole document and
+    ``max_pages`` the number of pages parsed at all. The returned dict is
+    what the extractor updates as it goes and what ends up, summarized, in
+    the result's "budget" field.
+    """
+    if deadline_s is None and max_pages is None:
+        return None
+    return {
+        "deadline_s": deadline_s,
+        "max_pages": max_pages,
+        "start": time.perf_counter(),
+        "pages": min(page_count, max_pages) if max_pages else page_count,
+        "done": 0,
+        "scanned": 0,
+        "degraded": [],
+        "skipped": [],
+    }
+
+
+def elapsed(budget):
+    return time.perf_counter() - budget["start"]
+
+
+def remaining(budget):
+    """Seconds left before the deadline (None without one)."""
+    if budget["deadline_s"] is None:
+        return None
+    return budget["deadline_s"] - elapsed(budget)
+
+
+def ocr_mode(budget):
+    """Picks how to OCR the next scanned page: (mode, dpi, stride).
+
+    The cost of the pages still to come, including those still in OCR, is
+    projected from the average wall time per finished page so far.
+    Full-resolution OCR is kept while that fits
+    the time left, then LOW_DPI, then only every stride-th scanned page at
+    LOW_DPI, and once the deadline has passed no OCR at all.
+    """
+    left = remaining(budget)
+    if left is None:
+        return FULL, None, 1
+    if left <= 0:
+        return TEXT_ONLY, None, 0
+    if not budget["done"]:
+        return FULL, None, 1
+    needed = elapsed(budget) / budget["done"] * (budget["pages"] - budget["done"])
+    if needed <= left:
+        return FULL, None, 1
+    if needed * LOW_DPI_COST <= left:
+        return LOW_DPI_MODE, LOW_DPI, 1
+    return SAMPLED, LOW_DPI, math.ceil(needed * LOW_DPI_COST / left)
+
+
+def degrade(budget, page_number, mode, dpi=None):
+    budget["degraded"].append({"page": page_number, "mode": mode, "dpi": dpi})
+
+
+def skip(budget, page_number, reason):
+    # A degraded page whose OCR then missed the deadline counts as skipped only
+    if budget["degraded"] and budget["degraded"][-1]["page"] >= page_number:
+        budget["degraded"] = [d for d in budget["degraded"] if d["page"] != page_number]
+    budget["skipped"].append({"page": page_number, "reason": reason})
+
+
+def summary(budget):
+    """The "budget" field of a result: limits, time used and every page that lost OCR quality."""
+    return {
+        "deadline_s": budget["deadline_s"],
+        "max_pages": budget["max_pages"],
+        "elapsed_s": round(elapsed(budget), 3),
+        "degraded": budget["degraded"],
+        # In-flight pages that miss the deadline are only known when collected
+        "skipped": sorted(budget["skipped"], key=lambda s: s["page"]),
+    }
@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import hashlib
+
+from pdf_extract_kit.core.extractor import (
+    EXTRACTOR_VERSION, extraction_settings, extract_outline, iter_outline, outline_records, collect_outline
+)
+
+
+CACHE_DIR = os.environ.get("OUTLINE_CACHE_DIR", "/app/cache")
+CACHE_MAX_BYTES = int(os.environ.get("OUTLINE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+CHUNK_SIZE = 1024 * 1024
+# A full cache is evicted down to this share of its limit, so the puts right
+# after an eviction do not each walk the tree again
+EVICT_TO = 0.9
+
+# Bytes each cache directory holds, as far as this process knows: walked
+# once, then counted up on every put, so the tree is only walked again when
+# the count passes the limit. Entries written by other workers are picked up
+# at that walk.
+_totals = {}
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(digest, settings=None):
+    """Combines the PDF content digest with the extractor version and settings.
+
+    ``settings`` defaults to the kit's current extraction_settings(), so a
+    changed OCR backend or language never serves an outline made without it.
+    """
+    if settings is None:
+        settings = extraction_settings()
+    h = hashlib.sha256()
+    h.update(digest.encode())
+    h.update(EXTRACTOR_VERSION.encode())
+    h.update(json.dumps(settings, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + ".json")
+
+
+def _entries(cache_dir):
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = []
+    for shard in os.listdir(cache_dir):
+        shard_dir = os.path.join(cache_dir, shard)
+        if not os.path.isdir(shard_dir):
+            continue
+        for name in os.listdir(shard_dir):
+            if name.endswith(".json"):
+                path = os.path.join(shard_dir, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue  # evicted by another worker
+                entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+
+def get(cache_dir, key):
+    path = _entry_path(cache_dir, key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    try:
+        os.utime(path)  # mark as recently used for eviction
+    except FileNotFoundError:
+        pass
+    return result
+
+
+def put(cache_dir, key, result, max_bytes=CACHE_MAX_BYTES):
+    path = _entry_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+    os.replace(tmp_path, path)  # atomic, safe with concurrent workers
+    if cache_dir in _totals:
+        _totals[cache_dir] += os.path.getsize(path)
+    else:
+        _totals[cache_dir] = sum(size for _, size, _ in _entries(cache_dir))
+    if _totals[cache_dir] > max_bytes:
+        evict(cache_dir, int(max_bytes * EVICT_TO))
+
+
+def evict(cache_dir, max_bytes=CACHE_MAX_BYTES):
+    """Deletes least recently used entries until the cache fits in max_bytes."""
+    entries = sorted(_entries(cache_dir))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    _totals[cache_dir] = total
+    return removed
+
+
+def invalidate(cache_dir, pdf_paths=None):
+    """Drops the entries for the given PDFs, or the whole cache if none are given.
+
+    Entries another worker evicts meanwhile are skipped, not counted.
+    """
+    _totals.pop(cache_dir, None)
+    if pdf_paths is None:
+        return sum(_remove(path) for _, _, path in _entries(cache_dir))
+
+    # Entries are keyed on content + settings, so match on the content digest
+    # recorded next to each result.
+    digests = {file_digest(p) for p in pdf_paths}
+    removed = 0
+    for _, _, path in _entries(cache_dir):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                digest = json.load(f).get("_cache", {}).get("digest")
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue
+        if digest in digests:
+            removed += _remove(path)
+    return removed
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return 0  # evicted by another worker
+    return 1
+
+
+def stats(cache_dir):
+    entries = _entries(cache_dir)
+    return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries)}
+
+
+def cached_extract_outline(path, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, settings=None, limits=None):
+    """extract_outline backed by the on-disk cache. Returns (result, hit).
+
+    ``limits`` ({"deadline_s", "max_pages"}) are passed to extract_outline
+    on a miss. A hit is served whatever the limits; a result that lost
+    pages to them, or to failed OCR, is not stored, so it never stands in
+    for a full outline and a later run retries the OCR.
+    """
+    digest = file_digest(path)
+    key = cache_key(digest, settings)
+    entry = get(cache_dir, key)
+    if entry is not None:
+        entry.pop("_cache", None)
+        return entry, True
+
+    result = extract_outline(path, **(limits or {}))
+    if not _incomplete(result):
+        _store(cache_dir, key, digest, result, max_bytes)
+    return result, False
+
+
+def cached_iter_outline(path, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, settings=None, limits=None, hit=None):
+    """iter_outline backed by the cache (``limits`` as in cached_extract_outline).
+
+    A hit replays the stored outline; a miss streams live records and stores
+    the outline once the last page is done. ``hit``, a dict if given, gets
+    "cached": whether the records come from the cache.
+    """
+    digest = file_digest(path)
+    key = cache_key(digest, settings)
+    entry = get(cache_dir, key)
+    if hit is not None:
+        hit["cached"] = entry is not None
+    if entry is not None:
+        entry.pop("_cache", None)
+        yield from outline_records(entry)
+        return
+
+    records = []
+    for record in iter_outline(path, **(limits or {})):
+        records.append(record)
+        yield record
+    result = collect_outline(records)
+    if not _incomplete(result):
+        _store(cache_dir, key, digest, result, max_bytes)
+
+
+def _incomplete(result):
+    """True for an outline that lost pages to a budget or to failed OCR; it is never stored."""
+    budget = result.get("budget")
+    return bool(result.get("ocr_failed") or budget and (budget["degraded"] or budget["skipped"]))
+
+
+def _store(cache_dir, key, digest, result, max_bytes):
+    stored = dict(result, _cache={"digest": digest, "version": EXTRACTOR_VERSION})
+    try:
+        put(cache_dir, key, stored, max_bytes)
+    except OSError as e:
+        print(f"⚠️ Could not write outline cache: {e}", file=sys.stderr)
+
+
+def main(argv):
+    """python -m pdf_extract_kit.core.cache [--dir DIR] {stats|clear|invalidate PDF...|evict}"""
+    cache_dir = CACHE_DIR
+    if len(argv) >= 2 and argv[0] == "--dir":
+        cache_dir, argv = argv[1], argv[2:]
+    command = argv[0] if argv else "stats"
+
+    if command == "stats":
+        print(json.dumps(stats(cache_dir)))
+    elif command == "clear":
+        print(f"🗑 Removed {invalidate(cache_dir)} cached outlines from {cache_dir}")
+    elif command == "invalidate" and len(argv) > 1:
+        print(f"🗑 Removed {invalidate(cache_dir, argv[1:])} cached outlines for {len(argv) - 1} PDFs")
+    elif command == "evict":
+        print(f"🗑 Evicted {evict(cache_dir)} cached outlines")
+    else:
+        print(main.__doc__)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,68 @@
+import numpy as np
+
+from pdf_extract_kit.core import metrics
+
+
+def kmeans_1d(values, k):
+    """Exact, deterministic 1-D k-means by dynamic programming.
+
+    In one dimension the optimal clusters are contiguous runs of the sorted
+    values, so the best split into k runs can be found exactly (Wang & Song,
+    "Ckmeans.1d.dp"). The DP runs over the distinct values weighted by their
+    counts; font sizes in a document have a few dozen distinct values at
+    most, which makes this far cheaper than randomised KMeans restarts.
+
+    Returns (labels, centers): labels[i] is the cluster of values[i], and
+    clusters are numbered by ascending center.
+    """
+    x = np.asarray(values, dtype=float).ravel()
+    if x.size == 0:
+        return np.zeros(0, dtype=int), np.zeros(0)
+    uniq, inverse, counts = np.unique(x, return_inverse=True, return_counts=True)
+    m = len(uniq)
+    k = max(1, min(k, m))
+
+    # Prefix sums give the SSE of any run uniq[i..j] in O(1)
+    w = counts.astype(float)
+    cw = np.concatenate(([0.0], np.cumsum(w)))
+    cs = np.concatenate(([0.0], np.cumsum(w * uniq)))
+    css = np.concatenate(([0.0], np.cumsum(w * uniq * uniq)))
+    i = np.arange(m)[:, None]
+    j = np.arange(m)[None, :]
+    valid = j >= i
+    n = np.where(valid, cw[j + 1] - cw[i], 1.0)
+    s = cs[j + 1] - cs[i]
+    cost = np.where(valid, css[j + 1] - css[i] - s * s / n, np.inf)
+    cost = np.maximum(cost, 0.0)  # clip float noise on single-value runs
+
+    # best[j]: lowest SSE covering uniq[0..j] with the current number of runs
+    best = cost[0].copy()
+    starts = np.zeros((k, m), dtype=int)
+    cols = np.arange(m)
+    for c in range(1, k):
+        # last run starts at t (1..j): best[t - 1] + cost[t, j]
+        candidates = best[:-1, None] + cost[1:, :]
+        t = np.argmin(candidates, axis=0)
+        best = candidates[t, cols]
+        starts[c] = t + 1
+
+    bounds = []
+    j = m - 1
+    for c in range(k - 1, 0, -1):
+        t = starts[c, j]
+        bounds.append(t)
+        j = t - 1
+    bounds = np.array(sorted(bounds), dtype=int)
+
+    uniq_labels = np.searchsorted(bounds, np.arange(m), side="right")
+    centers = np.array([
+        np.average(uniq[uniq_labels == c], weights=w[uniq_labels == c]) for c in range(k)
+    ])
+    return uniq_labels[inverse], centers
+
+
+def size_levels(values, max_levels):
+    """Heading level per value: 0 for the cluster with the largest size, then 1, 2, ..."""
+    with metrics.timer("clustering"):
+        labels, centers = kmeans_1d(values, max_levels)
+    return len(centers) - 1 - labels
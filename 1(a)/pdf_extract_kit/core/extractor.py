@@ -1,20 +1,62 @@
 import fitz  # PyMuPDF
-import pytesseract
-from pdf2image import convert_from_path
 import re
 import os
+import sys
+import itertools
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 
-def extract_text_blocks(doc):
+from pdf_extract_kit.core import ocr, metrics, budget as budgets
+from pdf_extract_kit.core.pages import build_page, iter_pages
+from pdf_extract_kit.core.raster import render_page, iter_path_rasters, RASTER_DPI, MAX_PIXELS
+from pdf_extract_kit.core.lang import detect_ocr_lang, MIN_SAMPLE_CHARS, OCR_LANG
+
+
+# Bump whenever a change alters the outline produced for the same PDF,
+# so cached results from the old extractor are no longer served.
+EXTRACTOR_VERSION = "0.7"
+
+
+def extraction_settings():
+    """Settings other than the PDF itself that change its outline, as cache keys use them.
+
+    With no OCR_LANG the language set is detected from the document, so it
+    follows from the PDF content the key already covers.
+    """
+    return {
+        "ocr_backend": ocr.OCR_BACKEND,
+        "ocr_lang": OCR_LANG or "auto",
+        # Render resolution of scanned pages changes what Tesseract reads
+        "raster_dpi": RASTER_DPI or "auto",
+        "raster_max_pixels": MAX_PIXELS,
+    }
+
+
+def classify_page(page):
+    """Returns "text", "scanned" (image-only, needs OCR) or "blank" for a page model."""
+    if not page["empty"]:
+        return "text"
+    if page["scanned"]:
+        return "scanned"
+    return "blank"
+
+
+def page_text_blocks(page):
     blocks = []
-    for page_num, page in enumerate(doc, start=1):
-        for block in page.get_text("dict")["blocks"]:
-            for line in block.get("lines", []):
-                line_text = " ".join([span["text"] for span in line["spans"]]).strip()
-                if line_text:
-                    blocks.append({
-                        "text": line_text,
-                        "page": page_num
-                    })
+    for line in page["lines"]:
+        line_text = " ".join([span["text"] for span in line["spans"]]).strip()
+        if line_text:
+            blocks.append({
+                "text": line_text,
+                "page": page["number"]
+            })
+    return blocks
+
+
+def extract_text_blocks(pages):
+    blocks = []
+    for page in pages:
+        blocks.extend(page_text_blocks(page))
     return blocks
 
 def heuristic_headings(blocks):
@@ -35,44 +77,227 @@ def heuristic_headings(blocks):
                 })
     return headings
 
-def ocr_fallback(pdf_path):
-    pages = convert_from_path(pdf_path, dpi=300)
+def ocr_text_headings(text, page_num):
     headings = []
-    for i, image in enumerate(pages):
-        text = pytesseract.image_to_string(image)
-        lines = text.split("\n")
-        for line in lines:
-            clean = line.strip()
-            if 4 < len(clean) < 120 and re.search(r'[A-Za-z]{3,}', clean):
-                if clean.isupper() or re.match(r'\d+\.\d+', clean):
-                    headings.append({
-                        "level": "H1",
-                        "text": clean,
-                        "page": i + 1
-                    })
+    for line in text.split("\n"):
+        clean = line.strip()
+        if 4 < len(clean) < 120 and re.search(r'[A-Za-z]{3,}', clean):
+            if clean.isupper() or re.match(r'\d+\.\d+', clean):
+                headings.append({
+                    "level": "H1",
+                    "text": clean,
+                    "page": page_num
+                })
     return headings
 
-def extract_title_from_doc(doc):
-    text = doc[0].get_text("text")
-    lines = [line.strip() for line in text.split("\n") if 6 < len(line.strip()) < 120]
+def ocr_page(page, page_num, dpi=None):
+    """Renders a single page and OCRs it, leaving every other page untouched."""
+    text = ocr.result(ocr.submit(render_page(page, dpi), detect_ocr_lang(page.parent)))
+    return ocr_text_headings(text, page_num)
+
+def ocr_fallback(pdf_path, failed=None):
+    """Whole-document OCR through poppler, one page rendered at a time.
+
+    Numbers of pages whose OCR failed are appended to ``failed``, if given.
+    """
+    headings = []
+    for i, text in ocr.ocr_rasters(iter_path_rasters(pdf_path), OCR_LANG or ocr.DEFAULT_LANG):
+        if isinstance(text, Exception):
+            print(f"⚠️ OCR failed on page {i + 1}: {text}", file=sys.stderr)
+            if failed is not None:
+                failed.append(i + 1)
+            continue
+        headings.extend(ocr_text_headings(text, i + 1))
+    return headings
+
+def extract_title(pages):
+    lines = [line["text"].strip() for line in pages[0]["lines"] if 6 < len(line["text"].strip()) < 120]
     return " ".join(lines[:3]) if lines else "Untitled PDF"
 
-def extract_outline(path):
+def extract_title_from_doc(doc):
+    return extract_title([build_page(doc[0])])
+
+def page_headings(doc, page):
+    """Headings of a single page: from the model for text pages, OCR for scanned ones."""
+    kind = classify_page(page)
+    if kind == "text":
+        with metrics.timer("text_blocks"):
+            blocks = page_text_blocks(page)
+        with metrics.timer("headings"):
+            return heuristic_headings(blocks)
+    if kind == "scanned":
+        try:
+            return ocr_page(doc[page["number"] - 1], page["number"])
+        except Exception as e:
+            print(f"⚠️ OCR failed on page {page['number']}: {e}", file=sys.stderr)
+    return []
+
+def iter_outline_from_pages(doc, pages, budget=None):
+    """Yields a title record, then heading records page by page.
+
+    ``pages`` may be a lazy iterator (see ``iter_pages``), in which case each
+    page model is dropped as soon as its headings are out and memory stays
+    flat regardless of page count.
+
+    With a ``budget`` (see ``budget.start``) only its first max_pages pages
+    are read, scanned pages are OCR'd at lower quality or not at all as the
+    deadline nears, and a last ``budget`` record lists the pages affected.
+    Pages whose OCR failed are listed in an ``ocr_failed`` record at the end.
+    """
+    pages = iter(pages)
+    if budget is not None and budget["max_pages"]:
+        pages = itertools.islice(pages, budget["max_pages"])
+    # The title comes from the first page with a text layer, so leading
+    # pages without one (covers, scans) are read ahead until there is one.
+    # Their models hold no lines; only a fully scanned document is read to
+    # the end here, and it gets the OCR title.
+    leading = []
+    for page in pages:
+        leading.append(page)
+        if not page["empty"]:
+            break
+    if leading and not leading[-1]["empty"]:
+        title = extract_title([leading[-1]])
+    else:
+        title = "OCR-Detected Headings"
+    yield {"type": "title", "title": title}
+
+    if not leading:
+        return
+
+    # Scanned pages are rendered here and OCR'd on the persistent workers, so
+    # the next pages are parsed/rendered while earlier ones are still in OCR.
+    # Results are emitted strictly in page order.
+    pending = deque()
+    in_flight = 0
+    failed = []
+    lang = None
+    # Leading page models, kept (up to what language detection reads) until the language is known
+    parsed, parsed_chars = [], 0
+    for page in itertools.chain(leading, pages):
+        if lang is None and parsed_chars < MIN_SAMPLE_CHARS * 10:
+            parsed.append(page)
+            parsed_chars += sum(len(line["text"]) for line in page["lines"])
+        if classify_page(page) == "scanned":
+            mode, dpi, stride = budgets.ocr_mode(budget) if budget is not None else (budgets.FULL, None, 1)
+            if mode == budgets.TEXT_ONLY or (mode == budgets.SAMPLED and budget["scanned"] % stride):
+                budgets.skip(budget, page["number"], "deadline" if mode == budgets.TEXT_ONLY else "sampled")
+                pending.append((page["number"], []))
+            else:
+                # Language set is picked once per document, on its first scanned page
+                if lang is None:
+                    lang = detect_ocr_lang(doc, pages=parsed)
+                    parsed = None
+                raster = render_page(doc[page["number"] - 1], dpi)
+                pending.append((page["number"], ocr.submit(raster, lang)))
+                in_flight += 1
+                if mode != budgets.FULL:
+                    budgets.degrade(budget, page["number"], mode, dpi)
+            if budget is not None:
+                budget["scanned"] += 1
+        else:
+            pending.append((page["number"], page_headings(doc, page)))
+        while pending and (in_flight >= ocr.OCR_PREFETCH or _ready(pending[0][1])):
+            page_num, item = pending.popleft()
+            in_flight -= isinstance(item, Future)
+            yield from _heading_records(page_num, item, budget, failed)
+    while pending:
+        yield from _heading_records(*pending.popleft(), budget, failed)
+    if failed:
+        yield {"type": "ocr_failed", "pages": failed}
+
+    if budget is not None:
+        for n in range(budget["pages"] + 1, doc.page_count + 1):
+            budgets.skip(budget, n, "page_cap")
+        metrics.count("pages_degraded", len(budget["degraded"]))
+        metrics.count("pages_skipped", len(budget["skipped"]))
+        yield dict(budgets.summary(budget), type="budget")
+
+def _ready(item):
+    return not isinstance(item, Future) or item.done()
+
+def _heading_records(page_num, item, budget=None, failed=None):
+    if budget is not None:
+        budget["done"] += 1
+    if isinstance(item, Future):
+        # Past the deadline, a page still in OCR is given up on rather than waited for
+        left = budgets.remaining(budget) if budget is not None else None
+        try:
+            item = ocr_text_headings(ocr.result(item, None if left is None else max(left, 0)), page_num)
+        except FutureTimeout:
+            item.cancel()
+            budgets.skip(budget, page_num, "deadline")
+            item = []
+        except Exception as e:
+            print(f"⚠️ OCR failed on page {page_num}: {e}", file=sys.stderr)
+            if failed is not None:
+                failed.append(page_num)
+            item = []
+    for heading in item:
+        yield dict(heading, type="heading")
+
+def iter_outline(path, deadline_s=None, max_pages=None):
+    """Streaming counterpart of extract_outline: yields records as pages are processed."""
     try:
-        doc = fitz.open(path)
-        blocks = extract_text_blocks(doc)
-        headings = heuristic_headings(blocks)
-        if not headings:
-            raise ValueError("No headings detected, use OCR.")
-        return {
-            "title": extract_title_from_doc(doc),
-            "outline": headings
-        }
+        with metrics.timer("open"):
+            doc = fitz.open(path)
     except Exception:
-        ocr_headings = ocr_fallback(path)
-        return {
-            "title": "OCR-Detected Headings",
-            "outline": ocr_headings
-        }
+        metrics.count("fallback_full_ocr")
+        failed = []
+        result = {"title": "OCR-Detected Headings", "outline": ocr_fallback(path, failed)}
+        if failed:
+            result["ocr_failed"] = failed
+        yield from outline_records(result)
+        return
+    with doc:
+        budget = budgets.start(deadline_s, max_pages, doc.page_count)
+        yield from iter_outline_from_pages(doc, iter_pages(doc), budget)
+
+def outline_records(result):
+    """Turns a {"title", "outline"} result into the records iter_outline yields."""
+    yield {"type": "title", "title": result["title"]}
+    for heading in result["outline"]:
+        yield dict(heading, type="heading")
+    if "budget" in result:
+        yield dict(result["budget"], type="budget")
+    if "ocr_failed" in result:
+        yield {"type": "ocr_failed", "pages": result["ocr_failed"]}
+
+def collect_outline(records):
+    """Folds streamed records back into the {"title", "outline"} result."""
+    result = {"title": "Untitled PDF", "outline": []}
+    for record in records:
+        if record["type"] == "title":
+            result["title"] = record["title"]
+        elif record["type"] == "budget":
+            result["budget"] = {key: value for key, value in record.items() if key != "type"}
+        elif record["type"] == "ocr_failed":
+            result["ocr_failed"] = record["pages"]
+        else:
+            result["outline"].append({
+                "level": record["level"],
+                "text": record["text"],
+                "page": record["page"]
+            })
+    return result
+
+def extract_outline_from_pages(doc, pages):
+    """Builds the outline from an already parsed page model.
+
+    Text pages are read straight from the model; only pages flagged as
+    scanned are rendered and OCR'd. Headings come out in page order.
+    """
+    return collect_outline(iter_outline_from_pages(doc, pages))
+
+def extract_outline(path, deadline_s=None, max_pages=None):
+    """Parses each page once into the page model and extracts the outline from it.
 
+    The whole-document OCR fallback is kept only for files PyMuPDF cannot
+    open at all; it does not honour the budget.
 
+    ``deadline_s`` (seconds for the whole document) and ``max_pages`` put
+    it on a latency budget: OCR steps down from full resolution to
+    budget.LOW_DPI, then to sampled pages, then to the text layer only, and
+    the result gets a "budget" field listing degraded and skipped pages.
+    """
+    return collect_outline(iter_outline(path, deadline_s, max_pages))
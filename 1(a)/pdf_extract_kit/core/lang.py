@@ -0,0 +1,163 @@
+import os
+import re
+import sys
+from collections import Counter
+
+from pdf_extract_kit.core import metrics
+from pdf_extract_kit.core.raster import render_page
+
+
+FALLBACK_LANG = "eng"
+# Fixed Tesseract language set (e.g. "eng+hin"); unset means detect per document
+OCR_LANG = os.environ.get("OCR_LANG") or None
+SAMPLE_PAGES = 3
+SAMPLE_DPI = 150
+MIN_SAMPLE_CHARS = 200
+# A language joins the set when it accounts for this share of stopword hits
+MIN_LANG_SHARE = 0.2
+
+STOPWORDS = {
+    "eng": {"the", "and", "of", "to", "in", "is", "for", "with", "that", "on", "are", "this", "by", "be"},
+    "fra": {"le", "la", "les", "des", "et", "est", "une", "du", "dans", "pour", "que", "qui", "sur", "au"},
+    "deu": {"der", "die", "das", "und", "ist", "nicht", "mit", "den", "ein", "eine", "zu", "von", "auf", "für"},
+}
+SCRIPT_LANGS = {
+    "Devanagari": "hin",
+}
+DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+LATIN = re.compile(r"[A-Za-zÀ-ÿ]")
+WORD = re.compile(r"[a-zà-ÿß]+")
+
+_cache = {}
+_installed = None
+
+
+def installed_langs():
+    global _installed
+    if _installed is None:
+        import pytesseract
+
+        try:
+            _installed = set(pytesseract.get_languages(config=""))
+        except Exception:
+            _installed = {FALLBACK_LANG}
+    return _installed
+
+
+def langs_from_text(text):
+    """Minimal language list for a text sample: script first, then stopwords for Latin."""
+    langs = []
+    devanagari = len(DEVANAGARI.findall(text))
+    latin = len(LATIN.findall(text))
+    if devanagari > latin * 0.2:
+        langs.append(SCRIPT_LANGS["Devanagari"])
+    if latin > devanagari * 0.2:
+        hits = Counter()
+        for word in WORD.findall(text.lower()):
+            for lang, words in STOPWORDS.items():
+                if word in words:
+                    hits[lang] += 1
+        total = sum(hits.values())
+        latin_langs = [lang for lang, n in hits.most_common() if total and n / total >= MIN_LANG_SHARE]
+        langs.extend(latin_langs or [FALLBACK_LANG])
+    return langs
+
+
+def sample_text(doc, page_numbers):
+    """Low-DPI OCR of a few scanned pages, after OSD has ruled out non-Latin scripts.
+
+    OSD runs on the first sampled page only, and sampling stops as soon as
+    there is enough text to count stopwords, so detection stays far cheaper
+    than the OCR it saves. If Tesseract fails, sampling stops with the
+    text gathered so far.
+    """
+    import pytesseract
+    from PIL import Image
+
+    chunks = []
+    for i, n in enumerate(page_numbers):
+        raster = render_page(doc[n], SAMPLE_DPI)
+        image = Image.frombytes("L", raster[:2], raster[2])
+        if i == 0:
+            try:
+                osd = pytesseract.image_to_osd(image)
+                match = re.search(r"Script: (\w+)", osd)
+                if match and match.group(1) in SCRIPT_LANGS:
+                    return None, SCRIPT_LANGS[match.group(1)]
+            except Exception:
+                pass  # no osd.traineddata or too little text: go on with eng OCR
+        try:
+            chunks.append(pytesseract.image_to_string(image, lang=FALLBACK_LANG))
+        except Exception as e:
+            print(f"⚠️ Language sampling failed on page {n + 1}: {type(e).__name__}: {e}", file=sys.stderr)
+            break
+        if sum(len(c) for c in chunks) >= MIN_SAMPLE_CHARS * 2:
+            break
+    return "\n".join(chunks), None
+
+
+def _doc_key(doc):
+    try:
+        st = os.stat(doc.name)
+        return doc.name, st.st_size, st.st_mtime
+    except (OSError, TypeError):
+        return None
+
+
+def detect_ocr_lang(doc, scanned_pages=None, pages=None):
+    """Picks the smallest Tesseract language set for a document, e.g. "eng" or "hin+eng".
+
+    Reads the text layer when the document has one; otherwise OCRs a few
+    scanned pages at low DPI with English only. Only installed languages
+    are returned, and the choice is cached per document. ``pages`` are
+    page models (see pages.build_page) already parsed; their text is reused
+    instead of being read from the PDF again.
+
+    Never raises: if detection fails (e.g. Tesseract is missing or
+    crashes), FALLBACK_LANG is returned so the document is still processed.
+    With OCR_LANG set, that language set is returned without detection.
+    """
+    if OCR_LANG:
+        return OCR_LANG
+    key = _doc_key(doc)
+    if key is not None and key in _cache:
+        return _cache[key]
+    with metrics.timer("lang_detect"):
+        try:
+            lang = _detect(doc, scanned_pages, pages)
+        except Exception as e:
+            print(f"⚠️ OCR language detection failed, using {FALLBACK_LANG}: {type(e).__name__}: {e}", file=sys.stderr)
+            lang = FALLBACK_LANG
+    if key is not None:
+        _cache[key] = lang
+    return lang
+
+
+def _detect(doc, scanned_pages, pages=None):
+    parsed = {page["number"] - 1: "\n".join(line["text"] for line in page["lines"]) for page in pages or ()}
+    text = ""
+    empty_pages = []
+    for n in range(doc.page_count):
+        page_text = parsed[n] if n in parsed else doc[n].get_text("text")
+        if not page_text.strip():
+            empty_pages.append(n)
+        text += page_text
+        if len(text) >= MIN_SAMPLE_CHARS * 10:
+            break
+
+    langs = None
+    if len(text.strip()) < MIN_SAMPLE_CHARS:
+        # Too little text layer: every page was read, so empty_pages is complete
+        candidates = list(scanned_pages) if scanned_pages is not None else empty_pages
+        step = max(1, len(candidates) // SAMPLE_PAGES)
+        sample, script_lang = sample_text(doc, candidates[::step][:SAMPLE_PAGES])
+        if script_lang:
+            langs = [script_lang, FALLBACK_LANG]
+        else:
+            text += sample
+    if langs is None:
+        langs = langs_from_text(text)
+
+    installed = installed_langs()
+    langs = [lang for lang in dict.fromkeys(langs) if lang in installed] or [FALLBACK_LANG]
+    return "+".join(langs)
@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import resource
+from contextlib import contextmanager
+
+
+# Metrics of the document being processed in this process; None when no
+# one is collecting, in which case timers and counters cost next to nothing.
+_current = None
+
+PROM_PREFIX = "pdf_outline"
+
+
+def peak_rss_mb():
+    """High-water mark of this process's resident memory over its lifetime, in MB.
+
+    Not per document: a pooled worker keeps the peak of every document it
+    has processed so far, and OCR worker processes are not included.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+@contextmanager
+def collect():
+    """Collects stage timings and counters for everything run inside the block.
+
+    Yields a dict filled in as the block runs: ``stages`` (seconds per
+    stage), ``counters`` and, once the block exits, ``worker_peak_rss_mb``
+    (see peak_rss_mb).
+    """
+    global _current
+    previous = _current
+    metrics = _current = {"stages": {}, "counters": {}, "worker_peak_rss_mb": None}
+    try:
+        yield metrics
+    finally:
+        metrics["worker_peak_rss_mb"] = round(peak_rss_mb(), 1)
+        _current = previous
+
+
+@contextmanager
+def timer(stage):
+    """Adds the time spent inside the block to ``stage``."""
+    metrics = _current
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = metrics["stages"]
+        stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - start
+
+
+def count(name, n=1):
+    if _current is not None:
+        counters = _current["counters"]
+        counters[name] = counters.get(name, 0) + n
+
+
+def rounded(metrics):
+    """Copy of a collected metrics dict with stage times rounded for output."""
+    if metrics is None:
+        return None
+    return dict(metrics, stages={stage: round(t, 4) for stage, t in metrics["stages"].items()})
+
+
+def prometheus_text(records, elapsed=None):
+    """Aggregates batch records into Prometheus text exposition format.
+
+    Meant for node_exporter's textfile collector: stage times and counters
+    are summed over the batch, peak RSS is the highest seen in any worker.
+    """
+    files, stages, counters = {}, {}, {}
+    pages, peak = 0, 0.0
+    for record in records:
+        files[record["status"]] = files.get(record["status"], 0) + 1
+        pages += record.get("pages", 0)
+        metrics = record.get("metrics")
+        if not metrics:
+            continue
+        for stage, t in metrics["stages"].items():
+            stages[stage] = stages.get(stage, 0.0) + t
+        for name, n in metrics["counters"].items():
+            counters[name] = counters.get(name, 0) + n
+        peak = max(peak, metrics["worker_peak_rss_mb"] or 0.0)
+
+    p = PROM_PREFIX
+    lines = [
+        f"# HELP {p}_files_total PDFs processed, by status.",
+        f"# TYPE {p}_files_total counter",
+    ]
+    lines += [f'{p}_files_total{{status="{status}"}} {n}' for status, n in sorted(files.items())]
+    lines += [
+        f"# HELP {p}_pages_total Pages in the processed PDFs.",
+        f"# TYPE {p}_pages_total counter",
+        f"{p}_pages_total {pages}",
+        f"# HELP {p}_stage_seconds_total Time spent per extraction stage.",
+        f"# TYPE {p}_stage_seconds_total counter",
+    ]
+    lines += [f'{p}_stage_seconds_total{{stage="{stage}"}} {t:.6f}' for stage, t in sorted(stages.items())]
+    for name, n in sorted(counters.items()):
+        lines += [f"# TYPE {p}_{name}_total counter", f"{p}_{name}_total {n}"]
+    lines += [
+        f"# HELP {p}_peak_rss_bytes Highest resident memory of a batch worker process, OCR processes excluded.",
+        f"# TYPE {p}_peak_rss_bytes gauge",
+        f"{p}_peak_rss_bytes {int(peak * 1024 * 1024)}",
+    ]
+    if elapsed is not None:
+        lines += [
+            f"# TYPE {p}_batch_seconds gauge",
+            f"{p}_batch_seconds {elapsed:.3f}",
+            f"# TYPE {p}_last_run_timestamp_seconds gauge",
+            f"{p}_last_run_timestamp_seconds {int(time.time())}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, records, elapsed=None):
+    """Writes the textfile atomically so the collector never reads half a file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(records, elapsed))
+    os.replace(tmp, path)
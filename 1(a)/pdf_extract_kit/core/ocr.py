@@ -0,0 +1,214 @@
+import os
+import sys
+import atexit
+import importlib.util
+from multiprocessing import util
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from pdf_extract_kit.core import metrics
+from pdf_extract_kit.core.raster import iter_rasters
+
+# pytesseract, PIL and tesserocr are imported inside the OCR workers only, so
+# text-only runs never pay for them. tesserocr (C API binding) keeps the
+# language models loaded inside each worker when it is installed.
+HAS_TESSEROCR = importlib.util.find_spec("tesserocr") is not None
+
+
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", 0)) or min(4, os.cpu_count() or 1)
+OCR_BACKEND = os.environ.get("OCR_BACKEND") or ("tesserocr" if HAS_TESSEROCR else "pytesseract")
+# Rendered pages allowed ahead of the OCR workers; bounds peak memory
+OCR_PREFETCH = int(os.environ.get("OCR_PREFETCH", 0)) or 2 * OCR_WORKERS
+DEFAULT_LANG = "eng"
+
+_pools = {}
+_finalizer_pid = None
+_api = None  # per-worker tesserocr.PyTessBaseAPI
+_lang = DEFAULT_LANG
+
+
+def _init_worker(lang, backend):
+    global _api, _lang
+    _lang = lang
+    # The workers are the parallelism; Tesseract's own OpenMP threads
+    # would only oversubscribe the CPUs (also inherited by pytesseract's
+    # tesseract processes)
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    if backend == "tesserocr" and HAS_TESSEROCR:
+        import tesserocr
+        _api = tesserocr.PyTessBaseAPI(lang=lang)
+
+
+def _ocr_task(width, height, samples, mode):
+    """Runs in a worker: OCRs one grayscale page and returns plain text or TSV."""
+    import pytesseract
+    from PIL import Image
+
+    image = Image.frombytes("L", (width, height), samples)
+    try:
+        if _api is not None:
+            _api.SetImage(image)
+            return _api.GetTSVText(0) if mode == "tsv" else _api.GetUTF8Text()
+        if mode == "tsv":
+            return pytesseract.image_to_data(image, lang=_lang)
+        return pytesseract.image_to_string(image, lang=_lang)
+    except Exception as e:
+        # Some pytesseract errors (e.g. TesseractNotFoundError) cannot be
+        # unpickled in the parent, which would break the whole pool
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+
+def get_pool(lang=DEFAULT_LANG, workers=None):
+    """Long-lived OCR workers for a language set, started on first use."""
+    global _finalizer_pid
+    pool = _pools.get(lang)
+    if pool is None:
+        if _finalizer_pid != os.getpid():
+            # In a multiprocessing child (e.g. a batch worker) atexit never
+            # runs and the child joins its OCR workers on exit, so close
+            # them from a finalizer, which runs before that join. It must
+            # outrank the pool's own queue finalizers (priority 10), or the
+            # shutdown sentinels never reach the workers.
+            util.Finalize(None, shutdown_pools, exitpriority=100)
+            _finalizer_pid = os.getpid()
+            if not HAS_TESSEROCR and os.environ.get("OCR_BACKEND") != "pytesseract":
+                print("⚠️ tesserocr is not installed: OCR falls back to pytesseract, "
+                      "one tesseract process per page", file=sys.stderr)
+        pool = ProcessPoolExecutor(
+            max_workers=workers or OCR_WORKERS,
+            initializer=_init_worker,
+            initargs=(lang, OCR_BACKEND)
+        )
+        _pools[lang] = pool
+    return pool
+
+
+def share_cpus(batch_workers):
+    """Sizes this process's OCR pools for one of ``batch_workers`` batch processes.
+
+    Each batch worker gets its share of the CPUs, cpu_count // batch_workers
+    OCR workers (at least one, at most the default 4), so a full batch pool
+    starts about one tesseract per CPU. OCR_WORKERS and OCR_PREFETCH, when
+    set, are kept.
+    """
+    global OCR_WORKERS, OCR_PREFETCH
+    if not int(os.environ.get("OCR_WORKERS", 0)):
+        OCR_WORKERS = max(1, min(4, (os.cpu_count() or 1) // batch_workers))
+    if not int(os.environ.get("OCR_PREFETCH", 0)):
+        OCR_PREFETCH = 2 * OCR_WORKERS
+
+
+def shutdown_pools():
+    while _pools:
+        _, pool = _pools.popitem()
+        pool.shutdown(cancel_futures=True)
+
+
+atexit.register(shutdown_pools)
+
+
+def image_to_raster(image):
+    image = image.convert("L")
+    return image.width, image.height, image.tobytes()
+
+
+def submit(raster, lang=DEFAULT_LANG, mode="text"):
+    """Queues one rendered page on the OCR workers and returns its future."""
+    width, height, samples = raster
+    try:
+        return get_pool(lang).submit(_ocr_task, width, height, samples, mode)
+    except BrokenProcessPool:
+        # A crashed tesseract took the pool down; start a fresh one
+        _discard_broken_pools()
+        return get_pool(lang).submit(_ocr_task, width, height, samples, mode)
+
+
+def _discard_broken_pools():
+    """Shuts down the pools a crashed worker broke, so their surviving workers
+    and management thread do not leak, and forgets them."""
+    for lang, pool in list(_pools.items()):
+        if pool._broken:
+            del _pools[lang]
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def ocr_rasters(rasters, lang=DEFAULT_LANG, mode="text", window=None):
+    """Yields (key, text_or_error) in input order for an iterable of (key, raster).
+
+    Rendering is driven by the caller's iterator, so the next page is rendered
+    here while earlier pages are being OCR'd by the workers. At most
+    ``window`` pages are rendered but not yet collected, and each raster is
+    dropped as soon as its text is yielded, so peak memory does not depend
+    on the page count.
+    """
+    window = window or OCR_PREFETCH
+    pending = deque()
+    for key, raster in rasters:
+        pending.append((key, submit(raster, lang, mode)))
+        while len(pending) >= window:
+            yield _collect(*pending.popleft())
+    while pending:
+        yield _collect(*pending.popleft())
+
+
+def _collect(key, future):
+    try:
+        return key, result(future)
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            _discard_broken_pools()
+        return key, e
+
+
+def result(future, timeout=None):
+    """Waits for an OCR future, timing the wait and counting the page.
+
+    The "ocr" stage is the time the caller spent blocked on Tesseract, i.e.
+    the part of the OCR work not hidden behind parsing and rendering.
+    Raises concurrent.futures.TimeoutError if no text is back in ``timeout`` seconds.
+    """
+    try:
+        with metrics.timer("ocr"):
+            text = future.result(timeout)
+    except TimeoutError:
+        raise
+    except Exception:
+        metrics.count("pages_ocr_failed")
+        raise
+    metrics.count("pages_ocr")
+    return text
+
+
+def ocr_pages(doc, page_numbers, lang=DEFAULT_LANG, dpi=None, mode="text", window=None):
+    """OCRs the given 0-based pages of a PyMuPDF doc with render/OCR overlap.
+
+    Pages are rendered lazily at ``dpi`` (adaptive when None, see
+    raster.page_dpi). Yields (page_number, text_or_error); a failed page
+    yields the exception instead of aborting the rest of the document.
+    """
+    yield from ocr_rasters(iter_rasters(doc, page_numbers, dpi), lang, mode, window)
+
+
+def parse_tsv(tsv):
+    """Parses Tesseract TSV into the dict shape of pytesseract.Output.DICT."""
+    rows = [line.split("\t") for line in tsv.splitlines() if line]
+    if not rows:
+        return {}
+    if rows[0][0] == "level":
+        header, rows = rows[0], rows[1:]
+    else:
+        # tesserocr's GetTSVText omits the header row
+        header = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                  "left", "top", "width", "height", "conf", "text"]
+    data = {name: [] for name in header}
+    for row in rows:
+        row += [""] * (len(header) - len(row))
+        for name, value in zip(header, row):
+            if name == "text":
+                data[name].append(value)
+            elif name == "conf":
+                data[name].append(float(value) if value else -1.0)
+            else:
+                data[name].append(int(value) if value else 0)
+    return data
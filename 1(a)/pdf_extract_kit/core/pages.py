@@ -0,0 +1,57 @@
+import fitz  # PyMuPDF
+
+from pdf_extract_kit.core import metrics
+
+
+# The model only needs text, fonts and bboxes; skip decoding embedded images
+DICT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def build_page(page):
+    """Parses one page exactly once into the model every extraction stage reads.
+
+    Each line keeps its raw PyMuPDF spans (text, size, font, flags, bbox)
+    and the number of the text block it sits in; "blocks" counts the text
+    blocks, including those with only blank lines.
+    "empty" means the page has no text layer; "scanned" means it is empty but
+    carries raster images, i.e. it has to be rendered and OCR'd. Vector
+    drawings alone (rules, charts, boxes) give Tesseract nothing to read.
+    """
+    metrics.count("pages_parsed")
+    with metrics.timer("parse"):
+        blocks = page.get_text("dict", flags=DICT_FLAGS)["blocks"]
+    lines = []
+    text_blocks = 0
+    for block in blocks:
+        if block.get("type", 0) != 0:
+            continue
+        text_blocks += 1
+        for line in block.get("lines", []):
+            spans = line["spans"]
+            text = "".join(span["text"] for span in spans)
+            if text.strip():
+                lines.append({
+                    "text": text,
+                    "spans": spans,
+                    "bbox": line["bbox"],
+                    "block": text_blocks - 1
+                })
+    empty = not lines
+    return {
+        "number": page.number + 1,
+        "width": page.rect.width,
+        "height": page.rect.height,
+        "lines": lines,
+        "blocks": text_blocks,
+        "empty": empty,
+        "scanned": empty and bool(page.get_images())
+    }
+
+
+def iter_pages(doc):
+    for page in doc:
+        yield build_page(page)
+
+
+def build_page_model(doc):
+    return list(iter_pages(doc))
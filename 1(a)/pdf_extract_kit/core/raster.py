@@ -0,0 +1,75 @@
+import os
+
+import fitz  # PyMuPDF
+
+from pdf_extract_kit.core import metrics
+
+
+# Fixed render DPI; unset means adaptive (see page_dpi)
+RASTER_DPI = int(os.environ.get("RASTER_DPI", 0)) or None
+MAX_DPI = 300
+MIN_DPI = 150
+# Cap on pixels per page so an oversized page (posters, A0 drawings) cannot
+# blow up memory: ~ an A4 page at 300 DPI
+MAX_PIXELS = int(os.environ.get("RASTER_MAX_PIXELS", 2480 * 3508))
+
+
+def page_dpi(page, dpi=None):
+    """Picks the render DPI for a page.
+
+    With no fixed dpi, a scanned page is rendered at the resolution of its
+    largest embedded image (rendering a 150 DPI scan at 300 DPI only
+    quadruples the pixels Tesseract has to chew on), clamped to
+    [MIN_DPI, MAX_DPI]. Either way the result is capped at MAX_PIXELS.
+    """
+    dpi = dpi or RASTER_DPI
+    if dpi is None:
+        dpi = MAX_DPI
+        native = 0
+        for info in page.get_image_info():
+            x0, y0, x1, y1 = info["bbox"]
+            if x1 - x0 > 0:
+                native = max(native, info["width"] * 72 / (x1 - x0))
+        if native:
+            dpi = int(min(MAX_DPI, max(MIN_DPI, native)))
+
+    width_in, height_in = page.rect.width / 72, page.rect.height / 72
+    if width_in * height_in * dpi * dpi > MAX_PIXELS:
+        dpi = int((MAX_PIXELS / (width_in * height_in)) ** 0.5)
+    return dpi
+
+
+def render_page(page, dpi=None):
+    """Renders a PyMuPDF page straight to grayscale: (width, height, samples).
+
+    One byte per pixel instead of three, and no PIL image is created in the
+    rendering process.
+    """
+    metrics.count("pages_rendered")
+    with metrics.timer("render"):
+        pix = page.get_pixmap(dpi=page_dpi(page, dpi), colorspace=fitz.csGRAY)
+    return pix.width, pix.height, pix.samples
+
+
+def iter_rasters(doc, page_numbers, dpi=None):
+    """Lazily renders the given 0-based pages, one at a time, as they are pulled."""
+    for n in page_numbers:
+        yield n, render_page(doc[n], dpi)
+
+
+def iter_path_rasters(path, dpi=MAX_DPI):
+    """Lazy grayscale rasters for a file PyMuPDF cannot open, via poppler.
+
+    pdf2image is asked for one page per call instead of the whole document,
+    so only the page being handed to OCR is ever held in memory.
+    """
+    # Only this fallback needs poppler, so pdf2image stays an optional import
+    from pdf2image import convert_from_path, pdfinfo_from_path
+
+    page_count = pdfinfo_from_path(path)["Pages"]
+    for n in range(page_count):
+        images = convert_from_path(path, dpi=dpi, first_page=n + 1, last_page=n + 1, grayscale=True)
+        if not images:
+            continue
+        image = images[0].convert("L")
+        yield n, (image.width, image.height, image.tobytes())
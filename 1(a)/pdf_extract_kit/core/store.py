@@ -0,0 +1,215 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+import numpy as np
+
+
+MAGIC = b"OUTLINE1"
+STORE_VERSION = 3
+HASH_SIZE = 32
+ALIGN = 8
+
+# Column dtypes, little-endian so a store is portable between machines
+COLUMNS = {
+    "strings": "u1",         # UTF-8 string table
+    "string_offsets": "<u8", # string i is strings[string_offsets[i]:string_offsets[i + 1]]
+    "doc_name": "<u4",       # per document: string index of its PDF file name
+    "doc_title": "<u4",      # per document: string index of its title
+    "doc_start": "<u8",      # per document: first heading; headings of doc d are doc_start[d]:doc_start[d + 1]
+    "doc_hash": "u1",        # per document: HASH_SIZE bytes of SHA-256 over its outline (see outline_hash)
+    "text": "<u4",           # per heading: string index of its text
+    "level": "u1",           # per heading: index into the header's level list
+    "page": "<i4",           # per heading: page number (-1 where the extractor gives none)
+}
+
+
+def write_store(path, outlines):
+    """Writes a batch of outlines into one columnar store file.
+
+    ``outlines`` is an iterable of (pdf file name, {"title", "outline"})
+    pairs. Identical strings (repeated headings, titles) are stored once,
+    and each document's content hash is stored with it. Documents are
+    looked up by file name, so two with the same name raise ValueError.
+    The file is written next to ``path`` and renamed into place.
+    """
+    strings = {}
+    levels = {}
+    columns = {name: [] for name in COLUMNS if name not in ("strings", "string_offsets", "doc_hash")}
+    hashes = []
+    columns["doc_start"].append(0)
+
+    def intern(text):
+        return strings.setdefault(text, len(strings))
+
+    names = set()
+    for name, result in outlines:
+        if name in names:
+            raise ValueError(f"Two outlines are named {name}; a store keys documents by file name")
+        names.add(name)
+        columns["doc_name"].append(intern(name))
+        columns["doc_title"].append(intern(result.get("title", "")))
+        hashes.append(_content_hash(result))
+        for heading in result.get("outline", []):
+            columns["text"].append(intern(heading["text"]))
+            columns["level"].append(levels.setdefault(heading["level"], len(levels)))
+            columns["page"].append(heading["page"])
+        columns["doc_start"].append(len(columns["text"]))
+    if len(levels) > 255:
+        raise ValueError("More than 255 distinct heading levels")
+
+    encoded = [s.encode("utf-8") for s in strings]
+    columns["strings"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    columns["string_offsets"] = np.concatenate([[0], np.cumsum([len(b) for b in encoded], dtype=np.int64)])
+    columns["doc_hash"] = np.frombuffer(b"".join(hashes), dtype=np.uint8)
+    arrays = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+
+    header = {"version": STORE_VERSION, "levels": list(levels), "columns": {}}
+    # Column offsets depend on the header length, so lay it out until it is stable
+    offset = 0
+    while True:
+        header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+        start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+        if start == offset:
+            break
+        offset = start
+        for name, array in arrays.items():
+            header["columns"][name] = {"offset": offset, "count": len(array)}
+            offset = _aligned(offset + array.nbytes)
+        offset = start
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).astype("<u8").tobytes())
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b"\0" * (header["columns"][name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp, path)
+
+
+def _content_hash(result):
+    outline = [[h["level"], h["text"], h["page"]] for h in result.get("outline", [])]
+    return hashlib.sha256(json.dumps([result.get("title", ""), outline], ensure_ascii=False).encode("utf-8")).digest()
+
+
+def _aligned(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def open_store(path):
+    """Memory-maps a store file; columns are zero-copy views into the mapping.
+
+    Only the document names are decoded up front. Headings are read from
+    the columns on access.
+    """
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not an outline store")
+    header_len = int(data[len(MAGIC):len(MAGIC) + 8].view("<u8")[0])
+    header = json.loads(bytes(data[len(MAGIC) + 8:len(MAGIC) + 8 + header_len]))
+    if header["version"] != STORE_VERSION:
+        raise ValueError(f"{path} has store version {header['version']}, expected {STORE_VERSION}")
+    columns = {}
+    for name, dtype in COLUMNS.items():
+        column = header["columns"][name]
+        nbytes = column["count"] * np.dtype(dtype).itemsize
+        columns[name] = data[column["offset"]:column["offset"] + nbytes].view(dtype)
+    # Strings are decoded from a memoryview of the mapping: slicing it copies nothing
+    store = {"path": str(path), "levels": header["levels"], "columns": columns,
+             "_strings": memoryview(columns["strings"])}
+    store["documents"] = dict(zip(strings(store, columns["doc_name"]), range(len(columns["doc_name"]))))
+    return store
+
+
+def strings(store, indexes):
+    """Decodes an array of string indexes."""
+    offsets = store["columns"]["string_offsets"]
+    indexes = np.asarray(indexes, dtype=np.int64)
+    table = store["_strings"]
+    return [str(table[a:b], "utf-8") for a, b in zip(offsets[indexes].tolist(), offsets[indexes + 1].tolist())]
+
+
+def string(store, i):
+    return strings(store, [i])[0]
+
+
+def document_names(store):
+    """PDF file names in the store, in the order they were written."""
+    return list(store["documents"])
+
+
+def document_columns(store, name):
+    """Zero-copy (text string indexes, level codes, pages) arrays of one document's headings."""
+    d = store["documents"][name]
+    start, end = store["columns"]["doc_start"][d:d + 2].tolist()
+    columns = store["columns"]
+    return columns["text"][start:end], columns["level"][start:end], columns["page"][start:end]
+
+
+def outline_hash(store, name):
+    """SHA-256 of one document's outline, read from the store without decoding any of it."""
+    d = store["documents"][name]
+    return store["columns"]["doc_hash"][d * HASH_SIZE:(d + 1) * HASH_SIZE].tobytes()
+
+
+def read_outline(store, name):
+    """One document's outline as the {"title", "outline"} dict 1(a) writes to JSON."""
+    texts, levels, pages = document_columns(store, name)
+    level_names = store["levels"]
+    return {
+        "title": string(store, int(store["columns"]["doc_title"][store["documents"][name]])),
+        "outline": [
+            {"level": level_names[level], "text": text, "page": page}
+            for text, level, page in zip(strings(store, texts), levels.tolist(), pages.tolist())
+        ],
+    }
+
+
+# --- Converters ---
+def pack_json(json_dir, path):
+    """Packs a folder of 1(a) JSON outlines (doc.json -> doc.pdf) into one store."""
+    outlines = []
+    for name in sorted(n for n in os.listdir(json_dir) if n.lower().endswith(".json")):
+        with open(os.path.join(json_dir, name), "r", encoding="utf-8") as f:
+            result = json.load(f)
+        if isinstance(result, dict) and isinstance(result.get("outline"), list):
+            outlines.append((name.rsplit(".", 1)[0] + ".pdf", result))
+    write_store(path, outlines)
+    return len(outlines)
+
+
+def unpack_json(path, json_dir):
+    """Writes every outline of a store back as one indented JSON file per PDF."""
+    store = open_store(path)
+    os.makedirs(json_dir, exist_ok=True)
+    for name in document_names(store):
+        with open(os.path.join(json_dir, name.rsplit(".", 1)[0] + ".json"), "w", encoding="utf-8") as f:
+            json.dump(read_outline(store, name), f, ensure_ascii=False, indent=2)
+    return len(store["documents"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converts between 1(a) JSON outlines and the columnar outline store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="JSON folder -> store file")
+    pack.add_argument("json_dir")
+    pack.add_argument("store")
+    unpack = commands.add_parser("unpack", help="store file -> JSON folder")
+    unpack.add_argument("store")
+    unpack.add_argument("json_dir")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        count = pack_json(args.json_dir, args.store)
+        print(f"📦 Packed {count} outlines into {args.store} ({os.path.getsize(args.store)} bytes)")
+    else:
+        count = unpack_json(args.store, args.json_dir)
+        print(f"📂 Unpacked {count} outlines into {args.json_dir}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The kit is imported as pdf_extract_kit, as app/main.py does from 1(a)
+sys.path.insert(0, ROOT)
@@ -0,0 +1,60 @@
+import os
+
+from pdf_extract_kit.core import cache, extractor
+
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "input")
+PDF = os.path.join(INPUT_DIR, "file01.pdf")
+
+
+def test_key_covers_settings():
+    digest = cache.file_digest(PDF)
+    settings = extractor.extraction_settings()
+    key = cache.cache_key(digest, settings)
+    assert cache.cache_key(digest) == key
+    for name, value in [("ocr_backend", "other"), ("ocr_lang", "deu"), ("raster_dpi", 150),
+                        ("raster_max_pixels", 1)]:
+        assert cache.cache_key(digest, dict(settings, **{name: value})) != key
+    assert cache.cache_key("0" * 64, settings) != key
+
+
+def test_default_key_follows_extractor_settings(monkeypatch):
+    digest = cache.file_digest(PDF)
+    key = cache.cache_key(digest)
+    monkeypatch.setattr(extractor, "OCR_LANG", "deu")
+    assert cache.cache_key(digest) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(cache, "EXTRACTOR_VERSION", "test")
+    assert cache.cache_key(digest) != key
+    monkeypatch.undo()
+    assert cache.cache_key(digest) == key
+
+
+def test_changed_settings_miss(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    settings = extractor.extraction_settings()
+    result, hit = cache.cached_extract_outline(PDF, cache_dir, settings=settings)
+    assert not hit
+    again, hit = cache.cached_extract_outline(PDF, cache_dir, settings=settings)
+    assert hit and again == result
+    _, hit = cache.cached_extract_outline(PDF, cache_dir, settings=dict(settings, ocr_lang="deu"))
+    assert not hit
+    assert cache.stats(cache_dir)["entries"] == 2
+
+
+def test_invalidate_by_pdf(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    other = os.path.join(INPUT_DIR, "file02.pdf")
+    cache.cached_extract_outline(PDF, cache_dir)
+    cache.cached_extract_outline(other, cache_dir)
+    assert cache.invalidate(cache_dir, [PDF]) == 1
+    assert not cache.cached_extract_outline(PDF, cache_dir)[1]
+    assert cache.cached_extract_outline(other, cache_dir)[1]
+
+
+def test_incomplete_results_not_stored(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(cache, "extract_outline",
+                        lambda path, **limits: {"title": "", "outline": [], "ocr_failed": [1]})
+    cache.cached_extract_outline(PDF, cache_dir)
+    assert cache.stats(cache_dir)["entries"] == 0
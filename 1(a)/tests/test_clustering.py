@@ -0,0 +1,41 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from pdf_extract_kit.core.clustering import kmeans_1d, size_levels
+
+
+def sse(values, labels):
+    return sum(((values[labels == c] - values[labels == c].mean()) ** 2).sum() for c in np.unique(labels))
+
+
+def brute_force_sse(values, k):
+    """Lowest SSE over every assignment of the values to at most k clusters."""
+    return min(sse(values, np.array(labels)) for labels in itertools.product(range(k), repeat=len(values)))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 8))
+    # Few distinct sizes, so repeated values are common, as with font sizes
+    values = rng.choice([8.0, 9.0, 10.0, 10.5, 12.0, 14.0, 18.0, 24.0], size=n)
+    k = int(rng.integers(1, 5))
+    labels, centers = kmeans_1d(values, k)
+    assert sse(values, labels) == pytest.approx(brute_force_sse(values, k), abs=1e-9)
+    assert len(centers) == min(k, len(np.unique(values)))
+    assert np.all(np.diff(centers) > 0)
+    for c, center in enumerate(centers):
+        assert values[labels == c].mean() == pytest.approx(center)
+
+
+def test_empty_and_constant():
+    labels, centers = kmeans_1d([], 3)
+    assert labels.size == 0 and centers.size == 0
+    labels, centers = kmeans_1d([11.0] * 5, 3)
+    assert labels.tolist() == [0] * 5 and centers.tolist() == [11.0]
+
+
+def test_size_levels_largest_first():
+    assert size_levels([10, 10, 24, 14, 10, 24], 3).tolist() == [2, 2, 0, 1, 2, 0]
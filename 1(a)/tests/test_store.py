@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from pdf_extract_kit.core.store import (
+    document_names, open_store, outline_hash, pack_json, read_outline, unpack_json, write_store
+)
+
+
+OUTLINES = [
+    ("a.pdf", {"title": "Café résumé", "outline": [
+        {"level": "H1", "text": "Introduction", "page": 1},
+        {"level": "H2", "text": "Überblick", "page": 2},
+        {"level": "H1", "text": "Introduction", "page": 5},
+    ]}),
+    # pdf-outline gives page -1 for headings it cannot place
+    ("b.pdf", {"title": "", "outline": [{"level": "H3", "text": "Unplaced", "page": -1}]}),
+    ("empty.pdf", {"title": "No headings", "outline": []}),
+]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "outlines.olst"
+    write_store(path, OUTLINES)
+    store = open_store(path)
+    assert document_names(store) == [name for name, _ in OUTLINES]
+    for name, result in OUTLINES:
+        assert read_outline(store, name) == result
+
+
+def test_hash_follows_content(tmp_path):
+    changed = [(name, json.loads(json.dumps(result))) for name, result in OUTLINES]
+    changed[1][1]["outline"][0]["page"] = 3
+    write_store(tmp_path / "a.olst", OUTLINES)
+    write_store(tmp_path / "b.olst", changed)
+    a, b = open_store(tmp_path / "a.olst"), open_store(tmp_path / "b.olst")
+    assert outline_hash(a, "a.pdf") == outline_hash(b, "a.pdf")
+    assert outline_hash(a, "b.pdf") != outline_hash(b, "b.pdf")
+
+
+def test_duplicate_names_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_store(tmp_path / "outlines.olst", [OUTLINES[0], OUTLINES[0]])
+
+
+def test_pack_unpack_json(tmp_path):
+    json_dir = tmp_path / "json"
+    json_dir.mkdir()
+    for name, result in OUTLINES:
+        with open(json_dir / name.replace(".pdf", ".json"), "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    (json_dir / "notes.json").write_text("[]", encoding="utf-8")  # not an outline: left out
+
+    assert pack_json(json_dir, tmp_path / "outlines.olst") == len(OUTLINES)
+    assert unpack_json(tmp_path / "outlines.olst", tmp_path / "unpacked") == len(OUTLINES)
+    for name, _ in OUTLINES:
+        json_name = name.replace(".pdf", ".json")
+        assert (tmp_path / "unpacked" / json_name).read_bytes() == (json_dir / json_name).read_bytes()
+
+
+def test_other_version_rejected(tmp_path):
+    path = tmp_path / "outlines.olst"
+    write_store(path, OUTLINES)
+    data = path.read_bytes().replace(b'"version": 3', b'"version": 2', 1)
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        open_store(path)
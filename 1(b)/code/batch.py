@@ -0,0 +1,280 @@
+# batch.py
+
+import os
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from main import PROJECT_ROOT, parse_document, get_collection_index, rank_collection
+from manifest import document_hash, open_manifest, load_document, store_document, save_manifest
+from persona_classifier import split_passages
+from tfidf_index import document_counts
+
+SPEC_FILE = Path("input") / "challenge1b_input.json"
+OUTPUT_NAME = "challenge1b_output.json" # Written next to the 1A JSONs, as main.py does
+
+
+# --- Collections ---
+def discover_collections(root):
+    """Every 'Collection *' folder under root that has an input spec, in name order."""
+    return sorted(
+        (p for p in Path(root).glob("Collection *") if (p / SPEC_FILE).is_file()),
+        key=lambda p: (len(p.name), p.name) # Collection 2 before Collection 10
+    )
+
+
+def read_spec(collection_dir):
+    """
+    Persona, task and document list of a collection from its challenge1b_input.json.
+    """
+    with open(collection_dir / SPEC_FILE, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    return {
+        "persona": spec["persona"],
+        "job_to_be_done": spec["job_to_be_done"],
+        "documents": [d["filename"] for d in spec.get("documents", [])],
+    }
+
+
+def find_outline(collection_dir, pdf_filename, outlines_dir=None):
+    """1A JSON of a document: next to the collection's PDFs folder (as in main.py), else in outlines_dir."""
+    stem = Path(pdf_filename).stem
+    for folder in (collection_dir, outlines_dir):
+        if folder is not None and (Path(folder) / f"{stem}.json").is_file():
+            return Path(folder) / f"{stem}.json"
+    return None
+
+
+# --- Workers ---
+def parse_one(json_file, pdf_path, pdf_filename):
+    """Section index and index term counts of one document (runs on a worker)."""
+    doc = parse_document(json_file, pdf_path, pdf_filename)
+    if doc is not None:
+        doc["counts"] = document_counts(doc, split_passages)
+    return doc
+
+
+def rank_one(collection_dir, spec, documents, source_files, output_file, source_key=None):
+    """Fits (or loads) the collection's index, ranks it for its persona and writes the output (runs on a worker)."""
+    start = time.perf_counter()
+    index = get_collection_index(documents, source_files, collection_dir / "tfidf_index", source_key)
+    extracted_sections, sub_section_analysis = rank_collection(
+        documents, index, index, spec["persona"]["role"], spec["job_to_be_done"]["task"], verbose=False
+    )
+    final_output = {
+        "metadata": {
+            "input_documents": [d["document"] for d in documents],
+            "persona": spec["persona"],
+            "job_to_be_done": spec["job_to_be_done"],
+            "processing_timestamp": datetime.now().isoformat()
+        },
+        "extracted_sections": extracted_sections,
+        "sub_section_analysis": sub_section_analysis
+    }
+    with open(output_file, "w", encoding="utf-8") as out_f:
+        json.dump(final_output, out_f, indent=2, ensure_ascii=False)
+    return time.perf_counter() - start
+
+
+# --- Driver ---
+def plan_collection(collection_dir, outlines_dir, fused=False):
+    """
+    Resolves a collection's spec documents to (pdf_filename, json_file, pdf_path, digest).
+    Documents without a PDF or a 1A outline are reported and left out. Fused
+    runs extract the outline themselves: json_file is None and the PDF is
+    hashed with the 1(a) extractor key (pipeline.extractor_key).
+    """
+    if fused:
+        from pipeline import extractor_key
+        key = extractor_key()
+    spec = read_spec(collection_dir)
+    entries = []
+    for pdf_filename in spec["documents"]:
+        pdf_path = collection_dir / "pdf" / pdf_filename
+        if not pdf_path.exists():
+            print(f"⚠️ {collection_dir.name}: PDF '{pdf_filename}' not found. Skipping.")
+            continue
+        if fused:
+            entries.append((pdf_filename, None, pdf_path, document_hash(pdf_filename, pdf_path, key)))
+            continue
+        json_file = find_outline(collection_dir, pdf_filename, outlines_dir)
+        if json_file is None:
+            print(f"⚠️ {collection_dir.name}: no 1A JSON for '{pdf_filename}'. Skipping.")
+            continue
+        entries.append((pdf_filename, json_file, pdf_path, document_hash(pdf_filename, json_file, pdf_path)))
+    return spec, entries
+
+
+def run_collections(collection_dirs, workers=None, outlines_dir=None, output_name=OUTPUT_NAME,
+                    fused=False, debug_dir=None):
+    """
+    Processes collections concurrently on one process pool and returns a report per collection.
+
+    Every distinct document (same name, outline and PDF, by content hash) is
+    parsed once, however many collections list it; documents already in a
+    collection's manifest cache are not parsed at all. A collection is ranked
+    on the pool as soon as its last document is ready, so ranking one
+    collection overlaps with parsing the next.
+
+    With fused=True the workers run 1(a) outline extraction too (see
+    pipeline.extract_document) instead of reading 1A JSON files; debug_dir
+    then receives the outlines 1(a) would have written.
+    """
+    if fused:
+        # Needs the 1(a) kit, so only fused runs import it
+        from pipeline import extract_document, extractor_key
+    started = time.perf_counter()
+    source_key = extractor_key() if fused else None
+    source = "pdf" if fused else "outline" # Fused and 1A JSON runs cache side by side
+    workers = workers or os.cpu_count() or 1
+    collections = {}
+    waiting = {} # digest -> [(collection name, slot)]
+    loaded = {} # digest -> document served from some collection's cache
+    reports = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parses = {} # future -> (digest, pdf_filename)
+        ranks = {} # future -> collection name
+
+        def ready(name):
+            c = collections[name]
+            documents = [d for d in c["documents"] if d is not None]
+            c["report"]["ready_s"] = round(time.perf_counter() - started, 3)
+            if not documents:
+                # Nothing to rank: keep the previous output and cache as they are
+                report = c["report"]
+                report["status"] = "skipped"
+                report["error"] = "no documents could be loaded (missing 1A JSON or PDF files?)"
+                report["wall_s"] = report["ready_s"]
+                reports.append(report)
+                print(f"⚠️ {name}: {report['error']}. Skipping.")
+                return
+            save_manifest(c["manifest"], [p.name for p in (c["dir"] / "pdf").glob("*.pdf")])
+            source_files = [f for d, e in zip(c["documents"], c["entries"]) if d is not None for f in e[1:3] if f is not None]
+            future = pool.submit(
+                rank_one, c["dir"], c["spec"], documents, source_files, c["dir"] / output_name, source_key
+            )
+            ranks[future] = name
+
+        for collection_dir in collection_dirs:
+            spec, entries = plan_collection(collection_dir, outlines_dir, fused)
+            manifest = open_manifest(collection_dir / "cache")
+            c = collections[collection_dir.name] = {
+                "dir": collection_dir,
+                "spec": spec,
+                "entries": entries,
+                "manifest": manifest,
+                "documents": [None] * len(entries),
+                "pending": 0,
+                "report": {"collection": collection_dir.name, "documents": len(entries),
+                           "parsed": 0, "shared": 0, "cached": 0},
+            }
+            for slot, (pdf_filename, json_file, pdf_path, digest) in enumerate(entries):
+                cached = load_document(manifest, pdf_filename, digest, source)
+                if cached is not None:
+                    c["documents"][slot] = loaded[digest] = cached
+                    c["report"]["cached"] += 1
+                    continue
+                if digest in loaded:
+                    c["documents"][slot] = loaded[digest]
+                    store_document(manifest, pdf_filename, digest, loaded[digest], source)
+                    c["report"]["shared"] += 1
+                    continue
+                c["pending"] += 1
+                if digest in waiting:
+                    c["report"]["shared"] += 1
+                else:
+                    c["report"]["parsed"] += 1
+                    waiting[digest] = []
+                    if fused:
+                        future = pool.submit(extract_document, pdf_path, pdf_filename, debug_dir)
+                    else:
+                        future = pool.submit(parse_one, json_file, pdf_path, pdf_filename)
+                    parses[future] = (digest, pdf_filename)
+                waiting[digest].append((collection_dir.name, slot))
+            if not c["pending"]:
+                ready(collection_dir.name)
+
+        pending = set(parses)
+        pending.update(ranks)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in parses:
+                    digest, pdf_filename = parses[future]
+                    try:
+                        doc = future.result()
+                    except Exception as e:
+                        print(f"❌ Failed to process '{pdf_filename}': {e}")
+                        doc = None
+                    for name, slot in waiting[digest]:
+                        c = collections[name]
+                        if doc is not None:
+                            c["documents"][slot] = doc
+                            store_document(c["manifest"], pdf_filename, digest, doc, source)
+                        c["pending"] -= 1
+                        if not c["pending"]:
+                            ready(name)
+                else:
+                    report = collections[ranks.pop(future)]["report"]
+                    try:
+                        report["rank_s"] = round(future.result(), 3)
+                        report["status"] = "ok"
+                    except Exception as e:
+                        report["status"] = "error"
+                        report["error"] = str(e)
+                    report["wall_s"] = round(time.perf_counter() - started, 3)
+                    reports.append(report)
+                    if report["status"] == "ok":
+                        print(f"✅ {report['collection']}: {report['documents']} documents "
+                              f"({report['parsed']} parsed, {report['shared']} shared, {report['cached']} cached) "
+                              f"ranked in {report['rank_s']:.2f}s, done at {report['wall_s']:.2f}s")
+                    else:
+                        print(f"❌ {report['collection']}: {report['error']}")
+            pending.update(ranks) # Collections that became ready in this round
+
+    order = [d.name for d in collection_dirs]
+    return sorted(reports, key=lambda r: order.index(r["collection"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs 1(b) over every collection from its challenge1b_input.json")
+    parser.add_argument("--root", default=str(PROJECT_ROOT), help="folder holding the collections")
+    parser.add_argument("--collections", nargs="*", help="only these collections (folder names or numbers)")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WORKERS", 0)) or None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--outlines", help="folder of 1A JSONs for documents without one in their collection")
+    parser.add_argument("--fused", action="store_true",
+                        help="extract the outlines from the PDFs in the same pass instead of reading 1A JSON")
+    parser.add_argument("--debug-outlines", help="with --fused, also write the 1A outline JSONs to this folder")
+    parser.add_argument("--output-name", default=OUTPUT_NAME, help="output file name inside each collection")
+    parser.add_argument("--report", help="write the per-collection timings as JSON")
+    args = parser.parse_args()
+
+    collection_dirs = discover_collections(args.root)
+    if args.collections:
+        wanted = {f"Collection {c}" if c.isdigit() else c for c in args.collections}
+        collection_dirs = [d for d in collection_dirs if d.name in wanted]
+    if not collection_dirs:
+        print(f"❌ No collections with {SPEC_FILE} found in {args.root}")
+        return
+
+    print(f"📚 Processing {len(collection_dirs)} collections with {args.workers or os.cpu_count()} workers")
+    start = time.perf_counter()
+    reports = run_collections(
+        collection_dirs, args.workers, args.outlines and Path(args.outlines), args.output_name,
+        args.fused, args.debug_outlines and Path(args.debug_outlines)
+    )
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ {len(reports)} collections in {elapsed:.2f}s")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"elapsed": round(elapsed, 3), "collections": reports}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# bm25_index.py
+
+import os
+import json
+import math
+import heapq
+from pathlib import Path
+
+from features import clean_text
+from tfidf_index import TOKEN_PATTERN, fingerprint
+
+BM25_VERSION = 1
+K1 = 1.2
+B = 0.75
+# Scores are compared after rounding to 4 decimals; bounds keep this much slack
+ROUNDING = 1e-4
+
+
+def tokenize(text):
+    """Heading or query text as index terms (same tokens as the TF-IDF index)."""
+    return TOKEN_PATTERN.findall(clean_text(text))
+
+
+def new_index(k1=K1, b=B):
+    """
+    Empty BM25 inverted index over heading texts.
+
+    Every heading is one BM25 "document"; the outlines it came from are
+    tracked so a whole outline can be replaced or removed at once.
+    """
+    return {
+        "kind": "bm25",
+        "k1": k1,
+        "b": b,
+        "postings": {},     # term -> {heading id: term frequency}, ids ascending
+        "max_tf": {},       # term -> highest tf ever posted (an upper bound after removals)
+        "headings": {},     # heading id -> (document, text, page, level, length)
+        "documents": {},    # document -> {"headings": [ids], "source": fingerprint}
+        "total_length": 0,
+        "next_id": 0,
+    }
+
+
+def add_document(index, document, headings, source=None):
+    """
+    Adds (or replaces) the outline of one document.
+
+    Args:
+        index (dict): Result of new_index / load_index.
+        document (str): PDF file name the outline belongs to.
+        headings (list): 1(a) headings, e.g. [{"text": "Intro", "level": "H1", "page": 1}, ...]
+        source (str): Optional fingerprint of the file the outline was read from.
+    """
+    remove_document(index, document)
+    postings, max_tf = index["postings"], index["max_tf"]
+    ids = []
+    for h in headings:
+        hid = index["next_id"]
+        index["next_id"] += 1
+        terms = {}
+        for token in tokenize(h["text"]):
+            terms[token] = terms.get(token, 0) + 1
+        for term, tf in terms.items():
+            postings.setdefault(term, {})[hid] = tf
+            if tf > max_tf.get(term, 0):
+                max_tf[term] = tf
+        length = sum(terms.values())
+        # Tuples rather than dicts: a large corpus holds millions of these
+        index["headings"][hid] = (document, h["text"], h["page"], h["level"], length)
+        index["total_length"] += length
+        ids.append(hid)
+    index["documents"][document] = {"headings": ids, "source": source}
+
+
+def remove_document(index, document):
+    """
+    Drops a document's headings from the index.
+
+    Returns:
+        bool: False if the document was not indexed.
+    """
+    entry = index["documents"].pop(document, None)
+    if entry is None:
+        return False
+    postings, max_tf = index["postings"], index["max_tf"]
+    for hid in entry["headings"]:
+        _, text, _, _, length = index["headings"].pop(hid)
+        for term in set(tokenize(text)):
+            term_postings = postings[term]
+            del term_postings[hid]
+            if not term_postings:
+                del postings[term]
+                del max_tf[term]
+        index["total_length"] -= length
+    return True
+
+
+def read_outline(json_path):
+    """
+    Headings of a 1(a) outline JSON, skipping malformed entries.
+
+    Returns:
+        list | None: The headings, or None if the file has no valid outline.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data.get("outline"), list):
+        return None
+    return [
+        {"text": item["text"], "level": item["level"], "page": item["page"]}
+        for item in data["outline"]
+        if all(k in item for k in ["text", "level", "page"])
+    ]
+
+
+def sync_outlines(index, json_paths):
+    """
+    Brings the index in line with a set of 1(a) outline JSON files.
+
+    Outlines whose file changed (name, size or mtime) are re-read and
+    replaced, new ones are added, and documents with no file left are
+    removed; unchanged outlines are not read at all. The document name of
+    "doc1.json" is "doc1.pdf", as in main.py.
+
+    Returns:
+        tuple: (documents added or updated, documents removed)
+    """
+    changed = 0
+    current = set()
+    for json_path in json_paths:
+        document = f"{Path(json_path).stem}.pdf"
+        current.add(document)
+        source = fingerprint([json_path])
+        entry = index["documents"].get(document)
+        if entry is not None and entry["source"] == source:
+            continue
+        headings = read_outline(json_path)
+        if headings is None:
+            remove_document(index, document)
+            continue
+        add_document(index, document, headings, source)
+        changed += 1
+    stale = [d for d in index["documents"] if d not in current]
+    for document in stale:
+        remove_document(index, document)
+    return changed, len(stale)
+
+
+def save_index(index, path):
+    """
+    Writes the indexed outlines as JSON (postings are rebuilt on load).
+    """
+    documents = {}
+    for document, entry in index["documents"].items():
+        headings = [index["headings"][hid] for hid in entry["headings"]]
+        documents[document] = {
+            "source": entry["source"],
+            "headings": [{"text": text, "level": level, "page": page} for _, text, page, level, _ in headings],
+        }
+    data = {"version": BM25_VERSION, "k1": index["k1"], "b": index["b"], "documents": documents}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_index(path):
+    """
+    Loads an index written by save_index.
+
+    Returns:
+        dict | None: The index, or None if it is missing or from another version.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != BM25_VERSION:
+        return None
+    index = new_index(data["k1"], data["b"])
+    for document, entry in data["documents"].items():
+        add_document(index, document, entry["headings"], entry["source"])
+    return index
+
+
+def _query_terms(index, query_text):
+    """
+    (upper bound, weight, postings) per query term in the index, highest bound first.
+
+    A term's contribution to any heading is at most its BM25 weight at the
+    highest tf it has and the shortest possible heading (one token).
+    """
+    n = len(index["headings"])
+    k1, b = index["k1"], index["b"]
+    avgdl = index["total_length"] / n or 1.0
+    counts = {}
+    for token in tokenize(query_text):
+        if token in index["postings"]:
+            counts[token] = counts.get(token, 0) + 1
+    terms = []
+    for term, qtf in counts.items():
+        postings = index["postings"][term]
+        df = len(postings)
+        weight = qtf * math.log(1 + (n - df + 0.5) / (df + 0.5))
+        max_tf = index["max_tf"][term]
+        bound = weight * max_tf * (k1 + 1) / (max_tf + k1 * (1 - b + b / avgdl))
+        terms.append((bound, weight, postings))
+    terms.sort(key=lambda t: -t[0])
+    return terms, avgdl
+
+
+def search(index, query_text, top_n=10, documents=None):
+    """
+    Top headings by BM25 score, without scoring every heading.
+
+    Query terms are taken highest score bound first, and only headings in
+    their postings are candidates. Once the best top_n scores so far beat
+    the summed bounds of the terms not yet walked, no unseen heading can
+    enter the top_n and retrieval stops; a candidate is also dropped as
+    soon as its partial score plus the bounds of its remaining terms falls
+    short (MaxScore). Scores are rounded to 4 decimals; ties keep outline
+    order, as in rank_relevant_headings.
+
+    Args:
+        index (dict): Result of new_index / load_index.
+        query_text (str): Persona and task text.
+        top_n (int): Number of headings to return.
+        documents (list[str]): Only rank the headings of these documents.
+
+    Returns:
+        list[dict]: {"document", "text", "page", "level", "score"} per
+                    heading, best first. Only headings sharing a term
+                    with the query are returned.
+    """
+    if top_n <= 0 or not index["headings"]:
+        return []
+    terms, avgdl = _query_terms(index, query_text)
+    if not terms:
+        return []
+    k1, b = index["k1"], index["b"]
+    heading_info = index["headings"]
+    # remaining[i]: best possible score from terms i and later
+    remaining = [0.0] * (len(terms) + 1)
+    for i in range(len(terms) - 1, -1, -1):
+        remaining[i] = remaining[i + 1] + terms[i][0]
+
+    heap = []  # (score, -id): the worst of the current top_n on top
+
+    def offer(hid):
+        norm = k1 * (1 - b + b * heading_info[hid][4] / avgdl)
+        score = 0.0
+        for j, (_, weight, postings) in enumerate(terms):
+            if len(heap) == top_n and score + remaining[j] + ROUNDING < heap[0][0]:
+                return
+            tf = postings.get(hid)
+            if tf:
+                score += weight * tf * (k1 + 1) / (tf + norm)
+        entry = (round(score, 4), -hid)
+        if len(heap) < top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    if documents is not None:
+        # A few documents: their headings are the candidates
+        for document in documents:
+            entry = index["documents"].get(document)
+            for hid in entry["headings"] if entry else ():
+                offer(hid)
+    else:
+        seen = set()
+        for i, (_, _, postings) in enumerate(terms):
+            for hid in postings:
+                if len(heap) == top_n and remaining[i] + ROUNDING < heap[0][0]:
+                    break
+                if hid not in seen:
+                    seen.add(hid)
+                    offer(hid)
+            else:
+                continue
+            break
+
+    results = []
+    for score, neg_id in sorted(heap, reverse=True):
+        if score <= 0:
+            continue
+        document, text, page, level, _ = heading_info[-neg_id]
+        results.append({"document": document, "text": text, "page": page, "level": level, "score": score})
+    return results
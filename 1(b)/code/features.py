@@ -1,32 +1,54 @@
 # features.py
 
+import re
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+import hashing_index
 
 
-def extract_features(query, headings):
+def clean_text(text):
+    """
+    Lowercases text and replaces punctuation with spaces.
+
+    Args:
+        text (str): Raw heading or paragraph text.
+
+    Returns:
+        str: Cleaned text with single spaces between words.
+    """
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def extract_features(query, headings, stats=None):
     """
     Extracts similarity and length-based features for each heading given a query.
 
     Args:
         query (str): The persona query (e.g., "Find content useful for a beginner").
         headings (list[str]): List of heading strings.
+        stats (dict, optional): Corpus hashing statistics (see hashing_index);
+                                cosine similarity then uses the corpus IDF in
+                                fixed memory instead of a vocabulary fitted here.
 
     Returns:
         list[dict]: List of feature dictionaries, one per heading.
     """
     features = []
     
-    # Combine query + headings for joint vectorization
-    texts = [query] + headings
-    vectorizer = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = vectorizer.fit_transform(texts)
+    if stats is not None:
+        cosine_scores = hashing_index.relevance_scores(stats, query, headings, stop_words='english')
+    else:
+        # Combine query + headings for joint vectorization
+        texts = [query] + headings
+        vectorizer = TfidfVectorizer(stop_words='english')
+        tfidf_matrix = vectorizer.fit_transform(texts)
 
-    # Cosine similarity between query (0) and each heading (1 to N)
-    query_vec = tfidf_matrix[0:1]
-    heading_vecs = tfidf_matrix[1:]
-    cosine_scores = cosine_similarity(query_vec, heading_vec).flatten()
+        # Cosine similarity between query (0) and each heading (1 to N)
+        query_vec = tfidf_matrix[0:1]
+        heading_vecs = tfidf_matrix[1:]
+        cosine_scores = cosine_similarity(query_vec, heading_vecs).flatten()
 
     for i, heading in enumerate(headings):
         f = {
@@ -38,3 +60,48 @@ def extract_features(query, headings):
         features.append(f)
 
     return features
+
+
+# Columns of feature_matrix, in order
+FEATURE_NAMES = [
+    "cosine_similarity",
+    "heading_length",
+    "heading_word_count",
+    "starts_with_number",
+    "heading_level",
+    "page_position",
+]
+
+
+def heading_level(level):
+    """"H2" -> 2; anything else -> 0."""
+    match = re.match(r"H(\d+)$", str(level))
+    return int(match.group(1)) if match else 0
+
+
+def feature_matrix(cosine_scores, headings, last_pages):
+    """
+    Features of many headings (across documents) as one NumPy matrix.
+
+    The columns of extract_features plus the heading level and the
+    heading's position in its document, one row per heading, in FEATURE_NAMES order.
+
+    Args:
+        cosine_scores (array-like): Query similarity per heading.
+        headings (list[dict]): 1(a) headings with "text", "level" and "page".
+        last_pages (array-like): Last outline page of each heading's document.
+
+    Returns:
+        np.ndarray: (headings x features) float64 matrix.
+    """
+    n = len(headings)
+    texts = [h["text"] for h in headings]
+    matrix = np.empty((n, len(FEATURE_NAMES)))
+    matrix[:, 0] = cosine_scores
+    matrix[:, 1] = np.fromiter(map(len, texts), dtype=np.float64, count=n)
+    matrix[:, 2] = np.fromiter((len(t.split()) for t in texts), dtype=np.float64, count=n)
+    matrix[:, 3] = np.fromiter((t.strip()[:1].isdigit() for t in texts), dtype=np.float64, count=n)
+    matrix[:, 4] = np.fromiter((heading_level(h["level"]) for h in headings), dtype=np.float64, count=n)
+    pages = np.fromiter((h["page"] for h in headings), dtype=np.float64, count=n)
+    matrix[:, 5] = pages / np.maximum(np.asarray(last_pages, dtype=np.float64), 1)
+    return matrix
@@ -0,0 +1,185 @@
+# hashing_index.py
+
+import json
+import heapq
+import argparse
+from pathlib import Path
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+HASHING_VERSION = 1
+N_FEATURES = 2 ** 20 # Hash buckets: fixed memory whatever the corpus vocabulary
+CHUNK_SIZE = 10000 # Headings vectorized at a time
+
+
+def _vectorizer(n_features, stop_words=None):
+    # Same tokens as TfidfVectorizer (lowercase, 2+ word characters), raw counts
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None,
+                             stop_words=stop_words, dtype=np.float64)
+
+
+def new_stats(n_features=N_FEATURES):
+    """
+    Empty streaming IDF statistics: a document count and one document
+    frequency per hash bucket, so memory does not grow with the vocabulary.
+    """
+    return {"kind": "hashing", "n_features": n_features, "n_docs": 0,
+            "df": np.zeros(n_features, dtype=np.int64), "_idf": None}
+
+
+def update_stats(stats, texts):
+    """Adds a chunk of texts (each one counts as a document) to the IDF statistics."""
+    counts = _vectorizer(stats["n_features"]).transform(texts)
+    stats["df"] += np.bincount(counts.indices, minlength=stats["n_features"])
+    stats["n_docs"] += counts.shape[0]
+    stats["_idf"] = None
+
+
+def idf(stats):
+    """Smoothed IDF per bucket, as TfidfVectorizer computes it: ln((1 + n) / (1 + df)) + 1."""
+    if stats["_idf"] is None:
+        stats["_idf"] = np.log((1 + stats["n_docs"]) / (1 + stats["df"])) + 1
+    return stats["_idf"]
+
+
+def transform(stats, texts, stop_words=None):
+    """
+    L2-normalized TF-IDF rows for texts, weighted with the corpus IDF.
+
+    No vocabulary is fitted, so rows from different chunks (or runs) share
+    one feature space and their scores can be compared directly.
+    """
+    matrix = _vectorizer(stats["n_features"], stop_words).transform(texts).tocsr()
+    matrix.data *= idf(stats)[matrix.indices]
+    return normalize(matrix, copy=False)
+
+
+def relevance_scores(stats, query_text, texts, stop_words=None):
+    """Cosine similarity of a query with each text, in the corpus feature space."""
+    if not texts:
+        return []
+    matrix = transform(stats, [query_text] + list(texts), stop_words)
+    return (matrix[1:] @ matrix[0].T).toarray().ravel().tolist()
+
+
+# --- Outline corpora ---
+def iter_outline_chunks(json_files, chunk_size=CHUNK_SIZE):
+    """
+    Streams the headings of 1A outline JSON files in lists of at most chunk_size
+    {"document", "text", "page", "level"} records, one file open at a time.
+    """
+    chunk = []
+    for json_file in json_files:
+        json_file = Path(json_file)
+        try:
+            with open(json_file, encoding="utf-8") as f:
+                outline = json.load(f).get("outline", [])
+        except (OSError, ValueError):
+            print(f"⚠️ Could not read outline from {json_file.name}. Skipping.")
+            continue
+        for h in outline:
+            if all(k in h for k in ("text", "level", "page")):
+                chunk.append({"document": f"{json_file.stem}.pdf", "text": h["text"],
+                              "page": h["page"], "level": h["level"]})
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def build_stats(chunks, n_features=N_FEATURES):
+    """First pass over a corpus: IDF statistics from every heading, chunk by chunk."""
+    stats = new_stats(n_features)
+    for chunk in chunks:
+        update_stats(stats, [r["text"] for r in chunk])
+    return stats
+
+
+def search(stats, query_text, chunks, top_n=10):
+    """
+    Second pass over a corpus: the top_n headings for a query.
+
+    Only the current chunk and the top_n candidates so far are held in
+    memory. Ties keep corpus order.
+
+    Returns:
+        list[dict]: Records with an added "score", best first.
+    """
+    return search_many(stats, [query_text], chunks, top_n)[0]
+
+
+def search_many(stats, query_texts, chunks, top_n=10):
+    """search for many queries in the same pass: one sparse product per chunk for all of them."""
+    queries = transform(stats, query_texts)
+    best = [[] for _ in query_texts] # Min-heaps of (score, -position, record)
+    position = 0
+    for chunk in chunks:
+        chunk_scores = (transform(stats, [r["text"] for r in chunk]) @ queries.T).toarray()
+        for heap, scores in zip(best, chunk_scores.T):
+            # The chunk's own top_n, ties in chunk order; a later chunk only wins on a higher score
+            candidates = np.arange(len(scores))
+            if len(scores) > top_n:
+                candidates = np.flatnonzero(scores >= np.partition(scores, -top_n)[-top_n])
+            candidates = candidates[np.lexsort((candidates, -scores[candidates]))][:top_n]
+            for i in candidates:
+                item = (float(scores[i]), -(position + int(i)), chunk[i])
+                if len(heap) < top_n:
+                    heapq.heappush(heap, item)
+                elif item[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, item)
+        position += len(chunk)
+    return [
+        [dict(record, score=round(score, 4)) for score, _, record in sorted(heap, key=lambda item: (-item[0], -item[1]))]
+        for heap in best
+    ]
+
+
+def save_stats(stats, path):
+    with open(path, "wb") as f: # A file object, so numpy does not append ".npz" to the name
+        np.savez_compressed(f, version=HASHING_VERSION, n_features=stats["n_features"],
+                            n_docs=stats["n_docs"], df=stats["df"])
+
+
+def load_stats(path):
+    """IDF statistics saved by save_stats, or None if missing or from another version."""
+    try:
+        with np.load(path) as data:
+            if int(data["version"]) != HASHING_VERSION:
+                return None
+            stats = new_stats(int(data["n_features"]))
+            stats["n_docs"] = int(data["n_docs"])
+            stats["df"] = data["df"].astype(np.int64)
+    except (OSError, KeyError, ValueError):
+        return None
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranks headings across a large corpus of 1A outlines in fixed memory")
+    parser.add_argument("outlines", help="folder of 1A outline JSON files")
+    parser.add_argument("--persona", required=True)
+    parser.add_argument("--task", required=True)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--stats", help="IDF statistics file (.npz): loaded if present, else built and saved")
+    args = parser.parse_args()
+
+    json_files = sorted(Path(args.outlines).glob("*.json"))
+    stats = load_stats(args.stats) if args.stats else None
+    if stats is None:
+        print(f"🔨 Building IDF statistics over {len(json_files)} outlines")
+        stats = build_stats(iter_outline_chunks(json_files, args.chunk_size))
+        if args.stats:
+            save_stats(stats, args.stats)
+    print(f"📊 {stats['n_docs']} headings, {int(np.count_nonzero(stats['df']))} of {stats['n_features']} buckets used")
+
+    query_text = f"{args.persona} {args.task}"
+    for rank, r in enumerate(search(stats, query_text, iter_outline_chunks(json_files, args.chunk_size), args.top_n), 1):
+        print(f"{rank:3}. {r['score']:.4f}  {r['document']} p.{r['page']}  {r['text']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,12 @@ import json
 import os
 from pathlib import Path
 from datetime import datetime
-from persona_classifier import rank_relevant_headings, get_refined_text_for_section
-# If you used PyMuPDF (fitz) for parsing:
-# import fitz # Assuming PyMuPDF is installed
+from persona_classifier import rank_relevant_headings, refine_sections, split_passages
+from sections import build_section_index, section_text
+from tfidf_index import fingerprint, fit_index, save_index, load_index, document_counts
+from manifest import document_hash, open_manifest, load_document, store_document, save_manifest
+import bm25_index
+import ranker
 
 # --- Configuration ---
 # Your project's top-level folder
@@ -13,6 +16,14 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent # Points to 1(b)
 INPUT_PDF_DIR = PROJECT_ROOT / "Collection 1" / "pdf" # Where original PDFs are
 INPUT_JSON_DIR = PROJECT_ROOT / "Collection 1" # Where 1A output JSONs are (e.g., doc1.json, doc2.json)
 OUTPUT_FILE = PROJECT_ROOT / "Collection 1" / "challenge1b_output.json" # Output as per 1B spec
+INDEX_DIR = PROJECT_ROOT / "Collection 1" / "tfidf_index" # Collection TF-IDF index, rebuilt when inputs change
+CACHE_DIR = PROJECT_ROOT / "Collection 1" / "cache" # Per-document manifest and cached intermediates
+BM25_INDEX_FILE = PROJECT_ROOT / "Collection 1" / "bm25_index.json" # Inverted index over the 1A outlines, updated incrementally
+OUTLINE_STORE = PROJECT_ROOT / "Collection 1" / "outlines.olst" # 1A outlines in one columnar file (1(a) --store); read instead of the JSONs when present
+
+# Heading ranking backend: "tfidf" (collection TF-IDF index), "bm25" (inverted index, see bm25_index)
+# or "learned" (linear ranker over the heading features, see ranker)
+RANKING_BACKEND = "tfidf"
 
 # Define the persona and task (as per problem statement)
 # You would get these from an input file if not hardcoded for testing
@@ -25,17 +36,15 @@ TASK_DATA = {
     "description": "Prepare a comprehensive literature review focusing on methodologies, datasets, and performance benchmarks in Graph Neural Networks for Drug Discovery."
 }
 
-# --- PDF Parsing (Placeholder/Example - You need to implement this robustly) ---
-# This is crucial. Your current main.py only reads JSONs from 1A.
-# To get 'refined_text', you need the actual text content of sections from PDFs.
+# --- PDF Parsing ---
 def extract_full_text_and_sections_from_pdf(pdf_path, headings_from_1a):
     """
-    PLACEHOLDER: This function should parse a PDF and return its full text
-    and, crucially, the full text content for each identified section.
-    
-    In a real scenario, you'd iterate through pages, extract text, and
-    use the heading page numbers/levels to determine section boundaries.
-    
+    Opens the PDF once and indexes the body of every 1(a) heading.
+
+    Each section spans from its heading to the next heading at the same or
+    higher level; bodies are read back with `section_text`, which slices
+    the indexed text instead of re-reading pages.
+
     Args:
         pdf_path (Path): Path to the PDF file.
         headings_from_1a (list): List of headings from 1A output, e.g.,
@@ -43,72 +52,132 @@ def extract_full_text_and_sections_from_pdf(pdf_path, headings_from_1a):
 
     Returns:
         dict: {
-            "full_text": "...",
-            "sections_content": {
-                "Section Title 1": "Full text content of Section 1",
-                "Section Title 2": "Full text content of Section 2",
-                ...
-            }
+            "text": "...full document text...",
+            "spans": {("Section Title 1", 1): (start, end), ...}
         }
     """
-    # For demonstration, we'll return dummy content.
-    # YOU NEED TO IMPLEMENT THIS USING PDF PARSING LIBRARIES (e.g., pdfplumber or PyMuPDF).
-    
-    # Example using PyMuPDF (fitz):
-    # doc_full_text = ""
-    # sections_content = {}
-    # try:
-    #     doc = fitz.open(pdf_path)
-    #     for page_num in range(doc.page_count):
-    #         page = doc.load_page(page_num)
-    #         doc_full_text += page.get_text() + "\n"
-    #
-    #     # This part is complex: linking 1A headings to actual text blocks.
-    #     # You'd typically iterate through text blocks, identify headings,
-    #     # and then collect text until the next heading of a similar or higher level.
-    #     # For simplicity here, we'll just assume a fixed placeholder for sections_content
-    #     # You need to map the 'headings_from_1a' to text blocks in the PDF.
-    #     for h in headings_from_1a:
-    #         # This is a *very* simplified placeholder.
-    #         # In reality, you'd extract text between heading 'h' and the next heading
-    #         # or end of document.
-    #         sections_content[h["text"]] = f"Dummy content for '{h['text']}' on page {h['page']} from {pdf_path.name}. This text should be extracted directly from the PDF under this heading."
-    #
-    # except Exception as e:
-    #     print(f"Error parsing PDF {pdf_path}: {e}")
-    # return {"full_text": doc_full_text, "sections_content": sections_content}
-    
-    # --- Dummy Implementation for now to allow the rest of the code to run ---
-    dummy_sections_content = {}
-    for h in headings_from_1a:
-        # Placeholder for actual content extraction under each heading
-        dummy_sections_content[h["text"]] = f"This is placeholder content for the section titled '{h['text']}' from page {h['page']}." \
-                                            f" For the 'Graph Neural Networks' example, this might contain details about GNN architectures, training methodologies, or dataset usage." \
-                                            f" For 'Performance metrics', it would elaborate on benchmarks and results."
+    return build_section_index(pdf_path, headings_from_1a)
+
+
+def get_collection_index(documents, source_files, index_dir=None, source_key=None):
+    """
+    Loads the collection TF-IDF index, fitting and saving it first if it is
+    missing or was built from different files (or a different `source_key`,
+    see tfidf_index.fingerprint).
+
+    The index lives in `index_dir` (INDEX_DIR by default).
+    """
+    index_dir = INDEX_DIR if index_dir is None else index_dir
+    source_fingerprint = fingerprint(source_files, source_key)
+    index = load_index(index_dir, source_fingerprint)
+    if index is None:
+        print(f"🔨 Building TF-IDF index over {len(documents)} documents")
+        index = fit_index(documents, split_passages, source_fingerprint)
+        save_index(index, index_dir)
+        index = load_index(index_dir, source_fingerprint)
+    return index
+
+
+def get_bm25_index(json_files):
+    """
+    Loads the BM25 outline index and updates it for added, changed or removed 1A JSON files.
+    """
+    index = bm25_index.load_index(BM25_INDEX_FILE) or bm25_index.new_index()
+    changed, removed = bm25_index.sync_outlines(index, json_files)
+    if changed or removed or not BM25_INDEX_FILE.exists():
+        print(f"🔨 BM25 index: {changed} outlines added or updated, {removed} removed")
+        bm25_index.save_index(index, BM25_INDEX_FILE)
+    return index
+
+
+def parse_document(json_file, pdf_path, pdf_filename, outline=None):
+    """
+    Reads one document's 1A outline and indexes the sections of its PDF.
+
+    `outline` is the 1A {"title", "outline"} dict when it was already read
+    (e.g. from the outline store); `json_file` then only names its source.
+
+    Returns:
+        dict | None: {"document", "headings", "sections"}, or None if the
+                     JSON has no valid outline.
+    """
+    print(f"Processing document: {pdf_filename}")
+
+    # 1. Load headings from 1A's JSON output
+    json_1a_data = outline
+    if json_1a_data is None:
+        with open(json_file, "r", encoding="utf-8") as f:
+            json_1a_data = json.load(f)
     
-    return {
-        "full_text": "This is the full dummy text of the PDF. For a real solution, parse the PDF using a library.",
-        "sections_content": dummy_sections_content
-    }
+    # Ensure 'outline' key exists and is a list
+    if "outline" not in json_1a_data or not isinstance(json_1a_data["outline"], list):
+        print(f"❌ '{json_file.name}' does not contain a valid 'outline' key. Skipping.")
+        return None
 
+    headings_from_1a = []
+    for item in json_1a_data["outline"]:
+        # Ensure required keys exist for a heading
+        if all(k in item for k in ["text", "level", "page"]):
+            headings_from_1a.append({
+                "text": item["text"],
+                "level": item["level"],
+                "page": item["page"]
+            })
+        else:
+            print(f"⚠️ Malformed heading entry in {json_file.name}: {item}")
 
-def process_documents_for_1b():
-    all_extracted_sections = []
-    all_sub_section_analysis = []
-    input_document_filenames = []
+    # 2. Index the section bodies of the actual PDF (opened once)
+    section_index = extract_full_text_and_sections_from_pdf(pdf_path, headings_from_1a)
+    return {"document": pdf_filename, "headings": headings_from_1a, "sections": section_index}
 
-    # Get all JSON files from Round 1A output (assuming they are named like doc_name.json)
-    json_files = sorted(INPUT_JSON_DIR.glob("*.json"))
 
-    if not json_files:
-        print(f"❌ No JSON files found in {INPUT_JSON_DIR}. Ensure Round 1A outputs are present.")
-        return
+def outline_json_files(directory):
+    """
+    1A JSON outlines in a collection folder: every *.json except the 1B
+    output and the BM25 index, which are written next to them.
+    """
+    return sorted(p for p in Path(directory).glob("*.json") if p.name not in (OUTPUT_FILE.name, BM25_INDEX_FILE.name))
+
+
+def open_outline_store(path):
+    """Memory-maps a 1A outline store (see pdf_extract_kit/core/store.py in 1(a))."""
+    import pipeline # Puts the 1(a) kit on sys.path
+    from pdf_extract_kit.core.store import open_store
+    return open_store(path)
+
+
+def load_documents(json_files, pdf_dir, manifest=None, store=None):
+    """
+    Reads the 1A outlines of a collection and indexes the sections of their PDFs.
+
+    With a `manifest` (see manifest.py), documents whose outline and PDF
+    are unchanged since the last run are taken from the cache instead, and
+    new or changed ones are cached for the next run.
+
+    Args:
+        json_files (list[Path]): Round 1A output JSON files (doc1.json, ...).
+        pdf_dir (Path): Folder holding the matching PDFs (doc1.pdf, ...).
+        manifest (dict): Optional result of manifest.open_manifest.
+        store (dict): Optional result of open_outline_store; its outlines
+                      are used instead of json_files.
+
+    Returns:
+        tuple: (documents, source_files, input_document_filenames) where each
+               document is {"document", "headings", "sections"} and
+               source_files are the JSON and PDF paths that were read.
+    """
+    documents = []
+    source_files = []
+    input_document_filenames = []
 
     # Assuming the PDF names correspond to JSON names (e.g., doc1.json -> doc1.pdf)
-    for json_file in json_files:
-        doc_id = json_file.stem # e.g., "document_1"
-        pdf_filename = f"{doc_id}.pdf"
-        pdf_path = INPUT_PDF_DIR / pdf_filename
+    sources = [(json_file, f"{json_file.stem}.pdf") for json_file in json_files]
+    if store is not None:
+        from pdf_extract_kit.core.store import outline_hash, read_outline
+        sources = [(Path(store["path"]), name) for name in store["documents"]]
+
+    for json_file, pdf_filename in sources:
+        pdf_path = pdf_dir / pdf_filename
 
         if not pdf_path.exists():
             print(f"⚠️ Warning: Corresponding PDF '{pdf_filename}' not found for '{json_file.name}'. Skipping sub-section analysis for this document.")
@@ -118,48 +187,56 @@ def process_documents_for_1b():
             
         input_document_filenames.append(pdf_filename)
 
-        print(f"Processing document: {pdf_filename}")
+        if manifest is not None:
+            # The store keeps each outline's content hash; the outline is only decoded on a cache miss
+            outline_source = json_file if store is None else outline_hash(store, pdf_filename)
+            digest = document_hash(pdf_filename, outline_source, pdf_path)
+            cached = load_document(manifest, pdf_filename, digest)
+            if cached is not None:
+                documents.append(cached)
+                source_files += [json_file, pdf_path]
+                continue
 
-        # 1. Load headings from 1A's JSON output
-        with open(json_file, "r", encoding="utf-8") as f:
-            json_1a_data = json.load(f)
-        
-        # Ensure 'outline' key exists and is a list
-        if "outline" not in json_1a_data or not isinstance(json_1a_data["outline"], list):
-            print(f"❌ '{json_file.name}' does not contain a valid 'outline' key. Skipping.")
+        outline = None if store is None else read_outline(store, pdf_filename)
+        doc = parse_document(json_file, pdf_path, pdf_filename, outline)
+        if doc is None:
             continue
+        if manifest is not None:
+            doc["counts"] = document_counts(doc, split_passages)
+            store_document(manifest, pdf_filename, digest, doc)
+        documents.append(doc)
+        source_files += [json_file, pdf_path]
 
-        headings_from_1a = []
-        for item in json_1a_data["outline"]:
-            # Ensure required keys exist for a heading
-            if all(k in item for k in ["text", "level", "page"]):
-                headings_from_1a.append({
-                    "text": item["text"],
-                    "level": item["level"],
-                    "page": item["page"]
-                })
-            else:
-                print(f"⚠️ Malformed heading entry in {json_file.name}: {item}")
-
-
-        # 2. Extract full text content for sections from the actual PDF
-        # This is where your PDF parsing library comes in.
-        pdf_content = extract_full_text_and_sections_from_pdf(pdf_path, headings_from_1a)
-        sections_full_text = pdf_content["sections_content"]
-
-
-        # 3. Rank relevant headings
-        ranked_sections = rank_relevant_headings(
-            headings_from_1a,
-            PERSONA_DATA["description"],
-            TASK_DATA["description"],
-            top_n=20 # Get more than 10 to pick best for sub-section analysis later
-        )
+    return documents, source_files, input_document_filenames
 
-        # 4. Populate extracted_sections and sub_section_analysis
+
+def analyze_documents(documents, rankings, index, persona_description, task_description, verbose=True):
+    """
+    Turns the ranked headings of every document into extracted_sections and
+    sub_section_analysis entries.
+
+    The top 10 sections of all documents are refined together (see
+    refine_sections) rather than one section at a time.
+
+    Args:
+        documents (list): Documents from load_documents.
+        rankings (list): Each document's headings as ranked by rank_relevant_headings.
+        index (dict): Collection TF-IDF index, used to score section passages.
+        persona_description (str): Persona text.
+        task_description (str): Job-to-be-done text.
+        verbose (bool): Print a warning for sections with no content.
+
+    Returns:
+        tuple: (extracted_sections, sub_section_analysis) lists.
+    """
+    extracted_sections = []
+    to_refine = []
+
+    for doc, ranked_sections in zip(documents, rankings):
+        pdf_filename = doc["document"]
         for rank, section in enumerate(ranked_sections):
             # Assign importance_rank based on sorted order (1-based)
-            all_extracted_sections.append({
+            extracted_sections.append({
                 "document": pdf_filename,
                 "page_number": section["page"],
                 "section_title": section["text"],
@@ -169,23 +246,103 @@ def process_documents_for_1b():
             # For sub-section analysis, get refined text only for top N sections (e.g., top 5-10)
             # You can decide how many sections' sub-sections to analyze
             if rank < 10: # Analyze sub-sections for the top 10 relevant main sections
-                section_title = section["text"]
-                full_section_content = sections_full_text.get(section_title, "") # Get content from our PDF parsing
-                
+                full_section_content = section_text(doc["sections"], section) # Sliced from the section index
                 if full_section_content:
-                    refined_text = get_refined_text_for_section(
-                        full_section_content,
-                        PERSONA_DATA["description"],
-                        TASK_DATA["description"]
-                    )
-                    if refined_text: # Only add if we actually found refined text
-                        all_sub_section_analysis.append({
-                            "document": pdf_filename,
-                            "refined_text": refined_text,
-                            "page_number": section["page"] # Use the section's start page number
-                        })
-                else:
-                    print(f"⚠️ Warning: No content found for section '{section_title}' in {pdf_filename}. Skipping sub-section analysis.")
+                    to_refine.append((pdf_filename, section, full_section_content))
+                elif verbose:
+                    print(f"⚠️ Warning: No content found for section '{section['text']}' in {pdf_filename}. Skipping sub-section analysis.")
+
+    refined_texts = refine_sections(to_refine, persona_description, task_description, index=index)
+    sub_section_analysis = [
+        {
+            "document": pdf_filename,
+            "refined_text": refined_text,
+            "page_number": section["page"] # Use the section's start page number
+        }
+        for (pdf_filename, section, _), refined_text in zip(to_refine, refined_texts)
+        if refined_text # Only add if we actually found refined text
+    ]
+    return extracted_sections, sub_section_analysis
+
+
+def rank_collection(documents, index, ranking_index, persona_description, task_description, verbose=True):
+    """
+    Ranks the headings of every document and analyzes the sub-sections of the best ones.
+
+    Args:
+        documents (list): Documents from load_documents.
+        index (dict): Collection TF-IDF index (section passages are scored from it).
+        ranking_index (dict): Index headings are ranked with (the TF-IDF or a BM25 index),
+                              or linear ranker weights (see ranker).
+        persona_description (str): Persona text.
+        task_description (str): Job-to-be-done text.
+        verbose (bool): Print a warning for sections with no content.
+
+    Returns:
+        tuple: (extracted_sections, sub_section_analysis) over all documents.
+    """
+    # 3. Rank relevant headings
+    if ranking_index.get("kind") == "linear":
+        # The learned ranker scores the whole collection in one call
+        ranked = ranker.rank_headings(
+            index, f"{persona_description} {task_description}", [d["document"] for d in documents],
+            top_n=20, model=ranking_index
+        )
+        rankings = [ranked[doc["document"]] for doc in documents]
+        return analyze_documents(documents, rankings, index, persona_description, task_description, verbose)
+
+    rankings = [
+        rank_relevant_headings(
+            doc["headings"],
+            persona_description,
+            task_description,
+            top_n=20, # Get more than 10 to pick best for sub-section analysis later
+            index=ranking_index,
+            document=doc["document"]
+        )
+        for doc in documents
+    ]
+
+    # 4. Populate extracted_sections and sub_section_analysis
+    return analyze_documents(documents, rankings, index, persona_description, task_description, verbose)
+
+
+def process_documents_for_1b():
+    # Get all JSON files from Round 1A output (assuming they are named like doc_name.json)
+    json_files = outline_json_files(INPUT_JSON_DIR)
+
+    # A 1(a) outline store holds the whole batch in one memory-mapped file
+    store = None
+    if OUTLINE_STORE.exists():
+        store = open_outline_store(OUTLINE_STORE)
+        print(f"🗄️ Reading {len(store['documents'])} outlines from {OUTLINE_STORE.name}")
+    elif not json_files:
+        print(f"❌ No JSON files found in {INPUT_JSON_DIR}. Ensure Round 1A outputs are present.")
+        return
+
+    # Only new or changed documents are parsed; the rest come from the manifest cache
+    manifest = open_manifest(CACHE_DIR)
+    documents, source_files, input_document_filenames = load_documents(json_files, INPUT_PDF_DIR, manifest, store)
+    save_manifest(manifest, [p.name for p in INPUT_PDF_DIR.glob("*.pdf")])
+    if manifest["hits"]:
+        print(f"♻️ Reused {manifest['hits']} of {len(documents)} documents from {CACHE_DIR}")
+
+    # One TF-IDF model for the whole collection, fitted once and reused from disk
+    index = get_collection_index(documents, source_files)
+    ranking_index = index
+    if RANKING_BACKEND == "bm25" and store is not None:
+        # The incremental BM25 index tracks JSON files; from a store it is built in memory
+        ranking_index = bm25_index.new_index()
+        for doc in documents:
+            bm25_index.add_document(ranking_index, doc["document"], doc["headings"])
+    elif RANKING_BACKEND == "bm25":
+        ranking_index = get_bm25_index(json_files)
+    elif RANKING_BACKEND == "learned":
+        ranking_index = ranker.get_model()
+
+    all_extracted_sections, all_sub_section_analysis = rank_collection(
+        documents, index, ranking_index, PERSONA_DATA["description"], TASK_DATA["description"]
+    )
 
     # Final Output Structure
     final_output = {
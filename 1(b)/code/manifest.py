@@ -0,0 +1,131 @@
+# manifest.py
+
+import os
+import json
+import hashlib
+
+MANIFEST_VERSION = 2
+
+
+def document_hash(document, *paths):
+    """
+    Content hash of a document: its name and files, i.e. its 1A outline and
+    its PDF (or just the PDF when the outline is extracted in the same run).
+    A bytes argument is hashed as is, for outlines that do not live in a
+    file of their own (e.g. read from an outline store).
+
+    Content rather than mtime, so copied or re-checked-out files still hit the cache.
+    """
+    h = hashlib.sha256()
+    h.update(f"{MANIFEST_VERSION}\0{document}\0".encode("utf-8"))
+    for path in paths:
+        if isinstance(path, bytes):
+            h.update(path)
+        else:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def open_manifest(cache_dir):
+    """
+    Loads a collection's manifest, or starts an empty one.
+
+    The manifest maps each document to the hash it was processed at, per
+    source: "outline" (a 1A outline plus the PDF) or "pdf" (fused runs, PDF
+    only), which share a collection's cache. The intermediates of each live
+    next to it in <hash>.json.
+    """
+    manifest = {"dir": str(cache_dir), "documents": {}, "hits": 0, "misses": 0}
+    try:
+        with open(os.path.join(cache_dir, "manifest.json"), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return manifest
+    if data.get("version") == MANIFEST_VERSION:
+        manifest["documents"] = data["documents"]
+    return manifest
+
+
+def load_document(manifest, document, digest, source="outline"):
+    """
+    Cached intermediates of a document, if it was processed at this hash.
+
+    Returns:
+        dict | None: {"document", "headings", "sections", "counts"} or None.
+    """
+    if manifest["documents"].get(document, {}).get(source) != digest:
+        manifest["misses"] += 1
+        return None
+    try:
+        with open(os.path.join(manifest["dir"], f"{digest}.json"), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        manifest["misses"] += 1
+        return None
+    manifest["hits"] += 1
+    sections = data["sections"]
+    return {
+        "document": data["document"],
+        "headings": data["headings"],
+        "sections": {
+            "text": sections["text"],
+            "spans": {(text, page): (start, end) for text, page, start, end in sections["spans"]},
+        },
+        "counts": data["counts"],
+    }
+
+
+def store_document(manifest, document, digest, doc, source="outline"):
+    """
+    Caches a freshly processed document: its headings, section index and
+    index term counts (tfidf_index.document_counts).
+    """
+    os.makedirs(manifest["dir"], exist_ok=True)
+    data = {
+        "document": doc["document"],
+        "headings": doc["headings"],
+        "sections": {
+            "text": doc["sections"]["text"],
+            "spans": [[text, page, start, end] for (text, page), (start, end) in doc["sections"]["spans"].items()],
+        },
+        "counts": doc["counts"],
+    }
+    _write_json(os.path.join(manifest["dir"], f"{digest}.json"), data)
+    manifest["documents"].setdefault(document, {})[source] = digest
+
+
+def save_manifest(manifest, documents=None):
+    """
+    Writes the manifest and deletes the cached intermediates it no longer refers to.
+
+    An entry goes when its document was stored again at another hash from
+    the same source, or, if `documents` (the names of the collection's
+    documents, e.g. its PDFs) is given, when its document is no longer among
+    them. Documents this run did not load keep their entries, so a failed or
+    partial run, or a run from the other source, costs nothing cached.
+    """
+    if documents is not None:
+        documents = set(documents)
+        manifest["documents"] = {d: h for d, h in manifest["documents"].items() if d in documents}
+    if not manifest["documents"] and not os.path.isdir(manifest["dir"]):
+        return
+    os.makedirs(manifest["dir"], exist_ok=True)
+    _write_json(os.path.join(manifest["dir"], "manifest.json"),
+                {"version": MANIFEST_VERSION, "documents": manifest["documents"]})
+    keep = {f"{h}.json" for sources in manifest["documents"].values() for h in sources.values()} | {"manifest.json"}
+    for name in os.listdir(manifest["dir"]):
+        if name.endswith(".json") and name not in keep:
+            try:
+                os.remove(os.path.join(manifest["dir"], name))
+            except FileNotFoundError:
+                pass
+
+
+def _write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
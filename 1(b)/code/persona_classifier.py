@@ -1,14 +1,26 @@
 # persona_classifier.py
-from sklearn.feature_extraction.text import TfidfVectorizer
+import re
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from features import clean_text
+from tfidf_index import heading_scores, passage_scores, query_scores, rank_many
+import bm25_index
+import hashing_index
 
-def calculate_relevance_scores(query_text, texts_to_compare):
+def calculate_relevance_scores(query_text, texts_to_compare, stats=None):
     """
     Calculates cosine similarity scores between a query and a list of texts.
+
+    With corpus `stats` (see hashing_index) the texts are hashed and weighted
+    with the corpus IDF instead of fitting a vocabulary on them, so memory
+    stays fixed and scores are comparable across calls.
     """
     if not texts_to_compare:
         return []
+    if stats is not None:
+        return hashing_index.relevance_scores(stats, query_text, texts_to_compare)
 
     cleaned_texts = [clean_text(t) for t in texts_to_compare]
     # Fit on all texts including the query for a consistent vocabulary
@@ -20,15 +32,94 @@ def calculate_relevance_scores(query_text, texts_to_compare):
     scores = cosine_similarity(query_vec, texts_vecs).flatten()
     return scores.tolist()
 
-def rank_relevant_headings(headings, persona_description, task_description, top_n=10):
+def calculate_relevance_scores_many(query_text, text_groups):
+    """
+    calculate_relevance_scores for many lists of texts at once.
+
+    Every group is scored exactly as if a TF-IDF model were fitted on that
+    group plus the query (smoothed IDF from the group's own document
+    frequencies), but all texts are tokenized once and the per-group IDF,
+    norms and dot products are computed with whole-array operations.
+
+    Returns:
+        list[list[float]]: Scores per group, aligned with text_groups.
+    """
+    sizes = np.array([len(g) for g in text_groups], dtype=np.int64)
+    texts = [clean_text(t) for g in text_groups for t in g]
+    if not texts:
+        return [[] for _ in text_groups]
+    try:
+        counts = CountVectorizer().fit_transform(texts + [clean_text(query_text)]).tocsr()
+    except ValueError: # Nothing to tokenize: no text shares a term with the query
+        return [[0.0] * len(g) for g in text_groups]
+    counts.sort_indices()
+    X = counts[:-1].astype(np.float64)
+    query = counts[-1]
+    n_groups, vocabulary = len(text_groups), counts.shape[1]
+    group_of = np.repeat(np.arange(n_groups), sizes)
+
+    # Document frequency of every term within each group, the query counting as one more document
+    membership = sp.csr_matrix((np.ones(len(texts)), (group_of, np.arange(len(texts)))), shape=(n_groups, len(texts)))
+    present = X.copy()
+    present.data[:] = 1
+    query_present = sp.csr_matrix(
+        (np.ones(n_groups * query.nnz), np.tile(query.indices, n_groups), np.arange(n_groups + 1) * query.nnz),
+        shape=(n_groups, vocabulary),
+    )
+    df = (membership @ present + query_present).tocsr()
+    df.sort_indices()
+    df_keys = np.repeat(np.arange(n_groups, dtype=np.int64), np.diff(df.indptr)) * vocabulary + df.indices
+    n_docs = sizes + 1
+
+    def idf(groups, terms):
+        found = df.data[np.searchsorted(df_keys, groups * vocabulary + terms)]
+        return np.log((1 + n_docs[groups]) / (1 + found)) + 1
+
+    # Passages: tf-idf weights, norms and dot products with the query
+    rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+    row_groups = group_of[rows]
+    passage_idf = idf(row_groups, X.indices.astype(np.int64))
+    weights = X.data * passage_idf
+    query_tf = np.zeros(vocabulary)
+    query_tf[query.indices] = query.data
+    norms = np.sqrt(np.bincount(rows, weights ** 2, minlength=X.shape[0]))
+    dots = np.bincount(rows, weights * query_tf[X.indices] * passage_idf, minlength=X.shape[0])
+
+    # Query: its weights depend on each group's IDF
+    q_groups = np.repeat(np.arange(n_groups, dtype=np.int64), query.nnz)
+    q_terms = np.tile(query.indices.astype(np.int64), n_groups)
+    q_weights = np.tile(query.data.astype(np.float64), n_groups) * idf(q_groups, q_terms)
+    query_norms = np.sqrt(np.bincount(q_groups, q_weights ** 2, minlength=n_groups))
+
+    denominators = norms * query_norms[group_of]
+    scores = np.divide(dots, denominators, out=np.zeros_like(dots), where=denominators > 0)
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    return [scores[bounds[i]:bounds[i + 1]].tolist() for i in range(n_groups)]
+
+def rank_relevant_headings(headings, persona_description, task_description, top_n=10, index=None, document=None):
     """
     Ranks document headings by relevance to persona and task.
+
+    With a collection `index` (see tfidf_index) and the `document` file name,
+    scores come from the collection-wide TF-IDF model instead of a model
+    fitted on this document's headings alone. A BM25 index (see bm25_index)
+    ranks the document's indexed headings by BM25 instead; headings with no
+    query term in common follow with score 0, in outline order. Hashing
+    statistics (see hashing_index) score the headings against corpus-wide IDF.
     """
     persona_task_text = f"{persona_description} {task_description}"
 
+    if index is not None and index.get("kind") == "bm25":
+        return rank_with_bm25(index, headings, persona_task_text, top_n, document)
+
     results = []
-    heading_texts = [h["text"] for h in headings]
-    scores = calculate_relevance_scores(persona_task_text, heading_texts)
+    if index is not None and index.get("kind") == "hashing":
+        scores = calculate_relevance_scores(persona_task_text, [h["text"] for h in headings], stats=index)
+    elif index is not None:
+        scores = heading_scores(index, document, headings, persona_task_text)
+    else:
+        heading_texts = [h["text"] for h in headings]
+        scores = calculate_relevance_scores(persona_task_text, heading_texts)
 
     for i, h in enumerate(headings):
         results.append({
@@ -41,14 +132,48 @@ def rank_relevant_headings(headings, persona_description, task_description, top_
     results.sort(key=lambda x: -x["score"])
     return results[:top_n] # Ensure to return up to top_n
 
-def get_refined_text_for_section(section_full_text, persona_description, task_description, max_sentences=3):
+def rank_with_bm25(index, headings, query_text, top_n, document):
     """
-    Identifies the most relevant sentences/paragraphs within a given section's full text.
+    rank_relevant_headings on a BM25 index, padded to top_n with unmatched headings.
     """
-    if not section_full_text:
-        return ""
+    results = [
+        {"text": r["text"], "page": r["page"], "level": r["level"], "score": r["score"]}
+        for r in bm25_index.search(index, query_text, top_n, documents=[document])
+    ]
+    matched = {(r["text"], r["page"]) for r in results}
+    for h in headings:
+        if len(results) >= top_n:
+            break
+        if (h["text"], h["page"]) not in matched:
+            results.append({"text": h["text"], "page": h["page"], "level": h["level"], "score": 0.0})
+    return results
 
-    persona_task_text = f"{persona_description} {task_description}"
+def rank_for_personas(index, persona_tasks, documents=None, top_n=10):
+    """
+    Ranks headings for many persona/task pairs at once against a collection index.
+
+    Equivalent to calling rank_relevant_headings(..., index=index) for every
+    pair and document, but scored with one sparse matrix product (see
+    tfidf_index.rank_many).
+
+    Args:
+        index (dict): Collection index (see tfidf_index).
+        persona_tasks (list[tuple]): (persona_description, task_description) pairs.
+        documents (list[str]): Document file names; defaults to all indexed ones.
+        top_n (int): Headings kept per pair and document.
+
+    Returns:
+        list[dict]: One {document: ranked headings} dict per pair.
+    """
+    query_texts = [f"{persona} {task}" for persona, task in persona_tasks]
+    return rank_many(index, query_texts, documents, top_n)
+
+def split_passages(section_full_text):
+    """
+    Splits a section body into the paragraphs (or, failing that, sentences) that get scored.
+    """
+    if not section_full_text:
+        return []
 
     # Simple sentence tokenization (can be improved with NLTK if allowed and fits size)
     # For now, split by common delimiters.
@@ -76,14 +201,87 @@ def get_refined_text_for_section(section_full_text, persona_description, task_de
         texts_to_analyze = paragraphs
 
 
-    if not texts_to_analyze:
-        return ""
+    return texts_to_analyze
+
+def get_refined_text_for_section(section_full_text, persona_description, task_description, max_sentences=3,
+                                 index=None, document=None, heading=None):
+    """
+    Identifies the most relevant sentences/paragraphs within a given section's full text.
+
+    With a collection `index`, the `document` and `heading` of the section,
+    its passages are scored from the index instead of being re-vectorized.
+    """
+    persona_task_text = f"{persona_description} {task_description}"
 
-    scores = calculate_relevance_scores(persona_task_text, texts_to_analyze)
+    scored_texts = None
+    if index is not None and heading is not None:
+        scored_texts = passage_scores(index, document, heading, persona_task_text)
+    if scored_texts is None:
+        texts_to_analyze = split_passages(section_full_text)
+        if not texts_to_analyze:
+            return ""
+        scored_texts = list(zip(texts_to_analyze, calculate_relevance_scores(persona_task_text, texts_to_analyze)))
 
     # Combine text with scores and sort
-    scored_texts = sorted(zip(texts_to_analyze, scores), key=lambda x: x[1], reverse=True)
+    scored_texts = sorted(scored_texts, key=lambda x: x[1], reverse=True)
 
     # Take top `max_sentences` (or paragraphs) and join them
     refined_parts = [text for text, score in scored_texts[:max_sentences]]
-    return " ".join(refined_parts)
\ No newline at end of file
+    return " ".join(refined_parts)
+
+def refine_sections(sections, persona_description, task_description, max_sentences=3, index=None):
+    """
+    get_refined_text_for_section for many sections, across documents, in one pass.
+
+    Passages of indexed sections are scored with one product against the
+    collection index; the rest are scored with calculate_relevance_scores_many
+    (one tokenization for all of them instead of a TF-IDF fit per section).
+    The top passages of every section are then picked with one sort.
+
+    Args:
+        sections (list[tuple]): (document, heading, section_full_text) triples.
+        persona_description (str): Persona text.
+        task_description (str): Job-to-be-done text.
+        max_sentences (int): Passages kept per section.
+        index (dict, optional): Collection index (see tfidf_index).
+
+    Returns:
+        list[str]: Refined text per section, "" where there was nothing to score.
+    """
+    persona_task_text = f"{persona_description} {task_description}"
+    passages = [[] for _ in sections]
+    scores = [None] * len(sections)
+
+    indexed, unindexed = [], []
+    for i, (document, heading, section_full_text) in enumerate(sections):
+        row = None
+        if index is not None and heading is not None:
+            row = index["headings"].get((document, heading["text"], heading["page"]))
+        if row is not None:
+            rows = index["passages"].get(row, [])
+            passages[i] = [index["rows"][r]["text"] for r in rows]
+            indexed.append((i, rows))
+        else:
+            passages[i] = split_passages(section_full_text)
+            unindexed.append(i)
+
+    if indexed:
+        all_scores = query_scores(index, persona_task_text)
+        for i, rows in indexed:
+            scores[i] = all_scores[rows] if rows else np.zeros(0)
+    if unindexed:
+        for i, group_scores in zip(unindexed, calculate_relevance_scores_many(
+                persona_task_text, [passages[i] for i in unindexed])):
+            scores[i] = np.array(group_scores)
+
+    # Best passages per section: by section, then score (descending), then position
+    sizes = np.array([len(s) for s in scores], dtype=np.int64)
+    flat = np.concatenate(scores) if len(sections) else np.zeros(0)
+    section_of = np.repeat(np.arange(len(sections)), sizes)
+    position = np.arange(len(flat)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    order = np.lexsort((position, -flat, section_of))
+    refined = [[] for _ in sections]
+    starts = np.cumsum(sizes) - sizes
+    for k in order[(np.arange(len(order)) - starts[section_of[order]]) < max_sentences]:
+        refined[section_of[k]].append(passages[section_of[k]][position[k]])
+    return [" ".join(parts) for parts in refined]
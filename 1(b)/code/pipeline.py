@@ -0,0 +1,67 @@
+# pipeline.py
+
+import os
+import sys
+import json
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+# The 1(a) extraction kit sits next to this folder in the repository; in the
+# 1(b) container it is mounted and pointed to with PDF_EXTRACT_KIT_DIR
+KIT_DIR = Path(os.environ.get("PDF_EXTRACT_KIT_DIR") or Path(__file__).resolve().parent.parent.parent / "1(a)")
+if str(KIT_DIR) not in sys.path:
+    sys.path.append(str(KIT_DIR))
+
+from pdf_extract_kit.core.pages import build_page_model
+from pdf_extract_kit.core.extractor import EXTRACTOR_VERSION, extraction_settings, extract_outline_from_pages
+
+from sections import build_section_index
+from persona_classifier import split_passages
+from tfidf_index import document_counts
+
+
+def extractor_key():
+    """
+    Bytes naming the 1(a) extractor version and the settings that change its
+    outlines. Fused runs hash them with each PDF, so cached documents and
+    indexes are rebuilt when the extractor changes.
+    """
+    return json.dumps({"version": EXTRACTOR_VERSION, "settings": extraction_settings()}, sort_keys=True).encode("utf-8")
+
+
+def extract_document(pdf_path, pdf_filename, debug_dir=None):
+    """
+    Runs 1(a) outline extraction and 1(b) section indexing on one PDF in a single pass.
+
+    The PDF is opened and parsed into the 1(a) page model once; the outline
+    and the section index are both built from that model, so there is no
+    second PDF read and no JSON round-trip in between.
+
+    Args:
+        pdf_path (Path): Path to the PDF file.
+        pdf_filename (str): Document name used in the 1B output.
+        debug_dir (Path, optional): Also write the 1A outline JSON here, as 1(a) would.
+
+    Returns:
+        dict: {"document", "headings", "sections", "counts"}, the same shape
+              as main.parse_document plus the index term counts.
+    """
+    print(f"Processing document: {pdf_filename}")
+    with fitz.open(pdf_path) as doc:
+        pages = build_page_model(doc)
+        outline = extract_outline_from_pages(doc, pages)
+
+    if debug_dir is not None:
+        Path(debug_dir).mkdir(parents=True, exist_ok=True)
+        with open(Path(debug_dir) / f"{Path(pdf_filename).stem}.json", "w", encoding="utf-8") as f:
+            json.dump(outline, f, ensure_ascii=False, indent=2)
+
+    headings = [{"text": h["text"], "level": h["level"], "page": h["page"]} for h in outline["outline"]]
+    document = {
+        "document": pdf_filename,
+        "headings": headings,
+        "sections": build_section_index(pdf_path, headings, pages=pages),
+    }
+    document["counts"] = document_counts(document, split_passages)
+    return document
@@ -0,0 +1,300 @@
+# ranker.py
+
+import re
+import json
+import argparse
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from features import FEATURE_NAMES, feature_matrix
+from tfidf_index import query_scores
+
+MODEL_VERSION = 1
+WEIGHTS_FILE = Path(__file__).resolve().parent / "ranker_weights.json" # Trained offline with `python ranker.py`
+_MODEL = None # WEIGHTS_FILE, loaded once per process
+
+
+# --- Model ---
+def load_model(path=WEIGHTS_FILE):
+    """
+    Loads linear ranker weights written by save_model.
+
+    Returns:
+        dict: {"kind": "linear", "features", "mean", "scale", "weights", "bias", ...}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        model = json.load(f)
+    if model.get("version") != MODEL_VERSION or model.get("features") != FEATURE_NAMES:
+        raise ValueError(f"{path} was trained for other features; retrain with `python ranker.py`")
+    for key in ("mean", "scale", "weights"):
+        model[key] = np.asarray(model[key], dtype=np.float64)
+    return model
+
+
+def get_model():
+    """The shipped weights, loaded on first use and then kept."""
+    global _MODEL
+    if _MODEL is None:
+        _MODEL = load_model()
+    return _MODEL
+
+
+def save_model(model, path):
+    data = dict(model)
+    for key in ("mean", "scale", "weights"):
+        data[key] = [round(float(v), 8) for v in model[key]]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def score(model, matrix):
+    """Ranker score of every row of a feature_matrix: one matrix-vector product."""
+    return ((matrix - model["mean"]) / model["scale"]) @ model["weights"] + model["bias"]
+
+
+# --- Ranking ---
+def _layout(index):
+    """
+    Heading rows of a collection index with every feature that does not
+    depend on the query, built once per index and kept on it.
+    """
+    layout = index.get("_ranker_layout")
+    if layout is None:
+        rows = [i for i, row in enumerate(index["rows"]) if row["kind"] == "heading"]
+        headings = [index["rows"][i] for i in rows]
+        documents = list(dict.fromkeys(h["document"] for h in headings))
+        doc_ids = {doc: d for d, doc in enumerate(documents)}
+        doc_of = np.array([doc_ids[h["document"]] for h in headings], dtype=np.int64)
+        last_page = np.zeros(len(documents))
+        np.maximum.at(last_page, doc_of, [h["page"] for h in headings])
+        layout = index["_ranker_layout"] = {
+            "rows": np.array(rows, dtype=np.int64),
+            "documents": documents,
+            "doc_of": doc_of,
+            "matrix": feature_matrix(np.zeros(len(rows)), headings, last_page[doc_of]),
+        }
+    return layout
+
+
+def rank_headings(index, query_text, documents=None, top_n=10, model=None):
+    """
+    Ranks the headings of a whole collection with the linear ranker in one call.
+
+    Cosine similarity comes from the collection TF-IDF index; the other
+    features are computed once per index. Ordering is by score rounded to
+    4 decimals, ties in outline order, as in rank_relevant_headings.
+
+    Args:
+        index (dict): Collection index (see tfidf_index).
+        query_text (str): "persona task" text.
+        documents (list[str]): File names to rank; defaults to every indexed document.
+        top_n (int): Headings kept per document.
+        model (dict): Ranker weights; defaults to the shipped ones.
+
+    Returns:
+        dict: {document: [{"text", "page", "level", "score"}, ...]}
+    """
+    model = get_model() if model is None else model
+    layout = _layout(index)
+    wanted = layout["documents"] if documents is None else documents
+    results = {doc: [] for doc in wanted}
+    if not len(layout["rows"]):
+        return results
+
+    matrix = layout["matrix"].copy()
+    matrix[:, 0] = query_scores(index, query_text)[layout["rows"]]
+    scores = np.round(score(model, matrix), 4)
+
+    doc_of = layout["doc_of"]
+    order = np.lexsort((np.arange(len(scores)), -scores, doc_of))
+    starts = np.searchsorted(doc_of[order], np.arange(len(layout["documents"])))
+    rows = index["rows"]
+    for d, doc in enumerate(layout["documents"]):
+        if doc not in results:
+            continue
+        end = starts[d + 1] if d + 1 < len(starts) else len(order)
+        for k in order[starts[d]:min(end, starts[d] + top_n)]:
+            r = rows[layout["rows"][k]]
+            results[doc].append({"text": r["text"], "page": r["page"], "level": r["level"], "score": float(scores[k])})
+    return results
+
+
+# --- Training ---
+def _key(text):
+    return re.sub(r"\s+", "", text).lower()
+
+
+def heading_candidates(pages):
+    """
+    Heading-like lines of a PDF for training: larger than the body text or
+    all bold, 3-120 characters. Levels follow font size (largest is H1,
+    bold body text is H4), so every labelled title has a level to learn from.
+    """
+    sizes = Counter()
+    for page in pages:
+        for line in page["lines"]:
+            sizes[round(max(s["size"] for s in line["spans"]), 1)] += len(line["text"])
+    if not sizes:
+        return []
+    body = sizes.most_common(1)[0][0]
+    levels = {size: f"H{min(rank, 3)}" for rank, size in enumerate(sorted((s for s in sizes if s > body), reverse=True), 1)}
+
+    candidates = []
+    for page in pages:
+        for line in page["lines"]:
+            text = line["text"].strip()
+            size = round(max(s["size"] for s in line["spans"]), 1)
+            bold = all(s["flags"] & 16 for s in line["spans"] if s["text"].strip())
+            if 3 <= len(text) <= 120 and (size in levels or bold):
+                candidates.append({"text": text, "level": levels.get(size, "H4"), "page": page["number"]})
+    return candidates
+
+
+def collection_examples(collection_dir):
+    """
+    Feature rows and 0/1 labels for one collection: candidate headings of
+    every PDF its input spec lists, labelled 1 where they match a section of
+    its expected output/challenge1b_output.json.
+    """
+    import fitz  # PyMuPDF
+    import pipeline # Puts the 1(a) kit on sys.path
+    from pdf_extract_kit.core.pages import build_page_model
+    from sections import build_section_index
+    from persona_classifier import split_passages
+    from tfidf_index import fit_index
+
+    with open(collection_dir / "input" / "challenge1b_input.json", encoding="utf-8") as f:
+        spec = json.load(f)
+    with open(collection_dir / "output" / "challenge1b_output.json", encoding="utf-8") as f:
+        expected = json.load(f)
+    titles = {(s["document"], _key(s["section_title"])) for s in expected["extracted_sections"]}
+
+    documents = []
+    for d in spec["documents"]:
+        pdf_path = collection_dir / "pdf" / d["filename"]
+        if not pdf_path.exists():
+            continue
+        with fitz.open(pdf_path) as doc:
+            pages = build_page_model(doc)
+        headings = heading_candidates(pages)
+        documents.append({
+            "document": d["filename"],
+            "headings": headings,
+            "sections": build_section_index(pdf_path, headings, pages=pages),
+        })
+    index = fit_index(documents, split_passages)
+    layout = _layout(index)
+    matrix = layout["matrix"].copy()
+    matrix[:, 0] = query_scores(index, f"{spec['persona']['role']} {spec['job_to_be_done']['task']}")[layout["rows"]]
+    labels = np.array([
+        (index["rows"][i]["document"], _key(index["rows"][i]["text"])) in titles for i in layout["rows"]
+    ], dtype=np.int64)
+    return matrix, labels
+
+
+def ranking_metrics(scores, labels, k=10):
+    """
+    Average precision and relevant headings in the top ``k`` when every
+    candidate of a collection is ordered by ``scores`` (ties in row order).
+    """
+    hits = labels[np.argsort(-scores, kind="stable")]
+    found = np.flatnonzero(hits)
+    return {
+        "average_precision": round(float((np.arange(1, len(found) + 1) / (found + 1)).mean()), 4) if len(found) else 0.0,
+        f"hits_at_{k}": int(hits[:k].sum()),
+    }
+
+
+def fit(examples, C=1.0):
+    """
+    Fits a logistic regression on standardized features of labelled
+    (collection name, matrix, labels) examples and returns it as ranker weights.
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    X = np.vstack([matrix for _, matrix, _ in examples])
+    y = np.concatenate([labels for _, _, labels in examples])
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    classifier = LogisticRegression(C=C, class_weight="balanced", max_iter=1000).fit((X - mean) / scale, y)
+    return {
+        "version": MODEL_VERSION,
+        "kind": "linear",
+        "features": FEATURE_NAMES,
+        "mean": mean,
+        "scale": scale,
+        "weights": classifier.coef_[0],
+        "bias": float(classifier.intercept_[0]),
+        "trained_on": {"collections": [name for name, _, _ in examples], "examples": int(len(y)), "positives": int(y.sum()), "C": C},
+    }
+
+
+def held_out(examples, C=1.0):
+    """
+    Leave-one-collection-out evaluation: each labelled collection is ranked
+    by a model fitted on the others, and by cosine similarity alone.
+
+    Returns:
+        dict: {collection: {"model": metrics, "cosine": metrics}} (see ranking_metrics)
+    """
+    results = {}
+    for name, matrix, labels in examples:
+        model = fit([e for e in examples if e[0] != name], C)
+        results[name] = {
+            "model": ranking_metrics(score(model, matrix), labels),
+            "cosine": ranking_metrics(matrix[:, 0], labels),
+        }
+    return results
+
+
+def train(collection_dirs, C=1.0):
+    """
+    Fits the ranker on every labelled collection. With two or more, each
+    is also evaluated held out (see held_out) and the results are kept
+    with the weights under trained_on["held_out"].
+    """
+    examples = []
+    for collection_dir in collection_dirs:
+        try:
+            matrix, y = collection_examples(collection_dir)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ {collection_dir.name}: no usable expected output ({e}). Skipping.")
+            continue
+        print(f"📚 {collection_dir.name}: {len(y)} candidate headings, {int(y.sum())} labelled relevant")
+        if y.any():
+            examples.append((collection_dir.name, matrix, y))
+    if not examples:
+        raise ValueError("No labelled headings to train on")
+
+    model = fit(examples, C)
+    if len(examples) > 1:
+        model["trained_on"]["held_out"] = held_out(examples, C)
+    return model
+
+
+def main():
+    from main import PROJECT_ROOT
+    parser = argparse.ArgumentParser(description="Trains the linear heading ranker on the labelled 1(b) collections")
+    parser.add_argument("--root", default=str(PROJECT_ROOT), help="folder holding the collections")
+    parser.add_argument("--C", type=float, default=1.0, help="inverse L2 regularization strength")
+    parser.add_argument("--output", default=str(WEIGHTS_FILE))
+    args = parser.parse_args()
+
+    collection_dirs = sorted(p for p in Path(args.root).glob("Collection *") if (p / "output").is_dir())
+    model = train(collection_dirs, args.C)
+    save_model(model, args.output)
+    weights = ", ".join(f"{name} {w:+.3f}" for name, w in zip(FEATURE_NAMES, model["weights"]))
+    print(f"✅ Weights written to {args.output}: {weights}")
+    for name, result in model["trained_on"].get("held_out", {}).items():
+        print(f"🧪 {name} held out: AP {result['model']['average_precision']:.3f}, "
+              f"{result['model']['hits_at_10']} relevant in the top 10 "
+              f"(cosine alone: AP {result['cosine']['average_precision']:.3f}, {result['cosine']['hits_at_10']})")
+        if result["model"]["average_precision"] < result["cosine"]["average_precision"]:
+            print(f"⚠️ {name}: the fitted weights rank worse than cosine similarity alone")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# sections.py
+
+import re
+import fitz  # PyMuPDF
+
+
+def _key(text):
+    """Whitespace-free, lowercased form used to match headings against lines."""
+    return re.sub(r"\s+", "", text).lower()
+
+
+def _level(level):
+    """"H2" -> 2; anything unexpected sorts below every real heading level."""
+    match = re.match(r"H(\d+)$", str(level))
+    return int(match.group(1)) if match else 99
+
+
+def read_document(pdf_path):
+    """
+    Reads a PDF once into its full text plus an offset for every line.
+
+    Text blocks are separated by a blank line so paragraph splitting on
+    "\\n\\n" still works on the section slices.
+
+    Args:
+        pdf_path (Path | str): Path to the PDF file.
+
+    Returns:
+        tuple: (full_text, lines, page_starts) where lines is a list of
+               (page, start, end, key) tuples in reading order and
+               page_starts maps each 1-based page to its first offset.
+    """
+    parts = []
+    lines = []
+    page_starts = {}
+    offset = 0
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            page_num = page.number + 1
+            page_starts[page_num] = offset
+            for block in page.get_text("blocks"):
+                if block[6] != 0:
+                    continue  # image block
+                for line in block[4].splitlines():
+                    line = line.strip()
+                    if not line:
+                        continue
+                    lines.append((page_num, offset, offset + len(line) + 1, _key(line)))
+                    parts.append(line + "\n")
+                    offset += len(line) + 1
+                parts.append("\n")
+                offset += 1
+    return "".join(parts), lines, page_starts
+
+
+def read_pages(pages):
+    """
+    Same as read_document, but from an already parsed 1(a) page model
+    (pdf_extract_kit.core.pages), so the PDF is not read a second time.
+
+    Args:
+        pages (list): Page models from build_page, in page order.
+
+    Returns:
+        tuple: (full_text, lines, page_starts) exactly as read_document
+               returns them for the same PDF.
+    """
+    parts = []
+    lines = []
+    page_starts = {}
+    offset = 0
+    for page in pages:
+        page_starts[page["number"]] = offset
+        block = 0
+        for line in page["lines"]:
+            # Close the blocks before this line, including ones with only blank lines
+            parts.append("\n" * (line["block"] - block))
+            offset += line["block"] - block
+            block = line["block"]
+            text = line["text"].strip()
+            lines.append((page["number"], offset, offset + len(text) + 1, _key(text)))
+            parts.append(text + "\n")
+            offset += len(text) + 1
+        parts.append("\n" * (page["blocks"] - block))
+        offset += page["blocks"] - block
+    return "".join(parts), lines, page_starts
+
+
+def _locate(target, page_lines, cursor):
+    """Index into page_lines of the line holding the heading, scanning from cursor first."""
+    if not target:
+        return None
+    order = list(range(cursor, len(page_lines))) + list(range(cursor))
+    for k in order:
+        line = page_lines[k][3]
+        if line == target or line.startswith(target) or (len(line) >= 4 and target.startswith(line)):
+            return k
+    return None
+
+
+def build_section_index(pdf_path, headings, pages=None):
+    """
+    Opens the PDF once and maps every 1(a) heading to the span of its body.
+    With the page model of a fused 1(a) run the PDF is not opened at all.
+
+    A section runs from the line after its heading up to the next heading
+    at the same or a higher level (H1 closes H1-H4, H2 closes H2-H4, ...),
+    or to the end of the document. Headings that cannot be found in the
+    text layer (e.g. OCR'd from a scanned page) start at the top of their
+    page. Lines are matched in one forward pass per page, so building the
+    index stays linear in document size.
+
+    Args:
+        pdf_path (Path | str): Path to the PDF file.
+        headings (list): 1(a) headings, e.g.
+                         [{"text": "Intro", "level": "H1", "page": 1}, ...]
+        pages (list, optional): The PDF's 1(a) page model (see read_pages).
+
+    Returns:
+        dict: {
+            "text": full document text,
+            "spans": {(heading text, page): (start, end), ...}
+        }
+    """
+    text, lines, page_starts = read_document(pdf_path) if pages is None else read_pages(pages)
+
+    by_page = {}
+    for line in lines:
+        by_page.setdefault(line[0], []).append(line)
+    cursors = {}
+
+    located = []
+    for i, h in enumerate(headings):
+        page_lines = by_page.get(h["page"], [])
+        cursor = cursors.get(h["page"], 0)
+        k = _locate(_key(h["text"]), page_lines, cursor)
+        if k is not None:
+            _, heading_start, body_start, _ = page_lines[k]
+            cursors[h["page"]] = k + 1
+        else:
+            heading_start = body_start = page_starts.get(h["page"], len(text))
+        located.append((heading_start, i, body_start))
+    located.sort()
+
+    # Each heading closes every open section at its own level or below
+    bounds = {}
+    open_sections = []
+    for heading_start, i, body_start in located:
+        level = _level(headings[i]["level"])
+        while open_sections and open_sections[-1][0] >= level:
+            _, j, start = open_sections.pop()
+            bounds[j] = (start, max(start, heading_start))
+        open_sections.append((level, i, body_start))
+    for _, j, start in open_sections:
+        bounds[j] = (start, len(text))
+
+    spans = {}
+    for i, h in enumerate(headings):
+        spans.setdefault((h["text"], h["page"]), bounds[i])
+    return {"text": text, "spans": spans}
+
+
+def section_text(index, heading):
+    """
+    Body of a heading's section, sliced from the index without re-reading the PDF.
+
+    Args:
+        index (dict): Result of build_section_index.
+        heading (dict): A heading with "text" and "page" keys.
+
+    Returns:
+        str: Section body, or "" if the heading is not in the index.
+    """
+    span = index["spans"].get((heading["text"], heading["page"]))
+    if span is None:
+        return ""
+    start, end = span
+    return index["text"][start:end].strip()
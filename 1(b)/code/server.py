@@ -0,0 +1,350 @@
+# server.py
+
+import os
+import json
+import sys
+import time
+import queue
+import signal
+import socket
+import argparse
+import threading
+import socketserver
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from main import PROJECT_ROOT, outline_json_files, load_documents, get_collection_index, analyze_documents
+from manifest import open_manifest, save_manifest
+from persona_classifier import rank_for_personas
+from tfidf_index import fingerprint, prime_query_scores
+
+# Requests queued while a batch is scored form the next batch; a window > 0
+# also waits that long after the first request for more to arrive
+BATCH_WINDOW_MS = 0
+MAX_BATCH = 256
+REQUEST_TIMEOUT_S = 300 # Generous: the first request for a collection loads it
+LATENCY_WINDOW = 10000 # Latest requests kept for the percentiles
+TOP_N = 20 # Same as main.py
+
+
+# --- Collections ---
+def resolve_collection(root, collection_id):
+    """
+    Folder of a collection: its folder name under `root` ("Collection 1"), or just its number ("1").
+    """
+    name = str(collection_id)
+    if name.isdigit():
+        name = f"Collection {name}"
+    path = (root / name).resolve()
+    if path.parent != root.resolve() or not path.is_dir():
+        raise LookupError(f"Unknown collection: {collection_id}")
+    return path
+
+
+def collection_fingerprint(collection_dir):
+    """
+    Fingerprint (name, size, mtime) of a collection's 1A JSON files and PDFs;
+    it changes whenever an input file is added, removed or rewritten.
+    """
+    return fingerprint(outline_json_files(collection_dir) + sorted((collection_dir / "pdf").glob("*.pdf")))
+
+
+def load_collection(collection_dir):
+    """
+    Loads a collection the way main.py does: 1A JSON files in the collection
+    folder, PDFs in its pdf/ folder, cached intermediates in cache/ and the
+    TF-IDF index in tfidf_index/.
+    """
+    source_fingerprint = collection_fingerprint(collection_dir)
+    json_files = outline_json_files(collection_dir)
+    if not json_files:
+        raise LookupError(f"No 1A JSON files found in {collection_dir}")
+    manifest = open_manifest(collection_dir / "cache")
+    documents, source_files, input_document_filenames = load_documents(json_files, collection_dir / "pdf", manifest)
+    save_manifest(manifest, [p.name for p in (collection_dir / "pdf").glob("*.pdf")])
+    index = get_collection_index(documents, source_files, collection_dir / "tfidf_index")
+    return {"documents": documents, "index": index, "input_documents": input_document_filenames,
+            "fingerprint": source_fingerprint}
+
+
+def get_collection(state, collection_dir):
+    """
+    The warm collection, loaded on first use and reloaded when its input files
+    changed since (checked once per batch, from file stats only).
+    """
+    collection = state["collections"].get(collection_dir.name)
+    if collection is not None and collection["fingerprint"] != collection_fingerprint(collection_dir):
+        print(f"♻️ {collection_dir.name} changed on disk, reloading")
+        collection = None
+    if collection is None:
+        started = time.perf_counter()
+        collection = state["collections"][collection_dir.name] = load_collection(collection_dir)
+        print(f"📚 Loaded {collection_dir.name}: {len(collection['documents'])} documents "
+              f"in {time.perf_counter() - started:.2f}s")
+    return collection
+
+
+# --- Batching ---
+def new_state(root):
+    return {
+        "root": Path(root),
+        "collections": {}, # Only touched by the batching thread
+        "queue": queue.Queue(),
+        "lock": threading.Lock(), # Guards the counters and latencies below
+        "latencies": deque(maxlen=LATENCY_WINDOW),
+        "requests": 0,
+        "errors": 0,
+        "batches": 0,
+        "batched_requests": 0,
+    }
+
+
+def score_collection(collection, requests):
+    """Answers every request for one collection with one scoring pass."""
+    index = collection["index"]
+    documents = collection["documents"]
+    persona_tasks = [(r["persona"], r["task"]) for r in requests]
+    # One product for the passages of sub-section analysis, one for the headings
+    prime_query_scores(index, [f"{persona} {task}" for persona, task in persona_tasks])
+    rankings = rank_for_personas(index, persona_tasks, [d["document"] for d in documents], TOP_N)
+
+    for request, ranked in zip(requests, rankings):
+        extracted_sections, sub_section_analysis = analyze_documents(
+            documents, [ranked[d["document"]] for d in documents], index,
+            request["persona"], request["task"], verbose=False
+        )
+        request["result"] = {
+            "metadata": {
+                "collection": request["collection"].name,
+                "input_documents": collection["input_documents"],
+                "persona": {"role": request["persona"]},
+                "job_to_be_done": {"task": request["task"]},
+                "processing_timestamp": datetime.now().isoformat()
+            },
+            "extracted_sections": extracted_sections,
+            "sub_section_analysis": sub_section_analysis
+        }
+    # Cached query scores would otherwise grow with every distinct persona served
+    index["_query_scores"].clear()
+
+
+def score_batch(state, batch):
+    by_collection = {}
+    for request in batch:
+        by_collection.setdefault(request["collection"], []).append(request)
+    for collection_dir, requests in by_collection.items():
+        try:
+            score_collection(get_collection(state, collection_dir), requests)
+        except Exception as e:
+            for request in requests:
+                request["error"] = f"{type(e).__name__}: {e}"
+        for request in requests:
+            request["done"].set()
+    with state["lock"]:
+        state["batches"] += 1
+        state["batched_requests"] += len(batch)
+
+
+def batch_loop(state, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+    """
+    Scores every queued request (up to max_batch) together, waiting up to
+    window_ms after the first one for more. With no window an idle server
+    answers at once, and requests arriving during a batch share the next.
+    All scoring runs on this thread, so the warm collections need no locking.
+    """
+    while True:
+        batch = [state["queue"].get()]
+        deadline = time.perf_counter() + window_ms / 1000
+        while len(batch) < max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(state["queue"].get(timeout=remaining))
+                else:
+                    batch.append(state["queue"].get_nowait())
+            except queue.Empty:
+                break
+        score_batch(state, batch)
+
+
+def submit(state, collection_dir, persona, task):
+    """Queues a request and waits for its batch. Returns (result, error)."""
+    request = {
+        "collection": collection_dir,
+        "persona": persona,
+        "task": task,
+        "done": threading.Event(),
+        "result": None,
+        "error": None,
+    }
+    started = time.perf_counter()
+    state["queue"].put(request)
+    if not request["done"].wait(REQUEST_TIMEOUT_S):
+        request["error"] = "Timed out waiting for the ranking batch"
+    with state["lock"]:
+        state["requests"] += 1
+        if request["error"]:
+            state["errors"] += 1
+        else:
+            state["latencies"].append((time.perf_counter() - started) * 1000)
+    return request["result"], request["error"]
+
+
+def stats(state):
+    """Request counts, batch sizes and latency percentiles over the latest requests."""
+    with state["lock"]:
+        latencies = np.array(state["latencies"])
+        result = {
+            "requests": state["requests"],
+            "errors": state["errors"],
+            "batches": state["batches"],
+            "mean_batch_size": round(state["batched_requests"] / state["batches"], 2) if state["batches"] else None,
+        }
+    result["latency_ms"] = None
+    if len(latencies):
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        result["latency_ms"] = {
+            "p50": round(float(p50), 3),
+            "p90": round(float(p90), 3),
+            "p99": round(float(p99), 3),
+            "max": round(float(latencies.max()), 3),
+            "window": len(latencies),
+        }
+    result["collections"] = sorted(state["collections"])
+    return result
+
+
+# --- HTTP ---
+def parse_request(body):
+    """
+    Accepts {"collection", "persona", "task"} with plain strings, or the
+    challenge1b_input.json shapes {"persona": {"role"}, "job_to_be_done": {"task"}}.
+    """
+    persona = body.get("persona")
+    if isinstance(persona, dict):
+        persona = persona.get("role")
+    task = body.get("task")
+    if task is None and isinstance(body.get("job_to_be_done"), dict):
+        task = body["job_to_be_done"].get("task")
+    collection = body.get("collection")
+    if not all(isinstance(v, (str, int)) for v in (collection, persona, task)):
+        raise ValueError("Expected 'collection', 'persona' and 'task'")
+    return collection, str(persona), str(task)
+
+
+def make_handler(state, tcp=True):
+    class RankingHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, so clients can reuse connections
+        # Headers and body go out as two writes; with Nagle on, the body waits
+        # for the client's delayed ACK (~40 ms). Not a socket option on Unix sockets.
+        disable_nagle_algorithm = tcp
+
+        def send_json(self, status, payload):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self.send_json(200, stats(state))
+            elif self.path == "/health":
+                self.send_json(200, {"status": "ok", "collections": sorted(state["collections"])})
+            else:
+                self.send_json(404, {"error": f"Unknown path: {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/rank":
+                self.send_json(404, {"error": f"Unknown path: {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                collection_id, persona, task = parse_request(json.loads(self.rfile.read(length) or b"{}"))
+                collection_dir = resolve_collection(state["root"], collection_id)
+            except LookupError as e:
+                self.send_json(404, {"error": str(e)})
+                return
+            except (ValueError, AttributeError) as e:
+                self.send_json(400, {"error": str(e)})
+                return
+            result, error = submit(state, collection_dir, persona, task)
+            if error:
+                self.send_json(500, {"error": error})
+            else:
+                self.send_json(200, result)
+
+        def address_string(self):
+            # Unix socket peers have no (host, port) address
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+        def log_message(self, format, *args):
+            pass # Per-request logs would cost more than the ranking; see /stats
+
+    return RankingHandler
+
+
+class RankingHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128 # Listen backlog; the default of 5 resets bursts of clients
+
+
+class UnixHTTPServer(RankingHTTPServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        # HTTPServer.server_bind expects a (host, port) address
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm 1(b) ranking server with request batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--socket", help="serve on this Unix socket instead of TCP")
+    parser.add_argument("--root", default=str(PROJECT_ROOT), help="folder holding the collections")
+    parser.add_argument("--preload", nargs="*", default=[], help="collections to load before serving ('all' for every one)")
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_MS)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    args = parser.parse_args()
+
+    state = new_state(args.root)
+    preload = args.preload
+    if preload == ["all"]:
+        preload = sorted(p.name for p in state["root"].glob("Collection *") if p.is_dir())
+    for collection_id in preload:
+        get_collection(state, resolve_collection(state["root"], collection_id))
+
+    threading.Thread(
+        target=batch_loop, args=(state, args.batch_window_ms, args.max_batch), daemon=True
+    ).start()
+
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = UnixHTTPServer(args.socket, make_handler(state, tcp=False))
+        print(f"🚀 Ranking server listening on unix:{args.socket}")
+    else:
+        server = RankingHTTPServer((args.host, args.port), make_handler(state))
+        print(f"🚀 Ranking server listening on http://{args.host}:{server.server_port}")
+    # `docker stop` sends SIGTERM: shut down the same way as on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
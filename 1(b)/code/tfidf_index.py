@@ -0,0 +1,400 @@
+# tfidf_index.py
+
+import os
+import re
+import json
+import hashlib
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from features import clean_text
+
+# TfidfVectorizer's default tokenizer, so queries are tokenized like the corpus
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+INDEX_VERSION = 2
+
+
+def fingerprint(paths, extra=None):
+    """
+    Cheap change detector for the files an index was built from.
+
+    Args:
+        paths (list[Path | str]): PDFs and 1(a) JSON files of the collection.
+        extra (bytes, optional): Anything else the documents were built with,
+                                 e.g. the 1(a) extractor key of fused runs.
+
+    Returns:
+        str: Hex digest over each file's name, size and mtime, and `extra`.
+    """
+    h = hashlib.sha1()
+    for path in sorted(str(p) for p in paths):
+        st = os.stat(path)
+        h.update(f"{os.path.basename(path)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    if extra:
+        h.update(extra)
+    return h.hexdigest()
+
+
+def term_counts(text):
+    """Raw term counts of a text, tokenized the same way as queries."""
+    counts = {}
+    for token in TOKEN_PATTERN.findall(clean_text(text)):
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def document_counts(doc, split_passages):
+    """
+    Index rows of one document with their raw term counts.
+
+    These depend on nothing but the document, so they can be cached per
+    document (see manifest.py) and merged into a new collection index
+    without re-reading or re-tokenizing unchanged documents.
+
+    Args:
+        doc (dict): {"document", "headings", "sections"} as for fit_index.
+        split_passages (callable): Splits a section body into passages.
+
+    Returns:
+        dict: {"rows": [...], "counts": [{term: count}, ...]} with passage
+              rows pointing at their heading by position in this document.
+    """
+    from sections import section_text
+
+    rows = []
+    counts = []
+    for h in doc["headings"]:
+        heading_row = len(rows)
+        rows.append({"kind": "heading", "document": doc["document"], "text": h["text"],
+                     "page": h["page"], "level": h["level"]})
+        counts.append(term_counts(h["text"]))
+        for passage in split_passages(section_text(doc["sections"], h)):
+            rows.append({"kind": "passage", "document": doc["document"], "section": heading_row, "text": passage})
+            counts.append(term_counts(passage))
+    return {"rows": rows, "counts": counts}
+
+
+def fit_index(documents, split_passages, source_fingerprint=None):
+    """
+    Fits one TF-IDF model over every heading and section passage of a collection.
+
+    Weights are computed as scikit-learn's TfidfVectorizer does (smoothed
+    IDF, L2-normalized rows, alphabetical vocabulary) from per-document
+    term counts, so documents that carry cached "counts" are not
+    re-tokenized.
+
+    Args:
+        documents (list[dict]): One entry per document with "document" (file
+                                name), "headings" (1(a) headings) and
+                                "sections" (a sections.build_section_index
+                                result); optionally "counts" from document_counts.
+        split_passages (callable): Splits a section body into the passages
+                                   sub-section analysis scores.
+        source_fingerprint (str): Optional fingerprint stored with the index.
+
+    Returns:
+        dict: Index with "vocabulary", "idf", "matrix" (one L2-normalized
+              row per heading or passage), "rows" metadata and lookups.
+    """
+    rows = []
+    counts = []
+    for doc in documents:
+        part = doc.get("counts") or document_counts(doc, split_passages)
+        offset = len(rows)
+        for row in part["rows"]:
+            rows.append(dict(row, section=row["section"] + offset) if row["kind"] == "passage" else row)
+        counts += part["counts"]
+
+    vocabulary = sorted(set().union(*counts)) if counts else []
+    if not vocabulary:
+        # No text at all (e.g. only scanned PDFs with empty outlines)
+        return _with_lookups({
+            "version": INDEX_VERSION,
+            "fingerprint": source_fingerprint,
+            "vocabulary": [],
+            "idf": np.zeros(0),
+            "matrix": csr_matrix((len(rows), 0)),
+            "rows": rows,
+        })
+
+    columns = {term: col for col, term in enumerate(vocabulary)}
+    indptr = [0]
+    indices = []
+    data = []
+    for row_counts in counts:
+        for term, n in row_counts.items():
+            indices.append(columns[term])
+            data.append(n)
+        indptr.append(len(indices))
+    matrix = csr_matrix((np.asarray(data, dtype=np.float64), indices, indptr),
+                        shape=(len(rows), len(vocabulary)))
+    matrix.sort_indices()
+
+    df = np.bincount(matrix.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(rows)) / (1 + df)) + 1
+    matrix = csr_matrix(matrix.multiply(idf[None, :]))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = csr_matrix(matrix.multiply(1.0 / norms[:, None]))
+
+    return _with_lookups({
+        "version": INDEX_VERSION,
+        "fingerprint": source_fingerprint,
+        "vocabulary": vocabulary,
+        "idf": idf,
+        "matrix": matrix,
+        "rows": rows,
+    })
+
+
+def _with_lookups(index):
+    index["terms"] = {term: col for col, term in enumerate(index["vocabulary"])}
+    index["headings"] = {}
+    index["passages"] = {}
+    for i, row in enumerate(index["rows"]):
+        if row["kind"] == "heading":
+            index["headings"].setdefault((row["document"], row["text"], row["page"]), i)
+        else:
+            index["passages"].setdefault(row["section"], []).append(i)
+    index["_query_scores"] = {}
+    return index
+
+
+def save_index(index, index_dir):
+    """
+    Writes the index as plain .npy arrays plus JSON, so it can be memory-mapped.
+
+    Args:
+        index (dict): Result of fit_index.
+        index_dir (Path | str): Folder to write into (created if missing).
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    matrix = index["matrix"]
+    np.save(os.path.join(index_dir, "idf.npy"), index["idf"])
+    np.save(os.path.join(index_dir, "data.npy"), matrix.data)
+    np.save(os.path.join(index_dir, "indices.npy"), matrix.indices)
+    np.save(os.path.join(index_dir, "indptr.npy"), matrix.indptr)
+    meta = {
+        "version": index["version"],
+        "fingerprint": index["fingerprint"],
+        "shape": list(matrix.shape),
+        "vocabulary": index["vocabulary"],
+        "rows": index["rows"],
+    }
+    # meta.json goes last: its presence marks a complete index
+    tmp = os.path.join(index_dir, "meta.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(index_dir, "meta.json"))
+
+
+def load_index(index_dir, source_fingerprint=None):
+    """
+    Loads a saved index with its arrays memory-mapped read-only.
+
+    Args:
+        index_dir (Path | str): Folder written by save_index.
+        source_fingerprint (str): If given, an index built from different
+                                  files is treated as missing.
+
+    Returns:
+        dict | None: The index, or None if it is missing or stale.
+    """
+    try:
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != INDEX_VERSION:
+        return None
+    if source_fingerprint is not None and meta.get("fingerprint") != source_fingerprint:
+        return None
+
+    def load(name):
+        return np.load(os.path.join(index_dir, name), mmap_mode="r")
+
+    matrix = csr_matrix((load("data.npy"), load("indices.npy"), load("indptr.npy")),
+                        shape=tuple(meta["shape"]), copy=False)
+    return _with_lookups({
+        "version": meta["version"],
+        "fingerprint": meta["fingerprint"],
+        "vocabulary": meta["vocabulary"],
+        "idf": load("idf.npy"),
+        "matrix": matrix,
+        "rows": meta["rows"],
+    })
+
+
+def transform_query(index, query_text):
+    """
+    TF-IDF vector of a query in the index's vocabulary (dense, L2-normalized).
+
+    Terms the collection has never seen are dropped: they cannot match anything.
+    """
+    q = np.zeros(len(index["vocabulary"]))
+    for token in TOKEN_PATTERN.findall(clean_text(query_text)):
+        col = index["terms"].get(token)
+        if col is not None:
+            q[col] += 1.0
+    q *= index["idf"]
+    norm = np.linalg.norm(q)
+    return q / norm if norm else q
+
+
+def query_scores(index, query_text):
+    """
+    Cosine similarity of a query against every row of the index.
+
+    One sparse matrix-vector product per distinct query; the scores are
+    kept so ranking every document of a collection reuses them.
+    """
+    scores = index["_query_scores"].get(query_text)
+    if scores is None:
+        if index["matrix"].shape[1]:
+            scores = index["matrix"] @ transform_query(index, query_text)
+        else:
+            scores = np.zeros(index["matrix"].shape[0])
+        index["_query_scores"][query_text] = scores
+    return scores
+
+
+def prime_query_scores(index, query_texts):
+    """
+    Fills the per-query score cache for many queries with one sparse matrix product.
+
+    Afterwards heading_scores and passage_scores for these queries are
+    lookups. Callers serving many requests should clear
+    index["_query_scores"] when done, as the cache is otherwise unbounded.
+    """
+    pending = list(dict.fromkeys(t for t in query_texts if t not in index["_query_scores"]))
+    if not pending:
+        return
+    if index["matrix"].shape[1]:
+        scores = (index["matrix"] @ transform_queries(index, pending).T).toarray()
+    else:
+        scores = np.zeros((index["matrix"].shape[0], len(pending)))
+    for i, text in enumerate(pending):
+        index["_query_scores"][text] = scores[:, i]
+
+
+def transform_queries(index, query_texts):
+    """
+    TF-IDF matrix of many queries at once (sparse, one L2-normalized row per query).
+    """
+    terms = index["terms"]
+    rows, cols = [], []
+    for i, text in enumerate(query_texts):
+        for token in TOKEN_PATTERN.findall(clean_text(text)):
+            col = terms.get(token)
+            if col is not None:
+                rows.append(i)
+                cols.append(col)
+    cols = np.asarray(cols, dtype=np.int64)
+    counts = csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(len(query_texts), len(index["vocabulary"])))
+    counts.sum_duplicates()
+    q = counts.multiply(np.asarray(index["idf"])[None, :]).tocsr()
+    norms = np.sqrt(np.asarray(q.multiply(q).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return csr_matrix(q.multiply(1.0 / norms[:, None]))
+
+
+def _heading_layout(index):
+    """
+    Heading rows grouped per document, padded into a (documents x max headings) grid.
+
+    Built once per index and kept on it: the documents in index order, the
+    grid of row numbers (-1 for padding) and the CSR rows of every heading.
+    """
+    layout = index.get("_heading_layout")
+    if layout is None:
+        by_doc = {}
+        for i, row in enumerate(index["rows"]):
+            if row["kind"] == "heading":
+                by_doc.setdefault(row["document"], []).append(i)
+        documents = list(by_doc)
+        width = max((len(r) for r in by_doc.values()), default=0)
+        grid = np.full((len(documents), width), -1, dtype=np.int64)
+        for d, doc_rows in enumerate(by_doc.values()):
+            grid[d, :len(doc_rows)] = doc_rows
+        layout = index["_heading_layout"] = {"documents": documents, "grid": grid}
+    return layout
+
+
+def rank_many(index, query_texts, documents=None, top_n=10):
+    """
+    Ranks the headings of many documents for many queries in one pass.
+
+    All queries are scored against all headings with a single sparse
+    (queries x vocabulary) @ (vocabulary x headings) product; the per-document
+    top-k is then selected for every query at once on a padded score grid.
+    Ordering matches rank_relevant_headings: by score rounded to 4 decimals,
+    ties in outline order.
+
+    Args:
+        index (dict): Collection index (fit_index / load_index).
+        query_texts (list[str]): One "persona task" string per query.
+        documents (list[str]): File names to rank; defaults to every
+                               document in the index.
+        top_n (int): Headings kept per query and document.
+
+    Returns:
+        list[dict]: One {document: [ranked headings]} dict per query, each
+                    heading as {"text", "page", "level", "score"}.
+    """
+    layout = _heading_layout(index)
+    wanted = layout["documents"] if documents is None else documents
+    positions = {doc: d for d, doc in enumerate(layout["documents"])}
+    grid = layout["grid"][[positions[doc] for doc in wanted if doc in positions]]
+    present = [doc for doc in wanted if doc in positions]
+    results = [{doc: [] for doc in wanted} for _ in query_texts]
+    if not len(query_texts) or not grid.size:
+        return results
+
+    heading_rows = np.unique(grid[grid >= 0])
+    column = np.full(len(index["rows"]), -1, dtype=np.int64)
+    column[heading_rows] = np.arange(len(heading_rows))
+
+    q = transform_queries(index, query_texts)
+    # (queries x headings) scores in one product
+    scores = (q @ index["matrix"][heading_rows].T).toarray()
+    scores = np.round(scores, 4)
+
+    cells = np.where(grid >= 0, column[grid], 0)
+    grid_scores = scores[:, cells]                      # queries x documents x width
+    grid_scores[:, grid < 0] = -np.inf
+    k = min(top_n, grid.shape[1])
+    order = np.argsort(-grid_scores, axis=2, kind="stable")[:, :, :k]
+    top_scores = np.take_along_axis(grid_scores, order, axis=2)
+    top_rows = grid[np.arange(len(present))[None, :, None], order]
+
+    rows = index["rows"]
+    for qi, result in enumerate(results):
+        for d, doc in enumerate(present):
+            ranked = result[doc]
+            for row, score in zip(top_rows[qi, d], top_scores[qi, d]):
+                if row < 0:
+                    break
+                r = rows[row]
+                ranked.append({"text": r["text"], "page": r["page"], "level": r["level"], "score": float(score)})
+    return results
+
+
+def heading_scores(index, document, headings, query_text):
+    """Scores for a document's headings; headings missing from the index score 0."""
+    scores = query_scores(index, query_text)
+    rows = index["headings"]
+    return [
+        float(scores[rows[key]]) if key in rows else 0.0
+        for key in ((document, h["text"], h["page"]) for h in headings)
+    ]
+
+
+def passage_scores(index, document, heading, query_text):
+    """
+    (passage, score) pairs of a heading's section, or None if it is not indexed.
+    """
+    row = index["headings"].get((document, heading["text"], heading["page"]))
+    if row is None:
+        return None
+    scores = query_scores(index, query_text)
+    return [(index["rows"][i]["text"], float(scores[i])) for i in index["passages"].get(row, [])]
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 1(b) modules import each other by name, as when run from code/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
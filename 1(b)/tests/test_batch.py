@@ -0,0 +1,59 @@
+# test_batch.py
+
+import json
+import shutil
+from pathlib import Path
+
+from batch import OUTPUT_NAME, run_collections
+
+PDF = Path(__file__).resolve().parent.parent.parent / "1(a)" / "app" / "input" / "file01.pdf"
+
+
+def make_collection(root, name, documents):
+    collection_dir = root / name
+    (collection_dir / "input").mkdir(parents=True)
+    (collection_dir / "pdf").mkdir()
+    spec = {
+        "persona": {"role": "Travel Planner"},
+        "job_to_be_done": {"task": "Plan a trip"},
+        "documents": [{"filename": d, "title": d} for d in documents],
+    }
+    (collection_dir / "input" / "challenge1b_input.json").write_text(json.dumps(spec), encoding="utf-8")
+    for d in documents:
+        shutil.copy(PDF, collection_dir / "pdf" / d)
+    return collection_dir
+
+
+def snapshot(folder):
+    return {p.relative_to(folder): p.read_bytes() for p in sorted(folder.rglob("*")) if p.is_file()}
+
+
+def test_no_outlines_skips_collection(tmp_path):
+    collection_dir = make_collection(tmp_path, "Collection 1", ["a.pdf", "b.pdf"])
+    # Output and cache of an earlier run
+    (collection_dir / OUTPUT_NAME).write_text('{"previous": true}', encoding="utf-8")
+    (collection_dir / "cache").mkdir()
+    (collection_dir / "cache" / "manifest.json").write_text(
+        json.dumps({"version": 2, "documents": {"a.pdf": {"outline": "a1"}}}), encoding="utf-8")
+    (collection_dir / "cache" / "a1.json").write_text("{}", encoding="utf-8")
+    before = snapshot(collection_dir)
+
+    reports = run_collections([collection_dir], workers=1)
+
+    assert [r["status"] for r in reports] == ["skipped"]
+    assert reports[0]["documents"] == 0
+    assert snapshot(collection_dir) == before
+
+
+def test_empty_collection_does_not_hold_up_others(tmp_path):
+    empty = make_collection(tmp_path, "Collection 1", ["a.pdf"])
+    other = make_collection(tmp_path, "Collection 2", ["a.pdf"])
+    outline = {"title": "Doc", "outline": [{"level": "H1", "text": "Plan a trip", "page": 1}]}
+    (other / "a.json").write_text(json.dumps(outline), encoding="utf-8")
+
+    reports = run_collections([empty, other], workers=1)
+
+    assert [(r["collection"], r["status"]) for r in reports] == [("Collection 1", "skipped"), ("Collection 2", "ok")]
+    assert not (empty / OUTPUT_NAME).exists()
+    with open(other / OUTPUT_NAME, encoding="utf-8") as f:
+        assert json.load(f)["metadata"]["input_documents"] == ["a.pdf"]
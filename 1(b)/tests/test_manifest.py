@@ -0,0 +1,80 @@
+# test_manifest.py
+
+import json
+
+from manifest import document_hash, open_manifest, load_document, store_document, save_manifest
+
+
+def make_doc(name, text="Intro"):
+    return {
+        "document": name,
+        "headings": [{"text": text, "level": "H1", "page": 1}],
+        "sections": {"text": f"{text}\nBody", "spans": {(text, 1): (0, len(text) + 5)}},
+        "counts": {"rows": [], "counts": []},
+    }
+
+
+def cached_files(cache_dir):
+    return sorted(p.name for p in cache_dir.glob("*.json") if p.name != "manifest.json")
+
+
+def test_round_trip(tmp_path):
+    manifest = open_manifest(tmp_path)
+    store_document(manifest, "a.pdf", "h1", make_doc("a.pdf"))
+    save_manifest(manifest, ["a.pdf"])
+
+    manifest = open_manifest(tmp_path)
+    assert load_document(manifest, "a.pdf", "h1") == make_doc("a.pdf")
+    assert load_document(manifest, "a.pdf", "h2") is None
+    assert load_document(manifest, "a.pdf", "h1", source="pdf") is None
+    assert (manifest["hits"], manifest["misses"]) == (1, 2)
+
+
+def test_changed_document_evicts_only_its_old_entry(tmp_path):
+    manifest = open_manifest(tmp_path)
+    store_document(manifest, "a.pdf", "a1", make_doc("a.pdf"))
+    store_document(manifest, "a.pdf", "a1-fused", make_doc("a.pdf"), source="pdf")
+    store_document(manifest, "b.pdf", "b1", make_doc("b.pdf"))
+    save_manifest(manifest, ["a.pdf", "b.pdf"])
+
+    manifest = open_manifest(tmp_path)
+    store_document(manifest, "a.pdf", "a2", make_doc("a.pdf", "Changed"))
+    save_manifest(manifest, ["a.pdf", "b.pdf"])
+    # The fused entry of a.pdf and b.pdf, which this run did not load, stay
+    assert cached_files(tmp_path) == ["a1-fused.json", "a2.json", "b1.json"]
+
+
+def test_unvisited_documents_kept(tmp_path):
+    manifest = open_manifest(tmp_path)
+    store_document(manifest, "a.pdf", "a1", make_doc("a.pdf"))
+    store_document(manifest, "b.pdf", "b1", make_doc("b.pdf"))
+    save_manifest(manifest, ["a.pdf", "b.pdf"])
+
+    # A run that loads nothing (e.g. every 1A JSON missing) evicts nothing
+    save_manifest(open_manifest(tmp_path), ["a.pdf", "b.pdf"])
+    assert cached_files(tmp_path) == ["a1.json", "b1.json"]
+    save_manifest(open_manifest(tmp_path))
+    assert cached_files(tmp_path) == ["a1.json", "b1.json"]
+
+
+def test_removed_document_evicted(tmp_path):
+    manifest = open_manifest(tmp_path)
+    store_document(manifest, "a.pdf", "a1", make_doc("a.pdf"))
+    store_document(manifest, "a.pdf", "a1-fused", make_doc("a.pdf"), source="pdf")
+    store_document(manifest, "b.pdf", "b1", make_doc("b.pdf"))
+    save_manifest(manifest, ["a.pdf", "b.pdf"])
+
+    save_manifest(open_manifest(tmp_path), ["b.pdf"])
+    assert cached_files(tmp_path) == ["b1.json"]
+    with open(tmp_path / "manifest.json", encoding="utf-8") as f:
+        assert list(json.load(f)["documents"]) == ["b.pdf"]
+
+
+def test_document_hash(tmp_path):
+    outline = tmp_path / "a.json"
+    outline.write_text('{"outline": []}', encoding="utf-8")
+    digest = document_hash("a.pdf", outline)
+    assert document_hash("a.pdf", b'{"outline": []}') == digest
+    assert document_hash("b.pdf", outline) != digest
+    outline.write_text('{"outline": [1]}', encoding="utf-8")
+    assert document_hash("a.pdf", outline) != digest
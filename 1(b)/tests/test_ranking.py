@@ -0,0 +1,112 @@
+# test_ranking.py
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+import bm25_index
+from tfidf_index import fit_index, query_scores, rank_many, term_counts
+
+WORDS = ["travel", "plan", "trip", "city", "food", "hotel", "guide", "form", "pdf", "share", "sign", "tips"]
+
+
+def random_outlines(seed, documents=6):
+    rng = random.Random(seed)
+    outlines = {}
+    for d in range(documents):
+        outlines[f"doc{d}.pdf"] = [
+            {"text": " ".join(rng.choices(WORDS, k=rng.randint(1, 4))), "level": f"H{rng.randint(1, 3)}",
+             "page": rng.randint(1, 9)}
+            for _ in range(rng.randint(0, 12))
+        ]
+    queries = [" ".join(rng.choices(WORDS, k=rng.randint(1, 6))) for _ in range(5)]
+    return outlines, queries
+
+
+def tfidf_index(outlines):
+    documents = []
+    for name, headings in outlines.items():
+        rows = [{"kind": "heading", "document": name, "text": h["text"], "page": h["page"], "level": h["level"]}
+                for h in headings]
+        documents.append({"document": name, "headings": headings, "sections": None,
+                          "counts": {"rows": rows, "counts": [term_counts(h["text"]) for h in headings]}})
+    return fit_index(documents, split_passages=None)
+
+
+def exhaustive_tfidf(index, query, documents, top_n):
+    """Every heading scored on its own, then sorted by rounded score, ties in outline order."""
+    scores = query_scores(index, query)
+    ranked = {doc: [] for doc in documents}
+    for i, row in enumerate(index["rows"]):
+        if row["document"] in ranked:
+            ranked[row["document"]].append((-round(float(scores[i]), 4), i))
+    return {
+        doc: [(index["rows"][i]["text"], index["rows"][i]["page"], -s) for s, i in sorted(rows)[:top_n]]
+        for doc, rows in ranked.items()
+    }
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("top_n", [1, 3, 20])
+def test_rank_many_matches_exhaustive(seed, top_n):
+    outlines, queries = random_outlines(seed)
+    index = tfidf_index(outlines)
+    documents = list(outlines)
+    if seed % 2:
+        documents = documents[::2] + ["missing.pdf"]
+    for query, result in zip(queries, rank_many(index, queries, documents, top_n)):
+        expected = exhaustive_tfidf(index, query, [d for d in documents if d in outlines], top_n)
+        assert list(result) == documents
+        for doc, ranked in expected.items():
+            got = [(h["text"], h["page"], h["score"]) for h in result[doc]]
+            assert [(t, p) for t, p, _ in got] == [(t, p) for t, p, _ in ranked]
+            assert [s for _, _, s in got] == pytest.approx([s for _, _, s in ranked], abs=1e-9)
+        assert result.get("missing.pdf", []) == []
+
+
+def exhaustive_bm25(index, query, top_n, documents=None):
+    """BM25 of every heading against the query, best first, ties by heading id."""
+    headings = index["headings"]
+    n = len(headings)
+    k1, b = index["k1"], index["b"]
+    avgdl = index["total_length"] / n
+    query_terms = bm25_index.tokenize(query)
+    scored = []
+    for hid, (document, text, page, level, length) in headings.items():
+        if documents is not None and document not in documents:
+            continue
+        tokens = bm25_index.tokenize(text)
+        score = 0.0
+        for term in set(query_terms):
+            tf = tokens.count(term)
+            if not tf:
+                continue
+            df = len(index["postings"][term])
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += query_terms.count(term) * idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avgdl))
+        if round(score, 4) > 0:
+            scored.append((-round(score, 4), hid, document, text))
+    return [(document, text, -s) for s, _, document, text in sorted(scored)[:top_n]]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("top_n", [1, 5, 50])
+def test_bm25_top_k_matches_exhaustive(seed, top_n):
+    outlines, queries = random_outlines(seed)
+    index = bm25_index.new_index()
+    for name, headings in outlines.items():
+        bm25_index.add_document(index, name, headings)
+    # A replaced and a removed outline leave stale max_tf bounds behind
+    bm25_index.add_document(index, "doc0.pdf", outlines["doc0.pdf"][:2])
+    bm25_index.remove_document(index, "doc1.pdf")
+    if not index["headings"]:
+        pytest.skip("no headings left")
+    for query in queries:
+        for documents in (None, ["doc2.pdf", "doc3.pdf"]):
+            got = [(h["document"], h["text"], h["score"])
+                   for h in bm25_index.search(index, query, top_n, documents)]
+            expected = exhaustive_bm25(index, query, top_n, documents)
+            assert [g[:2] for g in got] == [e[:2] for e in expected]
+            assert np.allclose([g[2] for g in got], [e[2] for e in expected])
@@ -0,0 +1,147 @@
+"""BM25 inverted index at corpus scale: build, incremental updates and top-k retrieval.
+
+Generates a synthetic corpus of 1(a)-style outlines (default 20000) from
+the section titles and refined text in the bundled 1(b) outputs, plus a
+Zipf-distributed tail of made-up terms so the vocabulary has the long
+tail of a real corpus rather than a few hundred words. Then:
+
+  build      add_document for every outline
+  update     replace 1% of the outlines and remove another 1%
+  search     early-terminating bm25_index.search for each collection persona
+  exhaustive the same queries scoring every heading (documents=all)
+
+Both search paths must return identical rankings; the run fails otherwise.
+
+    python benchmarks/bench_bm25.py --documents 20000 --output bm25.json
+"""
+import os
+import re
+import sys
+import json
+import glob
+import time
+import random
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "1(b)", "code"))
+
+import bm25_index
+
+COLLECTIONS = sorted(glob.glob(os.path.join(ROOT, "1(b)", "Collection *")))
+
+
+def load_sources():
+    """Real heading titles, a word list with natural frequencies, and the collection queries."""
+    titles, words, queries = [], [], []
+    for collection in COLLECTIONS:
+        with open(os.path.join(collection, "input", "challenge1b_input.json"), encoding="utf-8") as f:
+            spec = json.load(f)
+        query = f"{spec['persona']['role']} {spec['job_to_be_done']['task']}"
+        if query not in queries:
+            queries.append(query)
+        for path in glob.glob(os.path.join(collection, "output", "*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    output = json.load(f)
+            except ValueError:
+                continue
+            titles += [s["section_title"] for s in output.get("extracted_sections", [])]
+            for s in output.get("subsection_analysis", []):
+                words += re.findall(r"[A-Za-z]{3,}", s["refined_text"])
+    return titles, words or ["document"], queries
+
+
+def make_outline(rng, titles, words, tail):
+    headings = []
+    for page in range(1, rng.randint(2, 20) + 1):
+        for _ in range(rng.randint(0, 3)):
+            if titles and rng.random() < 0.3:
+                text = rng.choice(titles)
+            else:
+                text = " ".join(
+                    rng.choice(words) if rng.random() < 0.5 else f"term{min(int(rng.paretovariate(1.0)), tail)}"
+                    for _ in range(rng.randint(2, 9))
+                ).title()
+            headings.append({"text": text, "level": rng.choice(["H1", "H2", "H3"]), "page": page})
+    return headings
+
+
+def timed(run, repeat=1):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20000, help="synthetic outlines to index")
+    parser.add_argument("--vocabulary", type=int, default=50000, help="size of the synthetic term tail")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per query (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    titles, words, queries = load_sources()
+    corpus = {f"doc{i:06d}.pdf": make_outline(rng, titles, words, args.vocabulary) for i in range(args.documents)}
+
+    index = bm25_index.new_index()
+
+    def build():
+        for document, headings in corpus.items():
+            bm25_index.add_document(index, document, headings)
+
+    _, build_s = timed(build)
+    headings = len(index["headings"])
+    print(f"🔨 {args.documents} outlines, {headings} headings, {len(index['postings'])} terms "
+          f"indexed in {build_s:.2f}s ({args.documents / build_s:.0f} outlines/s)")
+
+    names = list(corpus)
+    changed = rng.sample(names, max(1, args.documents // 100))
+    removed = rng.sample([n for n in names if n not in set(changed)], max(1, args.documents // 100))
+
+    def update():
+        for document in changed:
+            bm25_index.add_document(index, document, make_outline(rng, titles, words, args.vocabulary))
+        for document in removed:
+            bm25_index.remove_document(index, document)
+
+    _, update_s = timed(update)
+    print(f"♻️ {len(changed)} outlines replaced and {len(removed)} removed in {update_s * 1000:.1f} ms")
+
+    everything = list(index["documents"])
+    report = {
+        "documents": args.documents,
+        "headings": headings,
+        "terms": len(index["postings"]),
+        "build_s": round(build_s, 3),
+        "update_s": round(update_s, 4),
+        "queries": [],
+    }
+    for query in queries:
+        fast, search_s = timed(lambda: bm25_index.search(index, query, args.top_n), args.repeat)
+        full, exhaustive_s = timed(lambda: bm25_index.search(index, query, args.top_n, documents=everything), 1)
+        if fast != full:
+            print(f"❌ Rankings differ for: {query}")
+            return 1
+        report["queries"].append({
+            "query": query,
+            "search_ms": round(search_s * 1000, 3),
+            "exhaustive_ms": round(exhaustive_s * 1000, 3),
+        })
+        print(f"🔎 {search_s * 1000:8.2f} ms early-terminating vs {exhaustive_s * 1000:8.2f} ms exhaustive  {query[:60]}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
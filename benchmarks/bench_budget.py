@@ -0,0 +1,76 @@
+"""Latency budget: extract_outline on a scanned PDF with and without a per-document deadline.
+
+Builds an image-only PDF from the bundled 1(a) inputs (bench_ocr.py), then
+extracts its outline --runs times with no budget and with each --deadline.
+Reports p50/p99 wall time, headings found and how many pages were OCR'd
+at LOW_DPI, sampled out or skipped at the deadline. Needs Tesseract.
+
+    python benchmarks/bench_budget.py --pages 60 --deadlines 30 10 3 --runs 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "1(a)"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_ocr import build_scanned_pdf
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def run(path, deadline_s, max_pages, runs):
+    from pdf_extract_kit.core.extractor import extract_outline
+    times, headings, degraded, skipped = [], [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = extract_outline(path, deadline_s, max_pages)
+        times.append(time.perf_counter() - start)
+        budget = result.get("budget", {"degraded": [], "skipped": []})
+        headings.append(len(result["outline"]))
+        degraded.append(len(budget["degraded"]))
+        skipped.append(len(budget["skipped"]))
+    return {
+        "deadline_s": deadline_s,
+        "p50_s": round(statistics.median(times), 2),
+        "p99_s": round(percentile(times, 99), 2),
+        "headings": round(statistics.mean(headings), 1),
+        "degraded_pages": round(statistics.mean(degraded), 1),
+        "skipped_pages": round(statistics.mean(skipped), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--deadlines", type=float, nargs="+", default=[30, 10, 3], help="seconds per document")
+    parser.add_argument("--max-pages", type=int, default=None)
+    parser.add_argument("--runs", type=int, default=5, help="extractions per setting")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_scanned_pdf(os.path.join(tmp, "scanned.pdf"), args.pages)
+        report = {"pages": args.pages, "runs": []}
+        for deadline_s in [None] + args.deadlines:
+            row = run(path, deadline_s, args.max_pages, args.runs)
+            report["runs"].append(row)
+            label = "none" if deadline_s is None else f"{deadline_s:g}s"
+            print(f"⏳ deadline {label:>6}  p50 {row['p50_s']:7.2f}s  p99 {row['p99_s']:7.2f}s  "
+                  f"{row['headings']:6.1f} headings  {row['degraded_pages']:5.1f} degraded  {row['skipped_pages']:5.1f} skipped")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
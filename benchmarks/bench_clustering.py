@@ -0,0 +1,77 @@
+"""Heading-level clustering: scikit-learn KMeans vs exact 1-D DP (kmeans_1d).
+
+Times both on the font sizes of the heading candidates from the bundled
+1(a) inputs and on synthetic documents of growing size, and checks that the
+DP's within-cluster SSE is never worse.
+
+    python benchmarks/bench_clustering.py
+"""
+import os
+import sys
+import json
+import time
+
+import numpy as np
+
+from bench_ocr import ROOT, INPUT_DIR
+
+sys.path.insert(0, os.path.join(ROOT, "1(a)", "pdf-outline", "pdf_outline_extractor"))
+
+from pdf_extract_kit.core.clustering import kmeans_1d  # noqa: E402
+
+
+def sse(x, labels, centers):
+    return float(sum(((x[labels == c] - centers[c]) ** 2).sum() for c in range(len(centers))))
+
+
+def time_it(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - start) / repeat * 1000, out
+
+
+def bundled_font_sizes():
+    import fitz  # PyMuPDF
+    from pdf_extract_kit.core.pages import build_page_model
+    from pdf_extract_kit.core.extractor import extract_text_blocks, filter_heading_candidates
+
+    sizes = {}
+    for name in sorted(os.listdir(INPUT_DIR)):
+        doc = fitz.open(os.path.join(INPUT_DIR, name))
+        candidates = filter_heading_candidates(extract_text_blocks(build_page_model(doc)))
+        if len(candidates) >= 2:
+            sizes[name] = np.array([b["font_size"] for b in candidates])
+    return sizes
+
+
+def main():
+    try:
+        from sklearn.cluster import KMeans
+    except ImportError:
+        KMeans = None
+        print("⚠️ scikit-learn not installed, timing kmeans_1d only", file=sys.stderr)
+
+    rng = np.random.default_rng(0)
+    cases = dict(bundled_font_sizes())
+    for n in (100, 1000, 10000):
+        cases[f"synthetic_{n}"] = rng.choice([9, 10, 10.5, 11, 12, 14, 16, 18, 20, 24], size=n).astype(float)
+
+    results = []
+    for name, x in cases.items():
+        k = min(4, len(np.unique(x)))
+        dp_ms, (labels, centers) = time_it(lambda: kmeans_1d(x, k), 20)
+        row = {"case": name, "n": len(x), "k": k, "dp_ms": round(dp_ms, 3), "dp_sse": round(sse(x, labels, centers), 4)}
+        if KMeans is not None:
+            def fit():
+                return KMeans(n_clusters=k, random_state=0, n_init=10).fit(x.reshape(-1, 1))
+            km_ms, km = time_it(fit, 3)
+            row["kmeans_ms"] = round(km_ms, 3)
+            row["kmeans_sse"] = round(float(km.inertia_), 4)
+            row["speedup"] = round(km_ms / dp_ms, 1)
+        results.append(row)
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Out-of-core heading ranking: hashing featurizer with streaming IDF vs in-memory TF-IDF.
+
+Streams a synthetic corpus of 1(a)-style outlines (the bench_bm25.py
+generator, regenerated from its seed for each pass rather than stored)
+and ranks every heading for each collection persona:
+
+  hashing   hashing_index: one pass for the IDF statistics, one pass
+            scoring every query chunk by chunk with a running top-k
+  tfidf     TfidfVectorizer fitted on every heading in memory, then
+            the same queries (skipped above --tfidf-max documents)
+
+Each mode runs in a fresh process, so its peak RSS is its own. Where
+both run, the top-k headings are compared.
+
+    python benchmarks/bench_hashing.py --documents 10000 100000 300000 --output hashing.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "1(b)", "code"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_bm25 import load_sources, make_outline
+from bench_suite import isolated, peak_rss_mb
+
+
+def iter_chunks(documents, seed, vocabulary, chunk_size):
+    """The synthetic corpus as hashing_index chunks, identical on every call."""
+    rng = random.Random(seed)
+    titles, words, _ = load_sources()
+    chunk = []
+    for i in range(documents):
+        for h in make_outline(rng, titles, words, vocabulary):
+            chunk.append(dict(h, document=f"doc{i:06d}.pdf"))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_hashing(documents, seed, vocabulary, chunk_size, top_n):
+    import hashing_index
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    stats = hashing_index.build_stats(iter_chunks(documents, seed, vocabulary, chunk_size))
+    build_s = time.perf_counter() - start
+    _, _, queries = load_sources()
+    start = time.perf_counter()
+    rankings = hashing_index.search_many(stats, queries, iter_chunks(documents, seed, vocabulary, chunk_size), top_n)
+    results = [[(r["document"], r["text"], r["page"]) for r in ranked] for ranked in rankings]
+    return {
+        "headings": stats["n_docs"],
+        "build_s": round(build_s, 2),
+        "search_s": round((time.perf_counter() - start) / len(queries), 2),
+        "rss_growth_mb": round(peak_rss_mb() - baseline, 1),
+        "top": results,
+    }
+
+
+def run_tfidf(documents, seed, vocabulary, chunk_size, top_n):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    records = [r for chunk in iter_chunks(documents, seed, vocabulary, chunk_size) for r in chunk]
+    vectorizer = TfidfVectorizer()
+    matrix = vectorizer.fit_transform([r["text"] for r in records])
+    build_s = time.perf_counter() - start
+    _, _, queries = load_sources()
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        scores = (matrix @ vectorizer.transform([query]).T).toarray().ravel()
+        order = sorted(range(len(records)), key=lambda i: (-round(float(scores[i]), 4), i))[:top_n]
+        results.append([(records[i]["document"], records[i]["text"], records[i]["page"]) for i in order])
+    return {
+        "headings": len(records),
+        "vocabulary": len(vectorizer.vocabulary_),
+        "build_s": round(build_s, 2),
+        "search_s": round((time.perf_counter() - start) / len(queries), 2),
+        "rss_growth_mb": round(peak_rss_mb() - baseline, 1),
+        "top": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--tfidf-max", type=int, default=100000, help="largest corpus run through in-memory TF-IDF")
+    parser.add_argument("--vocabulary", type=int, default=200000, help="size of the synthetic term tail")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    report = []
+    for documents in args.documents:
+        params = (documents, args.seed, args.vocabulary, args.chunk_size, args.top_n)
+        row = {"documents": documents, "hashing": isolated(run_hashing, *params)}
+        if documents <= args.tfidf_max:
+            row["tfidf"] = isolated(run_tfidf, *params)
+            # Rounded scores tie often; compare the sets of top headings
+            row["same_top"] = all(
+                set(h) == set(t) for h, t in zip(row["hashing"]["top"], row["tfidf"]["top"])
+            )
+        for mode in ("hashing", "tfidf"):
+            if mode in row:
+                r = row[mode]
+                r.pop("top")
+                print(f"🧮 {documents:7} outlines  {mode:7}  {r['headings']:8} headings  build {r['build_s']:6.2f}s  "
+                      f"search {r['search_s']:6.2f}s/query  +{r['rss_growth_mb']:7.1f} MB")
+        if "same_top" in row:
+            print(f"   top-{args.top_n} {'identical' if row['same_top'] else 'differs'} between the two")
+        report.append(row)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
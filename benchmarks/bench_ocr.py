@@ -0,0 +1,86 @@
+"""OCR throughput: per-call pytesseract vs the persistent OCR worker pipeline.
+
+Builds an image-only PDF from the bundled 1(a) inputs, then OCRs every page
+both ways and prints pages/sec.
+
+    python benchmarks/bench_ocr.py --pages 24 --workers 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import fitz  # PyMuPDF
+import pytesseract
+from PIL import Image
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "1(a)"))
+
+INPUT_DIR = os.path.join(ROOT, "1(a)", "app", "input")
+
+
+def build_scanned_pdf(path, pages, dpi=150):
+    """Rasterises the bundled PDFs into an image-only PDF of `pages` pages."""
+    out = fitz.open()
+    sources = [fitz.open(os.path.join(INPUT_DIR, f)) for f in sorted(os.listdir(INPUT_DIR)) if f.endswith(".pdf")]
+    source_pages = [page for doc in sources for page in doc]
+    for i in range(pages):
+        page = source_pages[i % len(source_pages)]
+        pix = page.get_pixmap(dpi=dpi)
+        new_page = out.new_page(width=page.rect.width, height=page.rect.height)
+        new_page.insert_image(new_page.rect, pixmap=pix)
+    out.save(path)
+    return path
+
+
+def per_call(doc, lang, dpi):
+    """What the extractors did before: render RGB, spawn tesseract per page, in sequence."""
+    for page in doc:
+        pix = page.get_pixmap(dpi=dpi)
+        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        pytesseract.image_to_string(img, lang=lang)
+
+
+def pipelined(doc, lang, dpi):
+    from pdf_extract_kit.core import ocr
+    for _, text in ocr.ocr_pages(doc, range(len(doc)), lang=lang, dpi=dpi):
+        if isinstance(text, Exception):
+            raise text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=None, help="OCR worker processes")
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--dpi", type=int, default=300)
+    args = parser.parse_args()
+
+    if args.workers:
+        os.environ["OCR_WORKERS"] = str(args.workers)
+    from pdf_extract_kit.core import ocr
+    from pdf_extract_kit.core.raster import render_page
+
+    path = build_scanned_pdf(os.path.join("/tmp", "bench_ocr_scanned.pdf"), args.pages)
+    doc = fitz.open(path)
+
+    # Start the workers (and load models) outside the timed run
+    ocr.submit(render_page(doc[0], 72), args.lang).result()
+
+    results = {"pages": len(doc), "lang": args.lang, "dpi": args.dpi,
+               "workers": ocr.OCR_WORKERS, "backend": ocr.OCR_BACKEND}
+    for name, fn in (("per_call", per_call), ("pipelined", pipelined)):
+        start = time.perf_counter()
+        fn(doc, args.lang, args.dpi)
+        elapsed = time.perf_counter() - start
+        results[name] = {"seconds": round(elapsed, 3), "pages_per_sec": round(len(doc) / elapsed, 2)}
+        print(f"{name:>10}: {len(doc)} pages in {elapsed:.2f}s → {len(doc) / elapsed:.2f} pages/s")
+
+    print(f"   speedup: {results['per_call']['seconds'] / results['pipelined']['seconds']:.2f}x")
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Per-page OCR time: fixed multi-language pack vs the detected language set.
+
+Uses the same image-only PDF as bench_ocr.py. The detected run includes the
+cost of detection itself.
+
+    python benchmarks/bench_ocr_lang.py --pages 12 --fixed eng+hin+deu+fra
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import fitz  # PyMuPDF
+
+from bench_ocr import ROOT, build_scanned_pdf  # noqa: F401  (ROOT puts 1(a) on sys.path)
+
+
+def run(doc, lang):
+    from pdf_extract_kit.core import ocr
+    for _, text in ocr.ocr_pages(doc, range(len(doc)), lang=lang):
+        if isinstance(text, Exception):
+            raise text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--fixed", default="eng+hin+deu+fra", help="language pack the extractors used to hard-code")
+    args = parser.parse_args()
+
+    from pdf_extract_kit.core.lang import detect_ocr_lang, installed_langs
+
+    fixed = "+".join(lang for lang in args.fixed.split("+") if lang in installed_langs())
+    if fixed != args.fixed:
+        print(f"⚠️ only {fixed} of {args.fixed} is installed", file=sys.stderr)
+
+    doc = fitz.open(build_scanned_pdf(os.path.join("/tmp", "bench_ocr_scanned.pdf"), args.pages))
+
+    start = time.perf_counter()
+    detected = detect_ocr_lang(doc)
+    detect_seconds = time.perf_counter() - start
+
+    results = {"pages": len(doc), "detect_seconds": round(detect_seconds, 3)}
+    for name, lang in (("fixed", fixed), ("detected", detected)):
+        run(doc, lang)  # warm the pool for this language set
+        start = time.perf_counter()
+        run(doc, lang)
+        elapsed = time.perf_counter() - start + (detect_seconds if name == "detected" else 0.0)
+        results[name] = {"lang": lang, "seconds_per_page": round(elapsed / len(doc), 3)}
+        print(f"{name:>9} ({lang}): {elapsed / len(doc):.3f} s/page")
+
+    saved = results["fixed"]["seconds_per_page"] - results["detected"]["seconds_per_page"]
+    print(f"    saved: {saved:.3f} s/page")
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
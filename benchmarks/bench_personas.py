@@ -0,0 +1,131 @@
+"""Persona ranking throughput: per-call TF-IDF vs collection index vs batched scoring.
+
+For each 1(b) collection, extracts the outlines with the 1(a) extractor,
+fits the collection TF-IDF index in memory, and ranks N persona/task
+queries against every document three ways:
+
+  per-call   rank_relevant_headings without an index (refits per document)
+  indexed    rank_relevant_headings with the collection index, one query at a time
+  batched    rank_for_personas: all N queries in one sparse matrix product
+
+The first query is the collection's own persona and task; the rest are
+random vocabulary samples, seeded so runs are comparable.
+
+    python benchmarks/bench_personas.py --personas 1 10 1000 --output personas.json
+"""
+import os
+import sys
+import json
+import glob
+import time
+import random
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "1(a)"))
+sys.path.append(os.path.join(ROOT, "1(b)", "code"))
+
+from pdf_extract_kit.core.extractor import extract_outline
+from persona_classifier import rank_relevant_headings, rank_for_personas, split_passages
+from sections import build_section_index
+from tfidf_index import fit_index
+
+COLLECTIONS = sorted(glob.glob(os.path.join(ROOT, "1(b)", "Collection *")))
+
+
+def load_collection(collection):
+    with open(os.path.join(collection, "input", "challenge1b_input.json"), encoding="utf-8") as f:
+        spec = json.load(f)
+    documents = []
+    for d in spec["documents"]:
+        pdf_path = os.path.join(collection, "pdf", d["filename"])
+        if not os.path.exists(pdf_path):
+            continue
+        headings = extract_outline(pdf_path)["outline"]
+        documents.append({
+            "document": d["filename"],
+            "headings": headings,
+            "sections": build_section_index(pdf_path, headings),
+        })
+    return spec, documents
+
+
+def make_queries(spec, index, n, seed=0):
+    rng = random.Random(seed)
+    queries = [(spec["persona"]["role"], spec["job_to_be_done"]["task"])]
+    vocabulary = index["vocabulary"] or ["document"]
+    while len(queries) < n:
+        persona = " ".join(rng.choices(vocabulary, k=3))
+        task = " ".join(rng.choices(vocabulary, k=8))
+        queries.append((persona, task))
+    return queries[:n]
+
+
+def per_query(documents, queries, top_n, index=None):
+    for persona, task in queries:
+        for doc in documents:
+            rank_relevant_headings(doc["headings"], persona, task, top_n=top_n,
+                                   index=index, document=doc["document"])
+
+
+def timed(run, repeat):
+    """Best of `repeat` runs, in seconds: one CPU is easily disturbed."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--personas", type=int, nargs="+", default=[1, 10, 1000])
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement (best is reported)")
+    parser.add_argument("--per-call-max", type=int, default=10,
+                        help="largest N to run the slow per-call baseline for")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    report = []
+    for collection in COLLECTIONS:
+        spec, documents = load_collection(collection)
+        index = fit_index(documents, split_passages)
+        headings = sum(len(d["headings"]) for d in documents)
+        print(f"📚 {os.path.basename(collection)}: {len(documents)} documents, {headings} headings, "
+              f"{len(index['vocabulary'])} terms")
+
+        for n in args.personas:
+            queries = make_queries(spec, index, n)
+            row = {"collection": os.path.basename(collection), "personas": n,
+                   "documents": len(documents), "headings": headings}
+            if n <= args.per_call_max:
+                row["per_call_s"] = timed(lambda: per_query(documents, queries, args.top_n), args.repeat)
+
+            def indexed():
+                # Cold per-query score cache, as for a fresh set of personas
+                index["_query_scores"].clear()
+                per_query(documents, queries, args.top_n, index)
+
+            row["indexed_s"] = timed(indexed, args.repeat)
+            row["batched_s"] = timed(lambda: rank_for_personas(index, queries, top_n=args.top_n), args.repeat)
+
+            line = f"    N={n:<5}"
+            for mode in ("per_call", "indexed", "batched"):
+                if f"{mode}_s" in row:
+                    seconds = row[f"{mode}_s"]
+                    row[f"{mode}_personas_per_sec"] = round(n / seconds, 1) if seconds else None
+                    row[f"{mode}_s"] = round(seconds, 4)
+                    line += f"  {mode} {seconds * 1000:9.2f} ms ({row[f'{mode}_personas_per_sec']}/s)"
+            print(line)
+            report.append(row)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Learned heading ranker: columnar feature matrix vs per-heading feature dicts.
+
+Builds a synthetic collection of 1(a)-style outlines (the bench_bm25.py
+generator, default 2000 documents) and its TF-IDF index, then ranks every
+document's headings for each collection persona two ways:
+
+  dicts    features.extract_features per document (a dict per heading)
+           scored with the ranker weights one dict at a time
+  matrix   ranker.rank_headings: one feature matrix for the whole
+           collection, one matrix-vector product (cold: the query-free
+           features are computed on the first call; warm: reused)
+
+The length, word-count and leading-number columns of the matrix must
+equal the dict features; the run fails otherwise. Also times
+`python ranker.py` training on the labelled bundled collections.
+
+    python benchmarks/bench_ranker.py --documents 2000 --output ranker.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "1(b)", "code"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pathlib import Path
+from bench_bm25 import load_sources, make_outline
+from bench_personas import timed
+import ranker
+from features import FEATURE_NAMES, extract_features
+from persona_classifier import split_passages
+from tfidf_index import fit_index
+
+COLLECTIONS = sorted(Path(ROOT, "1(b)").glob("Collection *"))
+
+
+def per_dict(documents, model, query_text, top_n):
+    weights = dict(zip(FEATURE_NAMES, model["weights"]))
+    means = dict(zip(FEATURE_NAMES, model["mean"]))
+    scales = dict(zip(FEATURE_NAMES, model["scale"]))
+    ranked = {}
+    for doc in documents:
+        texts = [h["text"] for h in doc["headings"]]
+        last_page = max(h["page"] for h in doc["headings"])
+        scored = []
+        for h, f in zip(doc["headings"], extract_features(query_text, texts)):
+            f = dict(f, heading_level=int(h["level"][1:]), page_position=h["page"] / last_page)
+            s = model["bias"] + sum(weights[k] * (float(f[k]) - means[k]) / scales[k] for k in FEATURE_NAMES)
+            scored.append((round(s, 4), h))
+        scored.sort(key=lambda x: -x[0])
+        ranked[doc["document"]] = scored[:top_n]
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=2000, help="synthetic outlines in the collection")
+    parser.add_argument("--vocabulary", type=int, default=50000, help="size of the synthetic term tail")
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per mode (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    titles, words, queries = load_sources()
+    documents = []
+    for i in range(args.documents):
+        headings = make_outline(rng, titles, words, args.vocabulary)
+        if headings:
+            documents.append({"document": f"doc{i:06d}.pdf", "headings": headings, "sections": {"text": "", "spans": {}}})
+    index = fit_index(documents, split_passages)
+    headings = sum(len(d["headings"]) for d in documents)
+    model = ranker.get_model()
+    print(f"🔨 {len(documents)} outlines, {headings} headings indexed")
+
+    # Same query-free features either way
+    layout = ranker._layout(index)
+    dict_rows = [
+        [f["heading_length"], f["heading_word_count"], f["starts_with_number"]]
+        for doc in documents for f in extract_features(queries[0], [h["text"] for h in doc["headings"]])
+    ]
+    if not np.array_equal(layout["matrix"][:, 1:4], np.array(dict_rows, dtype=np.float64)):
+        print("❌ Feature matrix differs from extract_features")
+        return 1
+    index.pop("_ranker_layout")
+
+    report = {"documents": len(documents), "headings": headings, "queries": []}
+    for query in queries:
+        dicts_s = timed(lambda: per_dict(documents, model, query, args.top_n), 1)
+        index.pop("_ranker_layout", None)
+        index["_query_scores"].clear()
+        start = time.perf_counter()
+        ranker.rank_headings(index, query, top_n=args.top_n, model=model)
+        cold_s = time.perf_counter() - start
+
+        def warm():
+            index["_query_scores"].clear()
+            ranker.rank_headings(index, query, top_n=args.top_n, model=model)
+
+        warm_s = timed(warm, args.repeat)
+        report["queries"].append({
+            "query": query,
+            "dicts_ms": round(dicts_s * 1000, 1),
+            "matrix_cold_ms": round(cold_s * 1000, 1),
+            "matrix_warm_ms": round(warm_s * 1000, 1),
+        })
+        print(f"🧮 dicts {dicts_s * 1000:8.1f} ms  matrix cold {cold_s * 1000:7.1f} ms  "
+              f"warm {warm_s * 1000:6.1f} ms  {query[:50]}")
+
+    start = time.perf_counter()
+    ranker.train([c for c in COLLECTIONS if (c / "output").is_dir()])
+    report["train_s"] = round(time.perf_counter() - start, 2)
+    print(f"🎓 Training on the bundled collections took {report['train_s']:.2f}s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Sub-section refinement: per-section loop vs one batched pass per collection.
+
+For each 1(b) collection, extracts the outlines with the 1(a) extractor,
+ranks every document for the collection's persona and collects the top
+10 sections per document, as main.py does. Their passages are then
+refined four ways:
+
+  loop          get_refined_text_for_section per section, no index
+                (one TF-IDF fit per section)
+  batched       refine_sections, no index (calculate_relevance_scores_many)
+  loop-indexed  get_refined_text_for_section per section with the collection index
+  batched-indexed  refine_sections with the collection index
+
+Each batched result must match its loop exactly; the run fails otherwise.
+
+    python benchmarks/bench_refine.py --repeat 5 --output refine.json
+"""
+import os
+import sys
+import json
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "1(b)", "code"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_personas import COLLECTIONS, load_collection, timed
+from persona_classifier import rank_relevant_headings, get_refined_text_for_section, refine_sections, split_passages
+from sections import section_text
+from tfidf_index import fit_index
+
+
+def top_sections(documents, persona, task, index):
+    sections = []
+    for doc in documents:
+        ranked = rank_relevant_headings(doc["headings"], persona, task, top_n=20,
+                                        index=index, document=doc["document"])
+        for section in ranked[:10]:
+            content = section_text(doc["sections"], section)
+            if content:
+                sections.append((doc["document"], section, content))
+    return sections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per mode (best is reported)")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    report = []
+    for collection in COLLECTIONS:
+        spec, documents = load_collection(collection)
+        persona, task = spec["persona"]["role"], spec["job_to_be_done"]["task"]
+        index = fit_index(documents, split_passages)
+        sections = top_sections(documents, persona, task, index)
+
+        # Each run pays for its query product against the index
+        def loop(index=None):
+            if index is not None:
+                index["_query_scores"].clear()
+            return [
+                get_refined_text_for_section(content, persona, task, index=index, document=document, heading=section)
+                for document, section, content in sections
+            ]
+
+        def batched(index=None):
+            if index is not None:
+                index["_query_scores"].clear()
+            return refine_sections(sections, persona, task, index=index)
+
+        row = {"collection": os.path.basename(collection), "sections": len(sections)}
+        for name, run in (("loop", loop), ("batched", batched),
+                          ("loop_indexed", lambda: loop(index)), ("batched_indexed", lambda: batched(index))):
+            row[f"{name}_ms"] = round(timed(run, args.repeat) * 1000, 2)
+            row[name] = run()
+        for mode in ("batched", "batched_indexed"):
+            if row.pop(mode) != row[mode.replace("batched", "loop")]:
+                print(f"❌ {row['collection']}: {mode} differs from the per-section loop")
+                return 1
+        del row["loop"], row["loop_indexed"]
+        report.append(row)
+        print(f"✂️ {row['collection']}: {row['sections']} sections  "
+              f"loop {row['loop_ms']:.1f} ms  batched {row['batched_ms']:.1f} ms  |  "
+              f"indexed: loop {row['loop_indexed_ms']:.2f} ms  batched {row['batched_indexed_ms']:.2f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
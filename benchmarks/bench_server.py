@@ -0,0 +1,185 @@
+"""Warm 1(b) ranking server: cold start vs warm latency, and batching under concurrency.
+
+Writes 1(a) outlines for every bundled collection into a scratch root
+(next to symlinks of its pdf/ and input/ folders), then starts
+1(b)/code/server.py on it as a separate process and measures:
+
+  cold    process start to first answered request (imports, collection
+          load, index fit): what `python main.py` pays every run
+  warm    client-side latency percentiles and throughput with 1, 8 and 32
+          concurrent clients, each on its own keep-alive connection,
+          plus the server's own /stats (mean batch size)
+
+Personas are each collection's own plus seeded vocabulary samples.
+
+    python benchmarks/bench_server.py --requests 200 --clients 1 8 32 --output server.json
+"""
+import os
+import sys
+import json
+import glob
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+import statistics
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "1(a)"))
+
+from pdf_extract_kit.core.extractor import extract_outline
+
+SERVER = os.path.join(ROOT, "1(b)", "code", "server.py")
+COLLECTIONS = sorted(glob.glob(os.path.join(ROOT, "1(b)", "Collection *")))
+
+
+def prepare_root(scratch):
+    """Scratch collections laid out as server.py expects; returns their personas."""
+    specs = {}
+    for collection in COLLECTIONS:
+        name = os.path.basename(collection)
+        target = os.path.join(scratch, name)
+        os.makedirs(target)
+        for folder in ("pdf", "input"):
+            os.symlink(os.path.join(collection, folder), os.path.join(target, folder))
+        with open(os.path.join(collection, "input", "challenge1b_input.json"), encoding="utf-8") as f:
+            specs[name] = json.load(f)
+        for pdf_path in sorted(glob.glob(os.path.join(collection, "pdf", "*.pdf"))):
+            stem = os.path.splitext(os.path.basename(pdf_path))[0]
+            with open(os.path.join(target, f"{stem}.json"), "w", encoding="utf-8") as f:
+                json.dump(extract_outline(pdf_path), f, ensure_ascii=False)
+    return specs
+
+
+def make_requests(specs, n, seed=0):
+    rng = random.Random(seed)
+    words = []
+    for spec in specs.values():
+        words += spec["job_to_be_done"]["task"].split() + spec["persona"]["role"].split()
+    requests = []
+    names = sorted(specs)
+    while len(requests) < n:
+        name = names[len(requests) % len(names)]
+        if len(requests) < len(names):
+            persona, task = specs[name]["persona"]["role"], specs[name]["job_to_be_done"]["task"]
+        else:
+            persona, task = " ".join(rng.choices(words, k=2)), " ".join(rng.choices(words, k=10))
+        requests.append({"collection": name, "persona": persona, "task": task})
+    return requests
+
+
+def post(conn, body):
+    start = time.perf_counter()
+    conn.request("POST", "/rank", json.dumps(body).encode("utf-8"), {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    payload = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"HTTP {response.status}: {payload[:200]}")
+    return (time.perf_counter() - start) * 1000
+
+
+def get(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    conn.request("GET", path)
+    return json.loads(conn.getresponse().read())
+
+
+def load_test(port, requests, clients):
+    """Splits the requests over `clients` threads; returns client latencies and wall time."""
+    latencies = []
+    lock = threading.Lock()
+
+    def client(share):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+        mine = [post(conn, body) for body in share]
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(requests[i::clients],)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, time.perf_counter() - start
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench_server_")
+    server = None
+    try:
+        specs = prepare_root(scratch)
+        first = make_requests(specs, 1)[0]
+
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, SERVER, "--root", scratch, "--port", str(args.port)],
+            cwd=os.path.dirname(SERVER), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        while True:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", args.port, timeout=600)
+                post(conn, first)
+                break
+            except (ConnectionError, OSError):
+                if server.poll() is not None:
+                    raise RuntimeError("server.py exited during startup")
+                time.sleep(0.05)
+        cold_ms = (time.perf_counter() - start) * 1000
+        print(f"🧊 Cold: first answer {cold_ms:.0f} ms after process start")
+
+        # Warm every collection before measuring
+        for body in make_requests(specs, len(specs)):
+            post(conn, body)
+        conn.close()
+
+        report = {"cold_ms": round(cold_ms, 1), "levels": []}
+        for clients in args.clients:
+            before = get(args.port, "/stats")
+            latencies, wall = load_test(args.port, make_requests(specs, args.requests, seed=clients), clients)
+            after = get(args.port, "/stats")
+            batches = after["batches"] - before["batches"]
+            row = {
+                "clients": clients,
+                "requests": len(latencies),
+                "p50_ms": round(statistics.median(latencies), 2),
+                "p90_ms": round(percentile(latencies, 90), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "requests_per_sec": round(len(latencies) / wall, 1),
+                "mean_batch_size": round(len(latencies) / batches, 2) if batches else None,
+            }
+            report["levels"].append(row)
+            print(f"🔥 {clients:3} clients: p50 {row['p50_ms']:7.2f} ms  p90 {row['p90_ms']:7.2f} ms  "
+                  f"p99 {row['p99_ms']:7.2f} ms  {row['requests_per_sec']:7.1f} req/s  "
+                  f"batch {row['mean_batch_size']}")
+        report["server_stats"] = get(args.port, "/stats")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Cold-start cost of the 1(a) extractors, from `python -X importtime`.
+
+For each entry point, reports the cumulative import time and the slowest
+modules. It then runs a text-only extraction and checks that none of the OCR
+or clustering back ends were imported along the way. Exits non-zero when a
+heavy module is imported eagerly or on the text-only path, or when an import
+exceeds --budget-ms, so it can run as a CI gate.
+
+    python benchmarks/bench_startup.py --budget-ms 400 --output startup.json
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from bench_ocr import ROOT
+
+KIT_ROOT = os.path.join(ROOT, "1(a)")
+OUTLINE_ROOT = os.path.join(KIT_ROOT, "pdf-outline", "pdf_outline_extractor")
+
+# Back ends that text-only PDFs must never load
+OCR_MODULES = ["pytesseract", "PIL", "pdf2image", "tesserocr", "sklearn"]
+
+# (label, sys.path root, module to import, runner import, modules that must stay unloaded).
+# The pdf-outline kit clusters font sizes on every text PDF, so NumPy is
+# expected there after the first document, just not at import time.
+ENTRY_POINTS = [
+    ("1(a) CLI", KIT_ROOT, "app.main",
+     "import app.main; from pdf_extract_kit.core.extractor import extract_outline as run", OCR_MODULES + ["numpy"]),
+    ("1(a) batch driver", KIT_ROOT, "pdf_extract_kit.core.batch",
+     "from pdf_extract_kit.core.extractor import extract_outline as run", OCR_MODULES + ["numpy"]),
+    ("pdf-outline kit", OUTLINE_ROOT, "pdf_extract_kit.core.extractor",
+     "from pdf_extract_kit.core.extractor import process_pdf as run", OCR_MODULES),
+]
+TEXT_PDF = os.path.join(KIT_ROOT, "app", "input", "file02.pdf")
+
+
+def import_times(cwd, module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=dict(os.environ, PYTHONPATH=cwd), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def loaded_modules(cwd, import_line, run_pdf):
+    code = f"import sys; {import_line}; "
+    if run_pdf:
+        code += f"run({TEXT_PDF!r}); "
+    code += "print(' '.join(sorted(m for m in sys.modules if '.' not in m)))"
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd, env=dict(os.environ, PYTHONPATH=cwd), capture_output=True, text=True, check=True
+    )
+    return proc.stdout.strip().splitlines()[-1].split() if proc.stdout.strip() else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if an entry point imports slower")
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    report = []
+    failed = False
+    for label, cwd, module, import_line, lazy in ENTRY_POINTS:
+        rows = import_times(cwd, module)
+        total_ms = max(cumulative for _, cumulative, _ in rows) / 1000
+        slowest = sorted(rows, reverse=True)[:args.top]
+        at_import = [m for m in loaded_modules(cwd, import_line, False) if m in OCR_MODULES + ["numpy"]]
+        leaked = [m for m in loaded_modules(cwd, import_line, True) if m in lazy]
+        leaked = sorted(set(leaked) | set(at_import))
+
+        print(f"📦 {label}: import {module} = {total_ms:.1f} ms")
+        for self_us, _, name in slowest:
+            print(f"    {self_us / 1000:8.1f} ms  {name}")
+        if leaked:
+            print(f"❌ loaded eagerly or on the text-only path: {', '.join(leaked)}")
+            failed = True
+        if args.budget_ms and total_ms > args.budget_ms:
+            print(f"❌ over budget: {total_ms:.1f} ms > {args.budget_ms} ms")
+            failed = True
+
+        report.append({
+            "entry_point": label,
+            "module": module,
+            "import_ms": round(total_ms, 1),
+            "slowest": [{"module": name, "self_ms": round(us / 1000, 1)} for us, _, name in slowest],
+            "leaked_on_text_path": leaked,
+        })
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Outline loading: one JSON file per PDF vs the memory-mapped columnar outline store.
+
+Writes a synthetic batch of 1(a)-style outlines (the bench_bm25.py
+generator) both as indented JSON files, as 1(a) writes them, and as one
+store file (pdf_extract_kit/core/store.py), then loads it back in a fresh
+process per mode:
+
+  json      json.load every file, as main.py reads 1A output
+  store     open_store + read_outline for every document (same dicts)
+  columns   open_store + a scan of the level and page columns only
+            (headings per level, last page per document), no strings decoded
+  json_keys SHA-256 of every JSON file, as 1(b) keys its manifest cache
+  store_keys the content hash stored for every document (outline_hash),
+            the store-backed equivalent; a warm 1(b) run decodes nothing else
+
+Every document read from the store must equal its JSON file; the run
+fails otherwise.
+
+    python benchmarks/bench_store.py --documents 2000 20000 --output store.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "1(a)"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_bm25 import load_sources, make_outline
+from bench_suite import isolated, peak_rss_mb
+
+
+MODES = ("json", "store", "columns", "json_keys", "store_keys")
+
+
+def write_corpus(folder, documents, seed, vocabulary):
+    from pdf_extract_kit.core.store import write_store
+    rng = random.Random(seed)
+    titles, words, _ = load_sources()
+    json_dir = os.path.join(folder, "json")
+    os.makedirs(json_dir)
+    outlines = []
+    for i in range(documents):
+        result = {"title": f"Document {i}", "outline": make_outline(rng, titles, words, vocabulary)}
+        with open(os.path.join(json_dir, f"doc{i:06d}.json"), "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        outlines.append((f"doc{i:06d}.pdf", result))
+    store_path = os.path.join(folder, "outlines.olst")
+    write_store(store_path, outlines)
+    return json_dir, store_path
+
+
+def folder_bytes(folder):
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+
+
+def run_load(mode, json_dir, store_path):
+    import numpy as np
+    from pdf_extract_kit.core.store import open_store, read_outline, outline_hash
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "json":
+        outlines = {}
+        for name in sorted(os.listdir(json_dir)):
+            with open(os.path.join(json_dir, name), "r", encoding="utf-8") as f:
+                outlines[name.rsplit(".", 1)[0] + ".pdf"] = json.load(f)
+        headings = sum(len(o["outline"]) for o in outlines.values())
+    elif mode == "store":
+        store = open_store(store_path)
+        outlines = {name: read_outline(store, name) for name in store["documents"]}
+        headings = sum(len(o["outline"]) for o in outlines.values())
+    elif mode == "json_keys":
+        outlines = None
+        headings = None
+        for name in sorted(os.listdir(json_dir)):
+            with open(os.path.join(json_dir, name), "rb") as f:
+                hashlib.sha256(f.read()).hexdigest()
+    elif mode == "store_keys":
+        store = open_store(store_path)
+        outlines = None
+        headings = int(store["columns"]["doc_start"][-1])
+        for name in store["documents"]:
+            outline_hash(store, name).hex()
+    else:
+        store = open_store(store_path)
+        columns = store["columns"]
+        per_level = np.bincount(columns["level"], minlength=len(store["levels"]))
+        starts = columns["doc_start"][:-1].astype(np.int64)
+        nonempty = starts < columns["doc_start"][1:]
+        last_page = np.maximum.reduceat(columns["page"], starts[nonempty]) if nonempty.any() else []
+        headings = int(per_level.sum())
+        outlines = None
+    load_ms = round((time.perf_counter() - start) * 1000, 1)
+    rss_growth_mb = round(peak_rss_mb() - baseline, 1)
+    # A digest rather than the outlines: the parent must stay small for the next child
+    digest = outlines and hashlib.sha256(json.dumps(outlines, sort_keys=True).encode("utf-8")).hexdigest()
+    return {"headings": headings, "load_ms": load_ms, "rss_growth_mb": rss_growth_mb, "digest": digest}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--vocabulary", type=int, default=50000, help="size of the synthetic term tail")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    report = []
+    for documents in args.documents:
+        folder = tempfile.mkdtemp(prefix="bench_store_")
+        try:
+            # Generated in its own process: a child inherits its parent's peak RSS
+            json_dir, store_path = isolated(write_corpus, folder, documents, args.seed, args.vocabulary)
+            row = {
+                "documents": documents,
+                "json_bytes": folder_bytes(json_dir),
+                "store_bytes": os.path.getsize(store_path),
+            }
+            for mode in MODES:
+                row[mode] = isolated(run_load, mode, json_dir, store_path)
+                if isinstance(row[mode], Exception):
+                    raise row[mode]
+        finally:
+            shutil.rmtree(folder)
+
+        if row["store"]["digest"] != row["json"]["digest"]:
+            print("❌ Outlines read from the store differ from the JSON files")
+            return 1
+        print(f"🗄️ {documents:6} outlines  JSON {row['json_bytes'] / 1e6:7.1f} MB  store {row['store_bytes'] / 1e6:6.1f} MB")
+        for mode in MODES:
+            r = row[mode]
+            r.pop("digest")
+            print(f"   {mode:10} {r['headings'] or '-':>8} headings  {r['load_ms']:9.1f} ms  +{r['rss_growth_mb']:6.1f} MB")
+        report.append(row)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""End-to-end benchmark over the bundled 1(a) inputs and the 1(b) collections.
+
+Every PDF is run through the 1(a) extract_outline and the pdf-outline
+process_pdf, each in a fresh process so the peak RSS reported is that
+document's own. Each 1(b) collection is then ranked against its
+challenge1b_input.json persona and task, one rank_relevant_headings call
+per document, the way 1(b)/code/main.py does it. Results, including the
+per-stage times from pdf_extract_kit.core.metrics, are written as JSON;
+pass the JSON of an earlier run as --baseline to print the change in
+latency per document and per collection.
+
+    python benchmarks/bench_suite.py --repeat 3 --output bench.json
+    python benchmarks/bench_suite.py --baseline bench.json --max-regression 20
+"""
+import os
+import sys
+import json
+import glob
+import time
+import platform
+import argparse
+import resource
+import statistics
+import subprocess
+import multiprocessing
+from datetime import datetime
+
+# Not imported from bench_ocr: that pulls pytesseract and PIL into every
+# worker and would inflate the RSS of text-only documents
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+KITS = {
+    "1(a)": (os.path.join(ROOT, "1(a)"), "extract_outline"),
+    "pdf-outline": (os.path.join(ROOT, "1(a)", "pdf-outline", "pdf_outline_extractor"), "process_pdf"),
+}
+RANKER_ROOT = os.path.join(ROOT, "1(b)", "code")
+OUTLINE_INPUT = os.path.join(ROOT, "1(a)", "app", "input")
+COLLECTIONS = sorted(glob.glob(os.path.join(ROOT, "1(b)", "Collection *")))
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def timings(run, repeat):
+    """Runs `run` repeat times: (last result, first call ms, median ms)."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, times[0], statistics.median(times)
+
+
+def run_document(kit, path, repeat):
+    """Worker: one document through one kit. The two kits share a package
+    name, so each task runs in its own process with its kit first on sys.path."""
+    kit_root, func = KITS[kit]
+    sys.path.insert(0, kit_root)
+    import fitz  # PyMuPDF
+    from pdf_extract_kit.core import extractor, metrics
+    from pdf_extract_kit.core.pages import build_page_model
+
+    with fitz.open(path) as doc:
+        pages = build_page_model(doc)
+    ocr_pages = sum(p["scanned"] for p in pages)
+    blank_pages = sum(p["empty"] and not p["scanned"] for p in pages)
+    text_pages = len(pages) - ocr_pages - blank_pages
+
+    run = getattr(extractor, func)
+
+    def timed():
+        with metrics.collect() as stats:
+            result = run(path)
+        return result, stats
+
+    (result, stats), first_ms, median_ms = timings(timed, repeat)
+    return {
+        "kit": kit,
+        "file": os.path.relpath(path, ROOT),
+        "pages": len(pages),
+        "text_pages": text_pages,
+        "ocr_pages": ocr_pages,
+        "blank_pages": blank_pages,
+        "path": "ocr" if ocr_pages and not text_pages else "mixed" if ocr_pages else "text",
+        "headings": len(result["outline"]),
+        "first_ms": round(first_ms, 2),
+        "median_ms": round(median_ms, 2),
+        "pages_per_sec": round(len(pages) / (median_ms / 1000), 1) if median_ms else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": metrics.rounded(stats)["stages"],
+        "counters": stats["counters"],
+        "outline": result["outline"],
+    }
+
+
+def run_collection(collection, outlines, repeat):
+    """Worker: ranks every document outline of a collection for its persona."""
+    sys.path.insert(0, RANKER_ROOT)
+    from persona_classifier import rank_relevant_headings
+
+    with open(os.path.join(collection, "input", "challenge1b_input.json"), encoding="utf-8") as f:
+        spec = json.load(f)
+    persona = spec["persona"]["role"]
+    task = spec["job_to_be_done"]["task"]
+    documents = [outlines.get(d["filename"], []) for d in spec["documents"]]
+
+    def rank():
+        return [rank_relevant_headings(outline, persona, task, top_n=20) for outline in documents if outline]
+
+    ranked, first_ms, median_ms = timings(rank, repeat)
+    return {
+        "collection": os.path.basename(collection),
+        "documents": len(documents),
+        "headings": sum(len(o) for o in documents),
+        "ranked": sum(len(r) for r in ranked),
+        "first_ms": round(first_ms, 2),
+        "median_ms": round(median_ms, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _call(conn, func, args):
+    try:
+        conn.send(func(*args))
+    except Exception as e:
+        conn.send(e)
+    finally:
+        conn.close()
+
+
+def isolated(func, *args):
+    """Runs func(*args) in a fresh spawned process and returns its result.
+
+    Not a multiprocessing.Pool: pool workers are daemonic and so could not
+    start the OCR worker processes.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    recv, send = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_call, args=(send, func, args))
+    proc.start()
+    send.close()
+    try:
+        result = recv.recv()
+    except EOFError:
+        result = RuntimeError(f"worker exited with code {proc.exitcode}")
+    proc.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, max_regression):
+    """Prints the median latency change against an earlier report; returns the regressions."""
+    before = {(d["kit"], d["file"]): d["median_ms"] for d in baseline.get("documents", [])}
+    before.update({("1(b)", c["collection"]): c["median_ms"] for c in baseline.get("collections", [])})
+    now = {(d["kit"], d["file"]): d["median_ms"] for d in report["documents"]}
+    now.update({("1(b)", c["collection"]): c["median_ms"] for c in report["collections"]})
+
+    regressions = []
+    for key in sorted(now.keys() & before.keys()):
+        if not before[key]:
+            continue
+        change = (now[key] - before[key]) / before[key] * 100
+        flag = ""
+        if max_regression is not None and change > max_regression:
+            flag = " ❌"
+            regressions.append(key)
+        print(f"    {change:+7.1f}%  {before[key]:9.2f} → {now[key]:9.2f} ms  {key[0]} {key[1]}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per document (median is reported)")
+    parser.add_argument("--kits", nargs="+", choices=list(KITS), default=list(KITS))
+    parser.add_argument("--skip-ranking", action="store_true", help="skip the 1(b) collections")
+    parser.add_argument("--output", default="bench_suite.json", help="where to write the JSON report")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="exit non-zero if a median slows down by more than this many percent")
+    args = parser.parse_args()
+
+    pdfs = sorted(glob.glob(os.path.join(OUTLINE_INPUT, "*.pdf")))
+    for collection in COLLECTIONS:
+        pdfs += sorted(glob.glob(os.path.join(collection, "pdf", "*.pdf")))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "documents": [],
+        "collections": [],
+    }
+
+    # One fresh process per task: clean sys.path for the kit, and a peak RSS of its own
+    for kit in args.kits:
+        for path in pdfs:
+            row = isolated(run_document, kit, path, args.repeat)
+            report["documents"].append(row)
+            print(f"📄 {kit:11} {row['median_ms']:9.2f} ms  {row['pages_per_sec'] or 0:8.1f} pages/s  "
+                  f"{row['peak_rss_mb']:6.1f} MB  {row['path']:5}  {row['file']}")
+
+    if not args.skip_ranking:
+        # 1(b) ranks the 1(a) outlines, so reuse them instead of extracting again
+        outlines = {}
+        for row in report["documents"]:
+            if row["kit"] == "1(a)":
+                outlines[os.path.basename(row["file"])] = row["outline"]
+        if not outlines:
+            for path in pdfs:
+                outlines[os.path.basename(path)] = isolated(run_document, "1(a)", path, 1)["outline"]
+        for collection in COLLECTIONS:
+            row = isolated(run_collection, collection, outlines, args.repeat)
+            report["collections"].append(row)
+            print(f"🔎 {row['collection']}: {row['documents']} documents, {row['headings']} headings "
+                  f"ranked in {row['median_ms']:.2f} ms ({row['peak_rss_mb']:.1f} MB)")
+
+    for row in report["documents"]:
+        del row["outline"]
+
+    for kit in args.kits:
+        rows = [d for d in report["documents"] if d["kit"] == kit]
+        if rows:
+            total_ms = sum(d["median_ms"] for d in rows)
+            pages = sum(d["pages"] for d in rows)
+            print(f"📊 {kit}: {len(rows)} files, {pages} pages in {total_ms / 1000:.2f}s "
+                  f"({pages / (total_ms / 1000):.1f} pages/s, "
+                  f"{sum(d['ocr_pages'] for d in rows)} OCR pages, max RSS {max(d['peak_rss_mb'] for d in rows)} MB)")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"⚖️ Against {args.baseline} (commit {baseline.get('meta', {}).get('commit')}):")
+        if compare(report, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())